@@ -0,0 +1,107 @@
+# Path: backend/app/alignment.py
+from typing import Tuple
+import numpy as np
+from fastapi import HTTPException, status
+
+ALIGNMENT_RATE = 10.0  # Samples per second both signals are resampled to
+MIN_OVERLAP = 0.5  # Least overlap of a candidate lag, as a share of the shorter signal
+TRANSITION_SMOOTHING = 1.0  # Seconds a button transition is spread over
+
+Signal = Tuple[np.ndarray, np.ndarray]  # (timestamps, values)
+
+
+def resample(timestamps: np.ndarray, values: np.ndarray, rate: float) -> np.ndarray:
+    """Values on a grid of ``rate`` per second starting at the first timestamp"""
+    count = int((timestamps[-1] - timestamps[0]) * rate) + 1
+    grid = timestamps[0] + np.arange(count) / rate
+    return np.interp(grid, timestamps, values.astype(np.float64))
+
+
+def change_signal(timestamps: np.ndarray, values: np.ndarray, rate: float = ALIGNMENT_RATE) -> Signal:
+    """Absolute rate of change of a series on a uniform grid"""
+    resampled = resample(timestamps, values, rate)
+    grid = timestamps[0] + np.arange(len(resampled)) / rate
+    return grid, np.abs(np.gradient(resampled)) if len(resampled) > 1 else np.zeros(len(resampled))
+
+
+def transition_signal(timestamps: np.ndarray, states: np.ndarray, rate: float = ALIGNMENT_RATE) -> Signal:
+    """Button transitions as pulses of TRANSITION_SMOOTHING seconds on a uniform grid"""
+    changes = timestamps[1:][np.diff(states.astype(np.int8)) != 0]
+    count = int((timestamps[-1] - timestamps[0]) * rate) + 1
+    pulses = np.bincount(((changes - timestamps[0]) * rate).astype(np.int64), minlength=count)[:count]
+    width = max(int(TRANSITION_SMOOTHING * rate), 1)
+    values = np.convolve(pulses.astype(np.float64), np.ones(width), mode="same")
+    return timestamps[0] + np.arange(count) / rate, values
+
+
+def require_samples(*timestamps: np.ndarray) -> None:
+    if any(len(t) < 2 for t in timestamps):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough samples to estimate an offset"
+        )
+
+
+def _window_sums(values: np.ndarray, first: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    prefix = np.concatenate(([0.0], np.cumsum(values)))
+    return prefix[stop] - prefix[first]
+
+
+def estimate_offset(
+    reference: Signal,
+    signal: Signal,
+    max_offset: float,
+    rate: float = ALIGNMENT_RATE
+) -> Tuple[float, float]:
+    """Offset to add to ``signal`` timestamps so it best matches ``reference``,
+    and a confidence in [0, 1].
+
+    Both are resampled to ``rate`` and cross-correlated with one FFT, so all
+    lags together cost O(n log n). Prefix sums over each lag's overlap turn
+    that into the Pearson correlation of the overlapping parts. Lags that
+    overlap less than MIN_OVERLAP of the shorter signal are skipped. The peak
+    is refined between samples with a parabola, and its correlation, clipped
+    at 0, is the confidence.
+    """
+    require_samples(reference[0], signal[0])
+    a = resample(*reference, rate)
+    b = resample(*signal, rate)
+    # Centered values keep the prefix sums from losing precision
+    a, b = a - a.mean(), b - b.mean()
+    na, nb = len(a), len(b)
+    nfft = 1 << (na + nb - 2).bit_length()
+    # circular[k] = sum_i a[i + k] * b[i]; negative lags wrap to the end
+    circular = np.fft.irfft(np.fft.rfft(a, nfft) * np.conj(np.fft.rfft(b, nfft)), nfft)
+    lags = np.arange(-(nb - 1), na)
+    correlation = np.concatenate((circular[nfft - (nb - 1):], circular[:na]))
+    # Overlap of lag k: a[start_a:stop_a] against b[start_b:stop_b]
+    start_a, stop_a = np.maximum(0, lags), np.minimum(na, nb + lags)
+    start_b, stop_b = start_a - lags, stop_a - lags
+    overlap = stop_a - start_a
+    sum_a, sum_b = _window_sums(a, start_a, stop_a), _window_sums(b, start_b, stop_b)
+    var_a = _window_sums(a * a, start_a, stop_a) - sum_a ** 2 / overlap
+    var_b = _window_sums(b * b, start_b, stop_b) - sum_b ** 2 / overlap
+    covariance = correlation - sum_a * sum_b / overlap
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.sqrt(var_a * var_b)
+    correlation = np.nan_to_num(correlation, nan=0.0, posinf=0.0, neginf=0.0)
+
+    # a[i + k] matches b[i]: reference time t0a + (i + k) / rate is signal time t0b + i / rate
+    base = reference[0][0] - signal[0][0]
+    offsets = base + lags / rate
+    candidates = (overlap >= MIN_OVERLAP * min(na, nb)) & (np.abs(offsets) <= max_offset)
+    if not candidates.any():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The series do not overlap within max_offset"
+        )
+    correlation = np.where(candidates, correlation, -np.inf)
+    peak = int(correlation.argmax())
+
+    shift = 0.0
+    if 0 < peak < len(correlation) - 1 and candidates[peak - 1] and candidates[peak + 1]:
+        left, center, right = correlation[peak - 1:peak + 2]
+        curvature = left - 2 * center + right
+        if curvature < 0:
+            shift = 0.5 * (left - right) / curvature
+    return float(offsets[peak] + shift / rate), float(np.clip(correlation[peak], 0.0, 1.0))
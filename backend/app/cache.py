@@ -0,0 +1,278 @@
+# Path: backend/app/cache.py
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Tuple
+from starlette.responses import Response
+from .storage import ObjectStorage
+
+logger = logging.getLogger(__name__)
+
+BlockId = Tuple[str, int]  # (key digest, block number)
+
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class BlockCache:
+    """On-disk cache of fixed-size blocks of S3 objects with LRU eviction.
+
+    Objects are addressed by content hash so they never change in place,
+    which makes blocks safe to keep until they are evicted. Concurrent
+    requests for a block that is being fetched wait for the same fetch.
+    """
+
+    def __init__(self, directory: str, block_size: int, max_bytes: int):
+        self.directory = directory
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._blocks: "OrderedDict[BlockId, int]" = OrderedDict()
+        self._inflight: Dict[BlockId, asyncio.Task] = {}
+        self._metadata: "OrderedDict[str, dict]" = OrderedDict()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_settings(cls, settings) -> "BlockCache":
+        return cls(
+            settings.VIDEO_CACHE_DIR,
+            block_size=settings.VIDEO_CACHE_BLOCK_SIZE,
+            max_bytes=settings.VIDEO_CACHE_MAX_BYTES
+        )
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from blocks left on disk, oldest access first"""
+        found = []
+        for digest in os.listdir(self.directory):
+            object_dir = os.path.join(self.directory, digest)
+            if not os.path.isdir(object_dir):
+                continue
+            for name in os.listdir(object_dir):
+                path = os.path.join(object_dir, name)
+                if not name.isdigit():
+                    # Leftover partial write
+                    os.unlink(path)
+                    continue
+                stat = os.stat(path)
+                found.append((stat.st_atime, (digest, int(name)), stat.st_size))
+        for _, block_id, size in sorted(found):
+            self._blocks[block_id] = size
+            self.used_bytes += size
+        self._evict()
+
+    def _path(self, block_id: BlockId) -> str:
+        digest, block_number = block_id
+        return os.path.join(self.directory, digest, str(block_number))
+
+    def _evict(self) -> None:
+        while self.used_bytes > self.max_bytes and self._blocks:
+            block_id, size = self._blocks.popitem(last=False)
+            self.used_bytes -= size
+            self.evictions += 1
+            try:
+                # Readers that already opened the block keep a valid descriptor
+                os.unlink(self._path(block_id))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "blocks": len(self._blocks),
+            "used_bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+            "block_size": self.block_size
+        }
+
+    async def object_metadata(self, storage: ObjectStorage, key: str) -> dict:
+        """Size, content type and ETag of an object, remembered per key"""
+        metadata = self._metadata.get(key)
+        if metadata is None:
+            head = await storage.head(key)
+            metadata = {
+                "ContentLength": head["ContentLength"],
+                "ContentType": head.get("ContentType"),
+                "ETag": head.get("ETag")
+            }
+            self._metadata[key] = metadata
+            if len(self._metadata) > 10000:
+                self._metadata.popitem(last=False)
+        else:
+            self._metadata.move_to_end(key)
+        return metadata
+
+    async def _fetch(self, storage: ObjectStorage, key: str, block_id: BlockId, size: int) -> int:
+        start = block_id[1] * self.block_size
+        end = min(start + self.block_size, size) - 1
+        data = await storage.get_range(key, start, end)
+        path = self._path(block_id)
+
+        def write() -> None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{os.getpid()}.part"
+            with open(partial, "wb") as f:
+                f.write(data)
+            os.replace(partial, path)
+
+        await asyncio.to_thread(write)
+        self._blocks[block_id] = len(data)
+        self.used_bytes += len(data)
+        self._evict()
+        return len(data)
+
+    async def open_block(self, storage: ObjectStorage, key: str, block_number: int, size: int) -> BinaryIO:
+        """Open a cached block for reading, fetching it from S3 on a miss"""
+        block_id = (hashlib.sha1(key.encode()).hexdigest(), block_number)
+        if block_id in self._blocks:
+            try:
+                f = open(self._path(block_id), "rb")
+                self._blocks.move_to_end(block_id)
+                self.hits += 1
+                return f
+            except FileNotFoundError:
+                self.used_bytes -= self._blocks.pop(block_id)
+
+        for attempt in range(3):
+            task = self._inflight.get(block_id)
+            if task is None:
+                self.misses += 1
+                task = asyncio.create_task(self._fetch(storage, key, block_id, size))
+                self._inflight[block_id] = task
+                task.add_done_callback(lambda _: self._inflight.pop(block_id, None))
+            else:
+                self.coalesced += 1
+            # Shielded so one client disconnecting does not cancel a shared fetch
+            await asyncio.shield(task)
+            try:
+                return open(self._path(block_id), "rb")
+            except FileNotFoundError:
+                # Evicted before we could open it, only under heavy churn
+                continue
+        raise RuntimeError(f"Block cache is too small to hold block {block_number} of {key}")
+
+    async def prefetch(self, storage: ObjectStorage, key: str, start: int, end: int) -> None:
+        """Load the blocks covering bytes [start, end] without reading them"""
+        try:
+            size = (await self.object_metadata(storage, key))["ContentLength"]
+            for block_number in range(start // self.block_size, min(end, size - 1) // self.block_size + 1):
+                (await self.open_block(storage, key, block_number, size)).close()
+        except Exception as e:
+            logger.warning(f"Prefetch of {key} bytes {start}-{end} failed: {str(e)}")
+
+    async def iter_segments(
+        self,
+        storage: ObjectStorage,
+        key: str,
+        size: int,
+        start: int,
+        end: int
+    ) -> AsyncIterator[Tuple[BinaryIO, int, int]]:
+        """Yield (open block file, offset, count) covering bytes [start, end].
+
+        The next block is fetched while the current one is being sent.
+        """
+        first = start // self.block_size
+        last = end // self.block_size
+        pending: Optional[asyncio.Task] = None
+        try:
+            for block_number in range(first, last + 1):
+                if pending is None:
+                    f = await self.open_block(storage, key, block_number, size)
+                else:
+                    f = await pending
+                pending = None
+                if block_number < last:
+                    pending = asyncio.create_task(self.open_block(storage, key, block_number + 1, size))
+                block_start = block_number * self.block_size
+                offset = max(start - block_start, 0)
+                count = min(end, block_start + self.block_size - 1) - (block_start + offset) + 1
+                try:
+                    yield f, offset, count
+                finally:
+                    f.close()
+        finally:
+            if pending is not None:
+                pending.add_done_callback(_close_block)
+
+
+def _close_block(task: asyncio.Task) -> None:
+    """Close a prefetched block that was never consumed"""
+    if not task.cancelled() and task.exception() is None:
+        task.result().close()
+
+
+class CachedRangeResponse(Response):
+    """Streams bytes [start, end] of an object out of the block cache.
+
+    Uses the ASGI zero-copy send extension when the server offers it, so
+    cache hits go from the page cache to the socket via sendfile. uvicorn,
+    which the Docker image runs, does not offer it: there blocks are read
+    with pread in a worker thread and sent as body chunks, which still
+    saves the S3 round trip but not the copy through Python.
+    """
+
+    def __init__(
+        self,
+        cache: BlockCache,
+        storage: ObjectStorage,
+        key: str,
+        size: int,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None
+    ):
+        self.cache = cache
+        self.storage = storage
+        self.key = key
+        self.size = size
+        self.start = start
+        self.end = end
+        headers = dict(headers or {})
+        headers["Content-Length"] = str(end - start + 1)
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope, receive, send) -> None:
+        zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        segments = self.cache.iter_segments(self.storage, self.key, self.size, self.start, self.end)
+        try:
+            async for f, offset, count in segments:
+                if zerocopy:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": f,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": True
+                    })
+                    continue
+                while count > 0:
+                    chunk = await asyncio.to_thread(os.pread, f.fileno(), min(count, READ_CHUNK_SIZE), offset)
+                    if not chunk:
+                        break
+                    offset += len(chunk)
+                    count -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            await segments.aclose()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -1,6 +1,6 @@
 # Path: backend/app/config.py
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal, Optional
 import os
 
 class Settings(BaseSettings):
@@ -33,10 +33,49 @@ class Settings(BaseSettings):
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     S3_BUCKET_NAME: str = "development-bucket"
+    S3_REGION_NAME: str = "ru-central1"
+    S3_MAX_POOL_CONNECTIONS: int = 32  # Shared connection pool and storage thread pool size
+    S3_PUBLIC_ENDPOINT_URL: Optional[str] = None  # Endpoint put into presigned URLs, defaults to S3_ENDPOINT_URL
+
+    # Video delivery: "proxy" streams bytes through the backend,
+    # "presigned" redirects clients to short-lived S3 URLs
+    VIDEO_DELIVERY: Literal["proxy", "presigned"] = "proxy"
+    PRESIGNED_URL_EXPIRES: int = 15 * 60
     
     # Upload settings
     UPLOAD_DIR: str = os.path.join(PROJECT_DIR, "uploads")
     MAX_UPLOAD_SIZE: int = 500 * 1024 * 1024
+    UPLOAD_PART_SIZE: int = 8 * 1024 * 1024  # S3 multipart part size, min 5 MB
+    UPLOAD_MAX_CONCURRENCY: int = 4  # Parts in flight per upload
+    FASTSTART_UPLOADS: bool = True  # Move the MP4 moov box to the front when storing uploads
+
+    # Where new telemetry is written: one DB row per sample ("rows") or one
+    # compressed column blob per video and series ("columnar"). Reads use
+    # whichever holds the data.
+    TELEMETRY_STORE: Literal["rows", "columnar"] = "rows"
+
+    # Seconds an annotator holds a claimed or started video without renewing
+    # it (POST /start again) before others can claim it
+    ANNOTATION_LEASE_SECONDS: int = 3600
+
+    # Background ingestion of telemetry files (?background=true uploads)
+    INGEST_MAX_CONCURRENCY: int = 2  # Jobs processed at once per backend process
+
+    # Telemetry reads carry an ETag from the video's data version. The default
+    # keeps responses out of shared caches and has browsers revalidate them.
+    TELEMETRY_CACHE_CONTROL: str = "private, no-cache"
+    TIMELINE_CACHE_SIZE: int = 32  # Resampled timelines kept in memory per backend process
+
+    # After inference, set an unset video offset from the estimated alignment
+    # of speed and predictions when its confidence reaches this; None disables
+    AUTO_ALIGN_MIN_CONFIDENCE: Optional[float] = None
+    AUTO_ALIGN_MAX_OFFSET: float = 300.0  # Seconds
+
+    # Local block cache in front of S3 for video playback
+    VIDEO_CACHE_ENABLED: bool = True
+    VIDEO_CACHE_DIR: str = os.path.join(PROJECT_DIR, "cache")
+    VIDEO_CACHE_BLOCK_SIZE: int = 2 * 1024 * 1024
+    VIDEO_CACHE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024
 
     class Config:
         env_file = ".env"
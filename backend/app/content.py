@@ -0,0 +1,74 @@
+# Path: backend/app/content.py
+import logging
+from typing import Optional, Tuple
+from botocore.exceptions import ClientError
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, models
+from .config import get_settings
+from .faststart import faststart_copy
+from .mp4 import Mp4Error, build_keyframe_index
+from .storage import ObjectStorage, content_key
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+async def register_uploaded_video(
+    db: AsyncSession,
+    storage: ObjectStorage,
+    upload_key: str,
+    content_hash: str,
+    filename: str,
+    user_id: str
+) -> Tuple[models.Video, bool]:
+    """Move a staged upload to its content-addressed key and create the Video row.
+
+    If the same content is already stored the staged copy is dropped and the
+    new video points at the existing object. MP4s with moov at the end are
+    rewritten to faststart on the way, so the key stays addressed by the hash
+    of the uploaded bytes. Returns (video, deduplicated).
+    """
+    existing = await crud.get_video_by_hash(db, content_hash)
+    if existing:
+        await storage.delete(upload_key)
+        s3_key = existing.s3_key
+        keyframe_index = existing.keyframe_index
+    else:
+        s3_key = content_key(content_hash)
+        rewritten = settings.FASTSTART_UPLOADS and await faststart_copy(
+            storage,
+            upload_key,
+            s3_key,
+            part_size=settings.UPLOAD_PART_SIZE,
+            max_concurrency=settings.UPLOAD_MAX_CONCURRENCY
+        )
+        if rewritten:
+            await storage.delete(upload_key)
+        else:
+            await storage.move(upload_key, s3_key)
+        keyframe_index = await index_keyframes(storage, s3_key)
+
+    video = await crud.create_video(
+        db,
+        filename=filename,
+        s3_key=s3_key,
+        user_id=user_id,
+        content_hash=content_hash,
+        keyframe_index=keyframe_index
+    )
+    return video, existing is not None
+
+
+async def index_keyframes(storage: ObjectStorage, key: str) -> Optional[bytes]:
+    """Serialized keyframe index of a stored MP4, None if it cannot be parsed"""
+    try:
+        metadata = await storage.head(key)
+        index = await build_keyframe_index(
+            lambda start, end: storage.get_range(key, start, end),
+            metadata["ContentLength"]
+        )
+    except (Mp4Error, ClientError) as e:
+        logger.warning(f"Could not index keyframes of {key}: {str(e)}")
+        return None
+    return index.to_bytes()
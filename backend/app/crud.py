@@ -1,11 +1,25 @@
 # Path: backend/app/crud.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, text
+from sqlalchemy import select, update, delete, and_, or_, text
 from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
 from . import models, schemas
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterable, List, Optional, Dict, Any, Tuple
+from itertools import repeat
+from .ingest import SPEED_CSV_COLUMNS, IngestStats, SpeedBatch, batch_size
+from .downsample import build_pyramid, decode_level, encode_level, lttb
+from .intervals import Interval, compact_button_states, overlapping, pressed_intervals, state_at, window
+from .telemetry import SERIES_COLUMNS, Columns, SeriesCursor, decode_series, empty_series, encode_series, merge_series, page_cursor, rows_to_columns, series_rows
+from .timeline import Timeline, build_timeline
+from .alignment import change_signal, estimate_offset, require_samples, transition_signal
+from .config import get_settings
+import asyncio
+import numpy as np
+import uuid
+
+settings = get_settings()
 
 # User operations
 async def get_user(db: AsyncSession, user_id: str) -> Optional[models.User]:
@@ -32,11 +46,15 @@ async def create_video(
     db: AsyncSession,
     filename: str,
     s3_key: str,
-    user_id: str
+    user_id: str,
+    content_hash: Optional[str] = None,
+    keyframe_index: Optional[bytes] = None
 ) -> models.Video:
     db_video = models.Video(
         filename=filename,
         s3_key=s3_key,
+        content_hash=content_hash,
+        keyframe_index=keyframe_index,
         user_id=user_id,
         status="unannotated"
     )
@@ -46,6 +64,15 @@ async def create_video(
     return db_video
 
 async def get_video(db: AsyncSession, video_id: str) -> Optional[models.Video]:
+    """Video metadata without telemetry.
+
+    Goes through the session's identity map, so within one request (one
+    session) a video is read from the database at most once.
+    """
+    return await db.get(models.Video, video_id)
+
+async def get_video_with_telemetry(db: AsyncSession, video_id: str) -> Optional[models.Video]:
+    """Video with its speed and button rows loaded, for callers that walk them as ORM objects"""
     result = await db.execute(
         select(models.Video)
         .options(selectinload(models.Video.speed_data))
@@ -54,35 +81,343 @@ async def get_video(db: AsyncSession, video_id: str) -> Optional[models.Video]:
     )
     return result.scalar_one_or_none()
 
+async def get_video_data_version(db: AsyncSession, video_id: str) -> Optional[int]:
+    """Version of a video's telemetry, annotations and offsets, None if there is no such video"""
+    result = await db.execute(select(models.Video.data_version).filter(models.Video.id == video_id))
+    return result.scalar_one_or_none()
+
+async def bump_data_version(db: AsyncSession, video_id: str) -> None:
+    """Mark a video's data as changed, committed together with the change"""
+    await db.execute(
+        update(models.Video)
+        .where(models.Video.id == video_id)
+        .values(data_version=models.Video.data_version + 1)
+    )
+
+async def get_video_by_hash(
+    db: AsyncSession,
+    content_hash: str,
+    user_id: Optional[str] = None
+) -> Optional[models.Video]:
+    """A video whose file has the given SHA-256, used for upload deduplication.
+
+    Pass ``user_id`` when the hash is only declared by the client: knowing a
+    hash proves nothing, so it may only match the caller's own videos.
+    """
+    query = select(models.Video).filter(models.Video.content_hash == content_hash)
+    if user_id is not None:
+        query = query.filter(models.Video.user_id == user_id)
+    result = await db.execute(query.limit(1))
+    return result.scalar_one_or_none()
+
+async def set_keyframe_index(db: AsyncSession, video: models.Video, keyframe_index: bytes) -> None:
+    """Store the index for every video sharing this file"""
+    await db.execute(
+        update(models.Video)
+        .where(models.Video.s3_key == video.s3_key)
+        .values(keyframe_index=keyframe_index)
+    )
+    await db.commit()
+    video.keyframe_index = keyframe_index
+
 async def get_next_unannotated_video(db: AsyncSession) -> Optional[models.Video]:
     """Get the next video that needs annotation"""
     result = await db.execute(
         select(models.Video)
         .filter(models.Video.status == "unannotated")
         .order_by(models.Video.upload_date)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+# Resumable upload operations
+async def create_upload_session(
+    db: AsyncSession,
+    user_id: str,
+    filename: str,
+    content_type: str,
+    s3_key: str,
+    s3_upload_id: Optional[str],
+    chunk_size: int,
+    total_size: int,
+    content_hash: Optional[str] = None,
+    session_id: Optional[str] = None,
+    direct: bool = False
+) -> models.UploadSession:
+    db_session = models.UploadSession(
+        id=session_id or str(uuid.uuid4()),
+        user_id=user_id,
+        filename=filename,
+        content_type=content_type,
+        s3_key=s3_key,
+        s3_upload_id=s3_upload_id,
+        chunk_size=chunk_size,
+        total_size=total_size,
+        content_hash=content_hash,
+        direct=direct,
+        status="active"
+    )
+    db.add(db_session)
+    await db.commit()
+    await db.refresh(db_session)
+    return db_session
+
+async def get_upload_session(db: AsyncSession, upload_id: str, user_id: str) -> Optional[models.UploadSession]:
+    result = await db.execute(
+        select(models.UploadSession)
+        .filter(models.UploadSession.id == upload_id)
+        .filter(models.UploadSession.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+async def lock_upload_session(db: AsyncSession, upload_id: str) -> Optional[str]:
+    """Current status of a session, share-locked until the transaction ends.
+
+    Chunk uploads take the lock while they write their part. Concurrent
+    chunks do not block each other, but the conditional UPDATE that claims a
+    session for completion or abort waits until they are done.
+    """
+    result = await db.execute(
+        select(models.UploadSession.status)
+        .filter(models.UploadSession.id == upload_id)
+        .with_for_update(read=True)
+    )
+    return result.scalar_one_or_none()
+
+async def get_upload_chunks(db: AsyncSession, upload_id: str) -> List[models.UploadChunk]:
+    result = await db.execute(
+        select(models.UploadChunk)
+        .filter(models.UploadChunk.session_id == upload_id)
+        .order_by(models.UploadChunk.chunk_number)
+    )
+    return result.scalars().all()
+
+async def save_upload_chunk(
+    db: AsyncSession,
+    upload_id: str,
+    chunk_number: int,
+    etag: str,
+    size: int
+) -> None:
+    """Record an uploaded chunk, replacing an earlier attempt with the same number"""
+    stmt = pg_insert(models.UploadChunk).values(
+        id=str(uuid.uuid4()),
+        session_id=upload_id,
+        chunk_number=chunk_number,
+        etag=etag,
+        size=size,
+        uploaded_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.UploadChunk.session_id, models.UploadChunk.chunk_number],
+        set_={"etag": stmt.excluded.etag, "size": stmt.excluded.size, "uploaded_at": stmt.excluded.uploaded_at}
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+async def transition_upload_session(
+    db: AsyncSession,
+    upload_session: models.UploadSession,
+    from_status: str,
+    to_status: str
+) -> bool:
+    """Move a session from one status to another with one conditional UPDATE.
+
+    Returns False, with ``upload_session`` refreshed, if another request moved
+    it first, so only one caller ever completes or aborts a session.
+    """
+    result = await db.execute(
+        update(models.UploadSession)
+        .where(models.UploadSession.id == upload_session.id)
+        .where(models.UploadSession.status == from_status)
+        .values(status=to_status)
+        .returning(models.UploadSession.id)
+    )
+    claimed = result.scalar_one_or_none() is not None
+    await db.commit()
+    await db.refresh(upload_session)
+    return claimed
+
+async def queue_upload_session(db: AsyncSession, upload_session: models.UploadSession, job_id: str) -> None:
+    upload_session.job_id = job_id
+    await db.commit()
+
+async def get_upload_session_for_job(db: AsyncSession, job_id: str) -> Optional[models.UploadSession]:
+    result = await db.execute(
+        select(models.UploadSession).filter(models.UploadSession.job_id == job_id)
     )
     return result.scalar_one_or_none()
 
+async def finish_upload_session(
+    db: AsyncSession,
+    upload_session: models.UploadSession,
+    session_status: str,
+    video_id: Optional[str] = None
+) -> models.UploadSession:
+    upload_session.status = session_status
+    upload_session.video_id = video_id
+    await db.commit()
+    await db.refresh(upload_session)
+    return upload_session
+
+# Ingest job operations
+async def create_ingest_job(
+    db: AsyncSession,
+    video_id: Optional[str],
+    user_id: str,
+    kind: str,
+    s3_key: str,
+    bytes_total: int,
+    job_id: Optional[str] = None
+) -> models.IngestJob:
+    db_job = models.IngestJob(
+        id=job_id or str(uuid.uuid4()),
+        video_id=video_id,
+        user_id=user_id,
+        kind=kind,
+        s3_key=s3_key,
+        bytes_total=bytes_total,
+        bytes_processed=0,
+        rows_processed=0,
+        status="pending"
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def set_ingest_job_video(db: AsyncSession, job_id: str, video_id: str) -> None:
+    await db.execute(update(models.IngestJob).where(models.IngestJob.id == job_id).values(video_id=video_id))
+    await db.commit()
+
+async def get_ingest_job(db: AsyncSession, job_id: str, user_id: str) -> Optional[models.IngestJob]:
+    result = await db.execute(
+        select(models.IngestJob)
+        .filter(models.IngestJob.id == job_id)
+        .filter(models.IngestJob.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+async def claim_ingest_job(db: AsyncSession, job_id: str) -> Optional[models.IngestJob]:
+    """Mark a pending job as running, None if another worker got it first"""
+    result = await db.execute(
+        update(models.IngestJob)
+        .where(models.IngestJob.id == job_id)
+        .where(models.IngestJob.status == "pending")
+        .values(status="running", started_at=datetime.utcnow(), bytes_processed=0, rows_processed=0)
+        .returning(models.IngestJob)
+        .execution_options(synchronize_session=False)
+    )
+    job = result.scalar_one_or_none()
+    await db.commit()
+    return job
+
+async def update_ingest_job_progress(db: AsyncSession, job_id: str, rows: int, bytes_processed: int) -> None:
+    await db.execute(
+        update(models.IngestJob)
+        .where(models.IngestJob.id == job_id)
+        .values(rows_processed=rows, bytes_processed=bytes_processed)
+    )
+    await db.commit()
+
+async def finish_ingest_job(
+    db: AsyncSession,
+    job_id: str,
+    job_status: str,
+    rows: Optional[int] = None,
+    error: Optional[Any] = None
+) -> None:
+    values = {"status": job_status, "finished_at": datetime.utcnow(), "error": error}
+    if rows is not None:
+        values["rows_processed"] = rows
+    await db.execute(update(models.IngestJob).where(models.IngestJob.id == job_id).values(**values))
+    await db.commit()
+
+async def retry_ingest_job(db: AsyncSession, job_id: str) -> bool:
+    """Queue a failed job again, False if it is not failed"""
+    result = await db.execute(
+        update(models.IngestJob)
+        .where(models.IngestJob.id == job_id)
+        .where(models.IngestJob.status == "failed")
+        .values(status="pending", error=None, started_at=None, finished_at=None, bytes_processed=0, rows_processed=0)
+        .returning(models.IngestJob.id)
+    )
+    retried = result.scalar_one_or_none() is not None
+    await db.commit()
+    return retried
+
+async def dismiss_ingest_job(db: AsyncSession, job_id: str) -> bool:
+    """Give up on a failed job, False if it is not failed"""
+    result = await db.execute(
+        update(models.IngestJob)
+        .where(models.IngestJob.id == job_id)
+        .where(models.IngestJob.status == "failed")
+        .values(status="dismissed")
+        .returning(models.IngestJob.id)
+    )
+    dismissed = result.scalar_one_or_none() is not None
+    await db.commit()
+    return dismissed
 
-async def create_speed_data_bulk(db: AsyncSession, video_id: str, speed_data: List[dict]) -> List[models.SpeedData]:
-    """Parse and create speed data records from CSV"""
-    db_speed_data = []
+async def requeue_ingest_jobs(db: AsyncSession) -> List[str]:
+    """Reset jobs interrupted by a restart and return the ids of all pending jobs, oldest first"""
+    await db.execute(
+        update(models.IngestJob)
+        .where(models.IngestJob.status == "running")
+        .values(status="pending", started_at=None)
+    )
+    await db.commit()
+    result = await db.execute(
+        select(models.IngestJob.id)
+        .filter(models.IngestJob.status == "pending")
+        .order_by(models.IngestJob.created_at)
+    )
+    return list(result.scalars().all())
+
+async def create_speed_data_bulk(db: AsyncSession, video_id: str, batches: AsyncIterable[SpeedBatch]) -> IngestStats:
+    """Load columnar batches of speed data with COPY in a single transaction,
+    then rebuild the video's downsampling pyramid"""
+    stats = IngestStats()
+    columns = list(SPEED_CSV_COLUMNS.values())
     try:
-        for data in speed_data:
-            # Преобразование заголовков из CSV
-            db_speed_data.append(models.SpeedData(
-                video_id=video_id,
-                timestamp=float(data['Elapsed time (sec)']), 
-                speed=float(data['Speed (km/h)']),
-                latitude=float(data['Latitude']),
-                longitude=float(data['Longitude']),
-                altitude=float(data['Altitude (km)']),
-                accuracy=float(data['Accuracy (km)'])
-            ))
-        
-        db.add_all(db_speed_data)
+        if settings.TELEMETRY_STORE == "columnar" or await get_telemetry_series(db, video_id, "speed"):
+            parts = []
+            async for batch in batches:
+                parts.append(batch)
+                stats.add(batch_size(batch))
+            await append_telemetry_series(db, video_id, "speed", *parts)
+            await bump_data_version(db, video_id)
+            await db.commit()
+            await rebuild_speed_pyramid(db, video_id)
+            return stats
+
+        connection = await db.connection()
+        # COPY is not exposed by SQLAlchemy, use the asyncpg connection underneath
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        async with driver_connection.transaction():
+            async for batch in batches:
+                count = batch_size(batch)
+                records = zip(
+                    (str(uuid.uuid4()) for _ in range(count)),
+                    repeat(video_id, count),
+                    *(batch[column].tolist() for column in columns),
+                    repeat(0.0, count)
+                )
+                await driver_connection.copy_records_to_table(
+                    models.SpeedData.__tablename__,
+                    records=records,
+                    columns=["id", "video_id", *columns, "timestamp_offset"]
+                )
+                stats.add(count)
+        await bump_data_version(db, video_id)
         await db.commit()
-        return db_speed_data
+        await rebuild_speed_pyramid(db, video_id)
+        return stats
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -90,26 +425,181 @@ async def create_speed_data_bulk(db: AsyncSession, video_id: str, speed_data: Li
             detail=f"Error processing speed data: {str(e)}"
         )
 
+# Downsampled speed pyramid
+async def rebuild_speed_pyramid(db: AsyncSession, video_id: str) -> None:
+    """Recompute the LTTB levels of a video's speed series"""
+    columns, _ = await get_telemetry_columns(db, video_id, "speed")
+    timestamps, speed = columns["timestamp"], columns["speed"]
+    pyramid = await asyncio.to_thread(build_pyramid, timestamps, speed)
+    await db.execute(
+        delete(models.TelemetryLevel)
+        .where(models.TelemetryLevel.video_id == video_id)
+        .where(models.TelemetryLevel.series == "speed")
+    )
+    db.add_all([
+        models.TelemetryLevel(
+            video_id=video_id,
+            series="speed",
+            points=points,
+            data=encode_level(timestamps[indices], speed[indices])
+        )
+        for points, indices in pyramid.items()
+    ])
+    await bump_data_version(db, video_id)
+    await db.commit()
+
+async def get_speed_level_sizes(db: AsyncSession, video_id: str) -> List[int]:
+    result = await db.execute(
+        select(models.TelemetryLevel.points)
+        .filter(models.TelemetryLevel.video_id == video_id)
+        .filter(models.TelemetryLevel.series == "speed")
+        .order_by(models.TelemetryLevel.points)
+    )
+    return list(result.scalars().all())
+
+async def get_speed_level(db: AsyncSession, video_id: str, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(timestamps, speeds) of one pyramid level"""
+    result = await db.execute(
+        select(models.TelemetryLevel.data)
+        .filter(models.TelemetryLevel.video_id == video_id)
+        .filter(models.TelemetryLevel.series == "speed")
+        .filter(models.TelemetryLevel.points == points)
+    )
+    return decode_level(result.scalar_one())
+
+async def get_speed_between(
+    db: AsyncSession,
+    video_id: str,
+    start: Optional[float],
+    end: Optional[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(timestamps, speeds) of the raw samples with start <= timestamp < end"""
+    stored = await get_telemetry_series(db, video_id, "speed")
+    if stored is not None:
+        columns = decode_series("speed", stored.data)
+        rows = _time_slice(columns["timestamp"], start, end)
+        return columns["timestamp"][rows], columns["speed"][rows]
+    model = models.SpeedData
+    query = select(model.timestamp, model.speed).filter(model.video_id == video_id)
+    if start is not None:
+        query = query.filter(model.timestamp >= start)
+    if end is not None:
+        query = query.filter(model.timestamp < end)
+    rows = (await db.execute(query.order_by(model.timestamp))).all()
+    if not rows:
+        return np.empty(0), np.empty(0)
+    timestamps, speed = zip(*rows)
+    return np.array(timestamps, dtype=np.float64), np.array(speed, dtype=np.float64)
+
+def _time_slice(timestamps: np.ndarray, start: Optional[float], end: Optional[float]) -> slice:
+    first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+    stop = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+    return slice(first, max(first, stop))
+
+async def get_downsampled_speed(
+    db: AsyncSession,
+    video_id: str,
+    width: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray, Optional[int]]:
+    """At most ``width`` speed samples of [start, end) chosen by LTTB.
+
+    Starts from the coarsest pyramid level that still has ``width`` points in
+    the range, or the raw samples when zoomed in past the finest level.
+    Returns (timestamps, speeds, level point count or None for raw samples).
+    """
+    for points in await get_speed_level_sizes(db, video_id):
+        timestamps, speed = await get_speed_level(db, video_id, points)
+        rows = _time_slice(timestamps, start, end)
+        if rows.stop - rows.start >= width:
+            level = points
+            timestamps, speed = timestamps[rows], speed[rows]
+            break
+    else:
+        level = None
+        timestamps, speed = await get_speed_between(db, video_id, start, end)
+    indices = lttb(timestamps, speed, width)
+    return timestamps[indices], speed[indices], level
+
 # Button data operations
 async def create_button_data_bulk(db: AsyncSession, video_id: str, button_data: List[dict]) -> List[models.ButtonData]:
-    db_button_data = []
-    for data in button_data:
-        try:
-            db_button_data.append(models.ButtonData(
-                video_id=video_id,
-                timestamp=float(data['timestamp']),
-                state=bool(data['state'])
-            ))
-        except (ValueError, KeyError) as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid button data format: {str(e)}"
-            )
-    
+    """Store button samples compacted to state transitions, merged with those already stored"""
+    try:
+        columns = {
+            "timestamp": np.array([float(data['timestamp']) for data in button_data], dtype=np.float64),
+            "state": np.array([bool(data['state']) for data in button_data], dtype=np.bool_)
+        }
+    except (ValueError, KeyError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid button data format: {str(e)}"
+        )
+
+    if settings.TELEMETRY_STORE == "columnar" or await get_telemetry_series(db, video_id, "button"):
+        await append_telemetry_series(db, video_id, "button", columns)
+        await bump_data_version(db, video_id)
+        await db.commit()
+        return await get_button_data(db, video_id)
+
+    await db.execute(select(models.Video.id).filter(models.Video.id == video_id).with_for_update())
+    existing, offset = await _row_series_columns(db, video_id, "button")
+    merged = merge_series("button", existing, columns)
+    timestamps, states = compact_button_states(merged["timestamp"], merged["state"])
+    await db.execute(delete(models.ButtonData).where(models.ButtonData.video_id == video_id))
+
+    db_button_data = [
+        models.ButtonData(video_id=video_id, timestamp=timestamp, state=state, timestamp_offset=offset)
+        for timestamp, state in zip(timestamps.tolist(), states.tolist())
+    ]
     db.add_all(db_button_data)
+    await bump_data_version(db, video_id)
     await db.commit()
     return db_button_data
 
+async def get_button_window(db: AsyncSession, video_id: str, start: float, end: float) -> Tuple[Columns, float]:
+    """Button samples that decide the state over [start, end], and the series offset.
+
+    Row storage answers this with three range scans on (video_id, timestamp),
+    so the cost does not grow with the length of the log.
+    """
+    stored = await get_telemetry_series(db, video_id, "button")
+    if stored is not None:
+        columns = decode_series("button", stored.data)
+        rows = window(columns["timestamp"], start, end)
+        return {name: values[rows] for name, values in columns.items()}, stored.timestamp_offset or 0.0
+
+    model = models.ButtonData
+    query = select(model.timestamp, model.state, model.timestamp_offset).filter(model.video_id == video_id)
+    rows = []
+    for part in (
+        query.filter(model.timestamp <= start).order_by(model.timestamp.desc()).limit(1),
+        query.filter(model.timestamp > start, model.timestamp <= end).order_by(model.timestamp),
+        query.filter(model.timestamp > end).order_by(model.timestamp).limit(1)
+    ):
+        rows += (await db.execute(part)).all()
+    if not rows:
+        return empty_series("button"), 0.0
+    timestamps, states, offsets = zip(*rows)
+    columns = {"timestamp": np.array(timestamps, dtype=np.float64), "state": np.array(states, dtype=np.bool_)}
+    return columns, offsets[0] or 0.0
+
+async def get_button_state_at(db: AsyncSession, video_id: str, t: float) -> Tuple[Optional[bool], float]:
+    """Button state at log time ``t`` (None before the log starts) and the series offset"""
+    columns, offset = await get_button_window(db, video_id, t, t)
+    return state_at(columns["timestamp"], columns["state"], t), offset
+
+async def get_button_intervals(
+    db: AsyncSession,
+    video_id: str,
+    start: float,
+    end: float
+) -> Tuple[List[Interval], float]:
+    """Pressed intervals overlapping [start, end] in log time, and the series offset"""
+    columns, offset = await get_button_window(db, video_id, start, end)
+    intervals = pressed_intervals(columns["timestamp"], columns["state"])
+    return overlapping(intervals, start, end), offset
+
 # Annotation operations
 async def create_annotation(
     db: AsyncSession,
@@ -125,6 +615,7 @@ async def create_annotation(
         button_state=annotation_data.button_state,
     )
     db.add(db_annotation)
+    await bump_data_version(db, video_id)
     await db.commit()
     await db.refresh(db_annotation)
     return db_annotation
@@ -145,11 +636,91 @@ async def create_annotations_bulk(
         db_annotations.append(db_annotation)
     
     db.add_all(db_annotations)
+    await bump_data_version(db, video_id)
     await db.commit()
     return db_annotations
 
 # Video data operations
+# Columnar telemetry store
+SERIES_MODELS = {
+    "speed": models.SpeedData,
+    "button": models.ButtonData,
+    "inference": models.InferenceResult
+}
+
+async def get_telemetry_series(
+    db: AsyncSession,
+    video_id: str,
+    series: str
+) -> Optional[models.TelemetrySeries]:
+    result = await db.execute(
+        select(models.TelemetrySeries)
+        .filter(models.TelemetrySeries.video_id == video_id)
+        .filter(models.TelemetrySeries.series == series)
+    )
+    return result.scalar_one_or_none()
+
+async def _row_series_columns(db: AsyncSession, video_id: str, series: str) -> Tuple[Columns, float]:
+    """A series read from its row table as columns, with its timestamp offset"""
+    model = SERIES_MODELS[series]
+    names = list(SERIES_COLUMNS[series])
+    offset_column = getattr(model, "timestamp_offset", None)
+    fields = [getattr(model, name) for name in names]
+    if offset_column is not None:
+        fields.append(offset_column)
+    result = await db.execute(
+        select(*fields)
+        .filter(model.video_id == video_id)
+        .order_by(model.timestamp)
+    )
+    rows = result.all()
+    if not rows:
+        return empty_series(series), 0.0
+    columns = rows_to_columns(series, [row[:len(names)] for row in rows])
+    offset = rows[0][len(names)] if offset_column is not None else 0.0
+    return columns, offset or 0.0
+
+async def get_telemetry_columns(db: AsyncSession, video_id: str, series: str) -> Tuple[Columns, float]:
+    """Whole series of a video as arrays ordered by timestamp, and its timestamp offset"""
+    stored = await get_telemetry_series(db, video_id, series)
+    if stored is not None:
+        return decode_series(series, stored.data), stored.timestamp_offset or 0.0
+    return await _row_series_columns(db, video_id, series)
+
+async def append_telemetry_series(db: AsyncSession, video_id: str, series: str, *parts: Columns) -> None:
+    """Add samples to a video's columnar series without committing.
+
+    Samples still held in the row table are moved into the blob on the first
+    write, so a series always lives in exactly one store.
+    """
+    # Serialize read-modify-write of the blob per video
+    await db.execute(select(models.Video.id).filter(models.Video.id == video_id).with_for_update())
+    stored = await get_telemetry_series(db, video_id, series)
+    if stored is not None:
+        existing, offset = decode_series(series, stored.data), stored.timestamp_offset
+    else:
+        existing, offset = await _row_series_columns(db, video_id, series)
+        model = SERIES_MODELS[series]
+        await db.execute(delete(model).where(model.video_id == video_id))
+
+    merged = merge_series(series, existing, *parts)
+    if series == "button":
+        merged["timestamp"], merged["state"] = compact_button_states(merged["timestamp"], merged["state"])
+    values = {
+        "row_count": len(merged["timestamp"]),
+        "data": encode_series(series, merged),
+        "updated_at": datetime.utcnow()
+    }
+    await db.execute(
+        pg_insert(models.TelemetrySeries)
+        .values(id=str(uuid.uuid4()), video_id=video_id, series=series, timestamp_offset=offset, **values)
+        .on_conflict_do_update(index_elements=["video_id", "series"], set_=values)
+    )
+
 async def get_speed_data(db: AsyncSession, video_id: str) -> List[models.SpeedData]:
+    stored = await get_telemetry_series(db, video_id, "speed")
+    if stored is not None:
+        return series_rows("speed", video_id, decode_series("speed", stored.data), stored.timestamp_offset)
     result = await db.execute(
         select(models.SpeedData)
         .filter(models.SpeedData.video_id == video_id)
@@ -157,7 +728,51 @@ async def get_speed_data(db: AsyncSession, video_id: str) -> List[models.SpeedDa
     )
     return result.scalars().all()
 
+async def get_telemetry_page(
+    db: AsyncSession,
+    video_id: str,
+    series: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[SeriesCursor] = None
+) -> Tuple[Columns, Optional[SeriesCursor]]:
+    """Samples with start <= timestamp < end in timestamp order, at most ``limit``
+    of them after ``cursor``, and the cursor of the next page (None on the last).
+
+    Row storage reads the page with a range scan on (video_id, timestamp).
+    """
+    stored = await get_telemetry_series(db, video_id, series)
+    if stored is not None:
+        columns = decode_series(series, stored.data)
+        timestamps = columns["timestamp"]
+        rows = _time_slice(timestamps, start, end)
+        first, stop = rows.start, rows.stop
+        if cursor is not None:
+            first = max(first, int(np.searchsorted(timestamps, cursor[0], side="left")) + cursor[1])
+        if limit is not None:
+            stop = min(stop, first + limit + 1)
+        page = {name: values[first:max(first, stop)] for name, values in columns.items()}
+    else:
+        model = SERIES_MODELS[series]
+        query = select(*[getattr(model, name) for name in SERIES_COLUMNS[series]]).filter(model.video_id == video_id)
+        if start is not None:
+            query = query.filter(model.timestamp >= start)
+        if end is not None:
+            query = query.filter(model.timestamp < end)
+        if cursor is not None:
+            query = query.filter(model.timestamp >= cursor[0]).offset(cursor[1])
+        if limit is not None:
+            query = query.limit(limit + 1)
+        result = await db.execute(query.order_by(model.timestamp, model.id))
+        page = rows_to_columns(series, result.all())
+    size, next_cursor = page_cursor(page["timestamp"], limit, cursor)
+    return {name: values[:size] for name, values in page.items()}, next_cursor
+
 async def get_button_data(db: AsyncSession, video_id: str) -> List[models.ButtonData]:
+    stored = await get_telemetry_series(db, video_id, "button")
+    if stored is not None:
+        return series_rows("button", video_id, decode_series("button", stored.data), stored.timestamp_offset)
     result = await db.execute(
         select(models.ButtonData)
         .filter(models.ButtonData.video_id == video_id)
@@ -166,36 +781,45 @@ async def get_button_data(db: AsyncSession, video_id: str) -> List[models.Button
     return result.scalars().all()
 
 # Timestamp operations
+# Offsets are single statements that never load samples, cheap enough for
+# every step of the sync slider
 async def update_video_timestamp_offset(
     db: AsyncSession,
     video_id: str,
     timestamp_offset: float
-) -> models.Video:
-    video = await get_video(db, video_id)
-    if not video:
+) -> None:
+    result = await db.execute(
+        update(models.Video)
+        .where(models.Video.id == video_id)
+        .values(timestamp_offset=timestamp_offset, data_version=models.Video.data_version + 1)
+        .returning(models.Video.id)
+    )
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Video not found")
-        
-    video.timestamp_offset = timestamp_offset
     await db.commit()
-    await db.refresh(video)
-    return video
 
 async def update_button_data_timestamp_offset(
     db: AsyncSession,
     video_id: str,
     timestamp_offset: float
-) -> List[models.ButtonData]:
+) -> None:
+    """Set the offset of a video's button series with one UPDATE in whichever store holds it"""
     result = await db.execute(
-        select(models.ButtonData)
-        .filter(models.ButtonData.video_id == video_id)
+        update(models.TelemetrySeries)
+        .where(models.TelemetrySeries.video_id == video_id)
+        .where(models.TelemetrySeries.series == "button")
+        .values(timestamp_offset=timestamp_offset)
     )
-    button_data = result.scalars().all()
-    
-    for data in button_data:
-        data.timestamp_offset = timestamp_offset
-    
+    if not result.rowcount:
+        # Button rows hold transitions only, and no row is loaded into Python
+        await db.execute(
+            update(models.ButtonData)
+            .where(models.ButtonData.video_id == video_id)
+            .values(timestamp_offset=timestamp_offset)
+        )
+    await bump_data_version(db, video_id)
     await db.commit()
-    return button_data
 
 async def add_video_timestamps(
     db: AsyncSession,
@@ -214,31 +838,86 @@ async def add_video_timestamps(
     return video
 
 # Lock operations
+# A lock is a lease: it expires ANNOTATION_LEASE_SECONDS after lock_time.
+# Taking one is a single conditional UPDATE, so concurrent annotators
+# cannot both get the same video.
+def lease_expires(video: models.Video) -> Optional[datetime]:
+    if video.lock_time is None:
+        return None
+    return video.lock_time + timedelta(seconds=settings.ANNOTATION_LEASE_SECONDS)
+
+def _lease_cutoff() -> datetime:
+    """Leases taken before this have expired"""
+    return datetime.utcnow() - timedelta(seconds=settings.ANNOTATION_LEASE_SECONDS)
+
+def _lease(user_id: str) -> dict:
+    return {"locked_by": user_id, "lock_time": datetime.utcnow(), "status": "in_progress"}
+
+async def claim_next_video(db: AsyncSession, user_id: str) -> Optional[models.Video]:
+    """Lease the next video to annotate, None if the queue is empty.
+
+    Videos whose lease expired come first, then unannotated ones in upload
+    order. Each candidate is picked with FOR UPDATE SKIP LOCKED inside the
+    UPDATE, so concurrent claims never wait on or return the same row, and
+    each scan is served by a partial index.
+    """
+    video = models.Video
+    for condition, order in (
+        ((video.status == "in_progress") & (video.lock_time < _lease_cutoff()), video.lock_time),
+        (video.status == "unannotated", video.upload_date),
+    ):
+        candidate = (
+            select(video.id)
+            .where(condition)
+            .order_by(order)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(video)
+            .where(video.id == candidate)
+            .values(**_lease(user_id))
+            .returning(video)
+            .execution_options(populate_existing=True)
+        )
+        claimed = result.scalar_one_or_none()
+        if claimed is not None:
+            await db.commit()
+            return claimed
+    await db.commit()
+    return None
+
 async def lock_video(
     db: AsyncSession,
     video_id: str,
     user_id: str
 ) -> models.Video:
-    """Lock a video for annotation"""
-    video = await get_video(db, video_id)
-    if not video:
-        raise HTTPException(status_code=404, detail="Video not found")
-        
-    if video.locked_by and video.locked_by != user_id:
-        # Check if lock has expired
-        if video.lock_time and (datetime.utcnow() - video.lock_time).total_seconds() < 3600:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Video is locked by another user"
-            )
-    
-    video.locked_by = user_id
-    video.lock_time = datetime.utcnow()
-    video.status = "in_progress"
-    
+    """Lock a video for annotation, or renew the caller's lease on it"""
+    video = models.Video
+    result = await db.execute(
+        update(video)
+        .where(video.id == video_id)
+        .where(
+            video.locked_by.is_(None)
+            | (video.locked_by == user_id)
+            | video.lock_time.is_(None)
+            | (video.lock_time < _lease_cutoff())
+        )
+        .values(**_lease(user_id))
+        .returning(video)
+        .execution_options(populate_existing=True)
+    )
+    locked = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(video)
-    return video
+    if locked is not None:
+        return locked
+    if await get_video(db, video_id) is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Video is locked by another user"
+    )
 
 async def unlock_video(
     db: AsyncSession,
@@ -246,23 +925,25 @@ async def unlock_video(
     user_id: str
 ) -> models.Video:
     """Unlock a video after annotation"""
-    video = await get_video(db, video_id)
-    if not video:
-        raise HTTPException(status_code=404, detail="Video not found")
-        
-    if video.locked_by != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not allowed to unlock this video"
-        )
-    
-    video.locked_by = None
-    video.lock_time = None
-    video.status = "completed"
-    
+    video = models.Video
+    result = await db.execute(
+        update(video)
+        .where(video.id == video_id)
+        .where(video.locked_by == user_id)
+        .values(locked_by=None, lock_time=None, status="completed")
+        .returning(video)
+        .execution_options(populate_existing=True)
+    )
+    unlocked = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(video)
-    return video
+    if unlocked is not None:
+        return unlocked
+    if await get_video(db, video_id) is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="You are not allowed to unlock this video"
+    )
 
 # Inference operations
 async def create_inference_results_bulk(
@@ -270,6 +951,17 @@ async def create_inference_results_bulk(
     video_id: str,
     predictions: List[dict]
 ) -> List[models.InferenceResult]:
+    if settings.TELEMETRY_STORE == "columnar" or await get_telemetry_series(db, video_id, "inference"):
+        columns = {
+            "timestamp": np.array([pred["timestamp"] for pred in predictions], dtype=np.float64),
+            "predicted_speed": np.array([pred["predicted_speed"] for pred in predictions], dtype=np.float64),
+            "confidence": np.array([pred.get("confidence", 1.0) for pred in predictions], dtype=np.float64)
+        }
+        await append_telemetry_series(db, video_id, "inference", columns)
+        await bump_data_version(db, video_id)
+        await db.commit()
+        return series_rows("inference", video_id, columns, 0.0)
+
     db_results = []
     for pred in predictions:
         db_result = models.InferenceResult(
@@ -281,6 +973,7 @@ async def create_inference_results_bulk(
         db_results.append(db_result)
     
     db.add_all(db_results)
+    await bump_data_version(db, video_id)
     await db.commit()
     return db_results
 
@@ -288,9 +981,91 @@ async def get_inference_results(
     db: AsyncSession,
     video_id: str
 ) -> List[models.InferenceResult]:
+    stored = await get_telemetry_series(db, video_id, "inference")
+    if stored is not None:
+        return series_rows("inference", video_id, decode_series("inference", stored.data), 0.0)
     result = await db.execute(
         select(models.InferenceResult)
         .filter(models.InferenceResult.video_id == video_id)
         .order_by(models.InferenceResult.timestamp)
     )
-    return result.scalars().all()
\ No newline at end of file
+    return result.scalars().all()
+
+# Timeline operations
+async def get_annotation_columns(db: AsyncSession, video_id: str) -> Columns:
+    """Annotations of a video in timestamp order, button_state as 0/1 (NaN if unset)"""
+    result = await db.execute(
+        select(models.Annotation.timestamp, models.Annotation.speed, models.Annotation.button_state)
+        .filter(models.Annotation.video_id == video_id)
+        .order_by(models.Annotation.timestamp)
+    )
+    rows = result.all()
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), 3)
+    return {"timestamp": values[:, 0], "speed": values[:, 1], "button_state": values[:, 2]}
+
+async def get_video_timeline(db: AsyncSession, video_id: str, rate: float) -> Timeline:
+    """Speed, button state and predictions resampled at ``rate`` in video time,
+    with the video's annotations.
+
+    Speed and button log times are shifted by the video offset plus their
+    series offset, predictions and annotations are taken from video time.
+    """
+    result = await db.execute(select(models.Video.timestamp_offset).filter(models.Video.id == video_id))
+    video_offset = result.scalar_one_or_none() or 0.0
+    speed, speed_offset = await get_telemetry_columns(db, video_id, "speed")
+    button, button_offset = await get_telemetry_columns(db, video_id, "button")
+    predictions, _ = await get_telemetry_columns(db, video_id, "inference")
+    return {
+        "timeline": build_timeline(
+            speed, video_offset + speed_offset, button, video_offset + button_offset, predictions, rate
+        ),
+        "annotations": await get_annotation_columns(db, video_id)
+    }
+
+# Alignment operations
+async def estimate_alignment(db: AsyncSession, video_id: str, target: str, max_offset: float) -> Tuple[float, float]:
+    """Estimated offset of ``target`` and the confidence of the estimate.
+
+    - "video": the video offset that lines GPS speed up with predicted speed
+    - "button": the button series offset that lines button transitions up
+      with changes of speed
+    """
+    speed, speed_offset = await get_telemetry_columns(db, video_id, "speed")
+    if target == "video":
+        predictions, _ = await get_telemetry_columns(db, video_id, "inference")
+        offset, confidence = await asyncio.to_thread(
+            estimate_offset,
+            (predictions["timestamp"], predictions["predicted_speed"]),
+            (speed["timestamp"], speed["speed"]),
+            max_offset
+        )
+        return offset - speed_offset, confidence
+
+    button, _ = await get_telemetry_columns(db, video_id, "button")
+    require_samples(speed["timestamp"], button["timestamp"])
+    return await asyncio.to_thread(
+        estimate_offset,
+        change_signal(speed["timestamp"] + speed_offset, speed["speed"]),
+        transition_signal(button["timestamp"], button["state"]),
+        max_offset
+    )
+
+async def auto_align_video(
+    db: AsyncSession,
+    video_id: str,
+    min_confidence: float,
+    max_offset: float
+) -> Optional[float]:
+    """Set the video offset from speed and predictions if it was never set
+    and the estimate is confident enough. Returns the offset applied."""
+    result = await db.execute(select(models.Video.timestamp_offset).filter(models.Video.id == video_id))
+    if result.scalar_one_or_none():
+        return None
+    try:
+        offset, confidence = await estimate_alignment(db, video_id, "video", max_offset)
+    except HTTPException:
+        return None
+    if confidence < min_confidence:
+        return None
+    await update_video_timestamp_offset(db, video_id, offset)
+    return offset
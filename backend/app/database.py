@@ -1,6 +1,8 @@
 # Path: backend/app/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.schema import CreateIndex
 from typing import AsyncGenerator
 import os
 
@@ -20,6 +22,28 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+# create_all only creates missing tables, so columns added to tables that
+# already exist in a deployment are added here. Keep in step with models.py.
+COLUMN_UPGRADES = [
+    "ALTER TABLE videos ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+    "ALTER TABLE videos ADD COLUMN IF NOT EXISTS keyframe_index BYTEA",
+    "ALTER TABLE videos ADD COLUMN IF NOT EXISTS data_version INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE upload_sessions ADD COLUMN IF NOT EXISTS job_id VARCHAR REFERENCES ingest_jobs (id)",
+]
+
+async def upgrade_schema(conn: AsyncConnection) -> None:
+    """Bring an existing database up to the models: create missing tables,
+    add new columns and create every index that does not exist yet.
+
+    All statements are idempotent, so this runs on every startup.
+    """
+    await conn.run_sync(Base.metadata.create_all)
+    for statement in COLUMN_UPGRADES:
+        await conn.execute(text(statement))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            await conn.execute(CreateIndex(index, if_not_exists=True))
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
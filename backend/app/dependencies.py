@@ -1,5 +1,5 @@
 # Path: backend/app/dependencies.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
@@ -8,12 +8,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 from . import crud, models, schemas
 from .database import get_db
+from .storage import ObjectStorage
+from .cache import BlockCache
+from .jobs import IngestWorker
+from .timeline import TimelineCache
+from .telemetry import decode_cursor
+from .config import get_settings
+import hashlib
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+MAX_TELEMETRY_PAGE_SIZE = 100000
+
+settings = get_settings()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -64,6 +74,91 @@ def create_refresh_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def get_storage(request: Request) -> ObjectStorage:
+    """Object storage client created once in the application lifespan"""
+    return request.app.state.storage
+
+def get_video_cache(request: Request) -> Optional[BlockCache]:
+    """Local video block cache, None when disabled"""
+    return getattr(request.app.state, "video_cache", None)
+
+class TelemetryWindow:
+    """start/end/limit/cursor query parameters of telemetry endpoints"""
+
+    def __init__(
+        self,
+        start: Optional[float] = Query(None, description="Only samples with timestamp >= start"),
+        end: Optional[float] = Query(None, description="Only samples with timestamp < end"),
+        limit: Optional[int] = Query(None, ge=1, le=MAX_TELEMETRY_PAGE_SIZE, description="Page size"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+    ):
+        self.start = start
+        self.end = end
+        self.limit = limit
+        self.cursor = decode_cursor(cursor)
+
+    @property
+    def is_set(self) -> bool:
+        return any(value is not None for value in (self.start, self.end, self.limit, self.cursor))
+
+class TelemetryVersion:
+    """Validators of a telemetry response, see get_telemetry_version"""
+
+    def __init__(self, data_version: int, etag: str):
+        self.data_version = data_version
+        self.etag = etag
+        self.headers = {
+            "ETag": etag,
+            "Cache-Control": settings.TELEMETRY_CACHE_CONTROL,
+            "Vary": "Accept"
+        }
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers)
+        return response
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in tags)
+
+async def get_telemetry_version(
+    video_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+) -> TelemetryVersion:
+    """Conditional GET for telemetry reads of a video.
+
+    The strong ETag comes from the video's data version plus the query and
+    Accept header, so checking it costs one primary key lookup. A matching
+    If-None-Match ends the request with 304 before any telemetry is read.
+    Endpoints returning a Response themselves pass it through apply().
+    """
+    data_version = await crud.get_video_data_version(db, video_id)
+    if data_version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+    representation = f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}"
+    digest = hashlib.sha256(representation.encode()).hexdigest()[:16]
+    version = TelemetryVersion(data_version, f'"{video_id}.{data_version}.{digest}"')
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, version.etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=version.headers)
+    version.apply(response)
+    return version
+
+def get_timeline_cache(request: Request) -> Optional[TimelineCache]:
+    """In-memory cache of resampled timelines, None outside the application lifespan"""
+    return getattr(request.app.state, "timeline_cache", None)
+
+def get_ingest_worker(request: Request) -> IngestWorker:
+    """Background telemetry ingest worker started in the application lifespan"""
+    return request.app.state.ingest_worker
+
 async def get_video_or_404(
     video_id: str,
     db: AsyncSession = Depends(get_db)
@@ -0,0 +1,79 @@
+# Path: backend/app/downsample.py
+import io
+from typing import Dict, List
+import numpy as np
+
+# Points of the coarsest pyramid level, each finer level has LEVEL_FACTOR times more
+MIN_LEVEL_POINTS = 512
+LEVEL_FACTOR = 4
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; from each bucket in between
+    the point forming the largest triangle with the previously selected point
+    and the mean of the next bucket is kept, which preserves peaks. Bucket
+    means are computed for all buckets at once, the loop only picks the
+    maximum inside each bucket. ``x`` must be sorted.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    means_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    means_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # The last bucket looks ahead to the last point instead of a bucket mean
+    next_x = np.append(means_x[1:], x[-1])
+    next_y = np.append(means_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    # Python scalars keep the per-bucket overhead low
+    xs, ys = x.tolist(), y.tolist()
+    bounds = edges.tolist()
+    next_x, next_y = next_x.tolist(), next_y.tolist()
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        # Twice the triangle area as a linear function of the candidate point
+        dx, dy = xs[a] - next_x[i], next_y[i] - ys[a]
+        area = np.abs(dx * y[lo:hi] + dy * x[lo:hi] - (dx * ys[a] + dy * xs[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def level_sizes(n: int) -> List[int]:
+    """Point counts of the pyramid levels for a series of ``n`` samples, coarsest first"""
+    sizes = []
+    points = MIN_LEVEL_POINTS
+    while points * 2 <= n:
+        sizes.append(points)
+        points *= LEVEL_FACTOR
+    return sizes
+
+
+def build_pyramid(timestamps: np.ndarray, values: np.ndarray) -> Dict[int, np.ndarray]:
+    """Indices into the series kept at each level, keyed by the level's point count"""
+    return {points: lttb(timestamps, values, points) for points in level_sizes(len(timestamps))}
+
+
+def encode_level(timestamps: np.ndarray, values: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        timestamp=np.asarray(timestamps, dtype=np.float64),
+        value=np.asarray(values, dtype=np.float64)
+    )
+    return buffer.getvalue()
+
+
+def decode_level(data: bytes):
+    """(timestamps, values) of an encoded level"""
+    with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+        return arrays["timestamp"], arrays["value"]
@@ -0,0 +1,47 @@
+# Path: backend/app/faststart.py
+import asyncio
+import logging
+from .mp4 import Mp4Error, faststart_layout, read_moov
+from .storage import ObjectStorage
+
+logger = logging.getLogger(__name__)
+
+
+async def faststart_copy(
+    storage: ObjectStorage,
+    source_key: str,
+    target_key: str,
+    part_size: int,
+    max_concurrency: int
+) -> bool:
+    """Write ``source_key`` to ``target_key`` with moov in front of mdat.
+
+    Browsers can start playback after reading the head of the file instead of
+    seeking to the end for moov. Media data is copied server-side, no frame
+    is re-encoded. Returns False, leaving both objects alone, if the file is
+    not an MP4 or is already laid out for progressive playback.
+    """
+    try:
+        metadata = await storage.head(source_key)
+        file_size = metadata["ContentLength"]
+        boxes, moov, moov_data = await read_moov(
+            lambda start, end: storage.get_range(source_key, start, end),
+            file_size
+        )
+        # Patching every chunk offset is pure Python, keep it off the event loop
+        pieces = await asyncio.to_thread(faststart_layout, boxes, moov, moov_data, file_size)
+    except Mp4Error as e:
+        logger.info(f"Not rewriting {source_key} for faststart: {str(e)}")
+        return False
+    if pieces is None:
+        return False
+
+    await storage.compose(
+        target_key,
+        source_key,
+        pieces,
+        content_type=metadata.get("ContentType") or "video/mp4",
+        part_size=part_size,
+        max_concurrency=max_concurrency
+    )
+    return True
@@ -0,0 +1,186 @@
+# Path: backend/app/formats.py
+import json
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+import orjson
+from fastapi import Header, HTTPException, status
+from starlette.responses import Response, StreamingResponse
+from .telemetry import Columns
+
+try:
+    import msgpack
+except ImportError:  # msgpack responses are not offered without it
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # Arrow responses are not offered without it
+    pyarrow = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+COLUMNS = "application/x-columns"  # Packed little-endian column buffers
+
+MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK}
+
+PACKED_DTYPES = {"float64": "<f8", "float32": "<f4"}
+
+JSON_CHUNK_ROWS = 10000  # Rows serialized per chunk of a streamed JSON array
+
+# Named tables of equally long columns, e.g. {"speed_data": {...}, "button_data": {...}}
+Tables = Dict[str, Columns]
+
+
+class WireFormat(NamedTuple):
+    media_type: str
+    dtype: str = "float64"  # Float width of COLUMNS bodies
+
+    @property
+    def is_json(self) -> bool:
+        return self.media_type == JSON
+
+
+def _available(media_type: str) -> bool:
+    if media_type == MSGPACK:
+        return msgpack is not None
+    if media_type == ARROW:
+        return pyarrow is not None
+    return media_type in (JSON, COLUMNS)
+
+
+def negotiate(accept: Optional[str]) -> WireFormat:
+    """Pick the response format from an Accept header, JSON unless something else is preferred"""
+    if not accept:
+        return WireFormat(JSON)
+    candidates = []
+    for position, entry in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        media_type = MEDIA_TYPE_ALIASES.get(media_type.lower(), media_type.lower())
+        options = dict(param.split("=", 1) for param in params if "=" in param)
+        try:
+            quality = float(options.get("q", 1))
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type, options))
+
+    for _, _, media_type, options in sorted(candidates):
+        if media_type in ("*/*", "application/*"):
+            return WireFormat(JSON)
+        if not _available(media_type):
+            continue
+        dtype = options.get("dtype", "float64")
+        if media_type == COLUMNS and dtype not in PACKED_DTYPES:
+            continue
+        return WireFormat(media_type, dtype)
+
+    raise HTTPException(
+        status_code=status.HTTP_406_NOT_ACCEPTABLE,
+        detail=f"Supported formats: {', '.join(t for t in (JSON, MSGPACK, ARROW, COLUMNS) if _available(t))}"
+    )
+
+
+def get_wire_format(accept: Optional[str] = Header(None)) -> WireFormat:
+    return negotiate(accept)
+
+
+def json_rows(columns: Columns, names: List[str]) -> List[dict]:
+    """Row objects for JSON responses, built from whole columns at a time"""
+    return [dict(zip(names, values)) for values in zip(*(columns[name].tolist() for name in names))]
+
+
+async def _json_body(
+    status_text: str,
+    message: str,
+    data: Dict[str, Any],
+    arrays: Dict[str, Tuple[Columns, List[str]]],
+    chunk_rows: int
+) -> AsyncIterator[bytes]:
+    yield orjson.dumps({"status": status_text, "message": message})[:-1] + b',"data":' + orjson.dumps(data)[:-1]
+    for i, (key, (columns, names)) in enumerate(arrays.items()):
+        yield (b"," if data or i else b"") + orjson.dumps(key) + b":["
+        count = len(columns[names[0]])
+        for start in range(0, count, chunk_rows):
+            chunk = json_rows({name: columns[name][start:start + chunk_rows] for name in names}, names)
+            yield (b"," if start else b"") + orjson.dumps(chunk)[1:-1]
+        yield b"]"
+    yield b"}}"
+
+
+def json_response(
+    message: str,
+    data: Dict[str, Any],
+    arrays: Dict[str, Tuple[Columns, List[str]]],
+    chunk_rows: int = JSON_CHUNK_ROWS
+) -> StreamingResponse:
+    """DataResponse-shaped JSON body streamed a chunk of rows at a time.
+
+    ``data`` holds the scalar fields of the ``data`` object, each entry of
+    ``arrays`` becomes a list of row objects built from the named columns.
+    The body is encoded with orjson and skips response_model validation;
+    neither the full list of row objects nor the full body is ever built.
+    """
+    return StreamingResponse(
+        _json_body("success", message, data, arrays, chunk_rows),
+        media_type=JSON,
+        headers={"Vary": "Accept"}
+    )
+
+
+def _header_value(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def columns_response(wire_format: WireFormat, tables: Tables, metadata: Dict[str, Any]) -> Response:
+    """Binary response built from whole column arrays, without per-row objects.
+
+    - msgpack: a map with ``metadata`` entries and one map of column name to
+      little-endian float64 bytes per table
+    - Arrow IPC stream: one record batch with a ``table.column`` field per
+      column, shorter tables padded with nulls; row counts and ``metadata``
+      are in the schema metadata
+    - packed columns: the column buffers back to back, described by the
+      ``X-Columns`` header as ``table.column:rows`` entries in body order
+    """
+    headers = {"Vary": "Accept"}
+    if wire_format.media_type == MSGPACK:
+        body = msgpack.packb({
+            **metadata,
+            "dtype": "<f8",
+            **{
+                table: {name: np.ascontiguousarray(values, dtype="<f8").tobytes() for name, values in columns.items()}
+                for table, columns in tables.items()
+            }
+        })
+        return Response(body, media_type=MSGPACK, headers=headers)
+
+    if wire_format.media_type == ARROW:
+        rows = {table: len(next(iter(columns.values()))) for table, columns in tables.items()}
+        length = max(rows.values(), default=0)
+        arrays, names = [], []
+        for table, columns in tables.items():
+            for name, values in columns.items():
+                array = pyarrow.array(values)
+                if len(values) < length:
+                    array = pyarrow.concat_arrays([array, pyarrow.nulls(length - len(values), array.type)])
+                arrays.append(array)
+                names.append(f"{table}.{name}")
+        schema_metadata = {"metadata": json.dumps(metadata), "rows": json.dumps(rows)}
+        batch = pyarrow.RecordBatch.from_arrays(arrays, names=names, metadata=schema_metadata)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return Response(sink.getvalue().to_pybytes(), media_type=ARROW, headers=headers)
+
+    dtype = PACKED_DTYPES[wire_format.dtype]
+    buffers, layout = [], []
+    for table, columns in tables.items():
+        for name, values in columns.items():
+            buffers.append(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            layout.append(f"{table}.{name}:{len(values)}")
+    headers["X-Columns"] = ",".join(layout)
+    for key, value in metadata.items():
+        headers[f"X-{key.replace('_', '-').title()}"] = _header_value(value)
+    return Response(b"".join(buffers), media_type=f"{COLUMNS}; dtype={wire_format.dtype}", headers=headers)
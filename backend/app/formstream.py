@@ -0,0 +1,128 @@
+# Path: backend/app/formstream.py
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+from fastapi import HTTPException, Request, status
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartFileReader:
+    """Incrementally reads one file field out of a multipart/form-data request.
+
+    Unlike ``UploadFile`` the body is never spooled: data is handed out in the
+    chunks it arrives in, so memory use does not depend on the file size.
+    """
+
+    def __init__(self, request: Request, field_name: str):
+        self.request = request
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+
+        self._stream = request.stream().__aiter__()
+        self._parser: Optional[MultipartParser] = None
+        self._pending: Deque[bytes] = deque()
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_name = b""
+        self._header_value = b""
+        self._in_field = False
+        self._found = False
+        self._done = False
+
+    # Parser callbacks
+    def _on_part_begin(self) -> None:
+        self._headers = []
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if self._found or name != self.field_name or b"filename" not in options:
+            return
+        self._found = True
+        self._in_field = True
+        self.filename = options[b"filename"].decode("utf-8", "replace")
+        self.content_type = headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_field:
+            self._in_field = False
+            self._done = True
+
+    def _init_parser(self) -> None:
+        content_type = self.request.headers.get("content-type", "")
+        media_type, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if media_type != b"multipart/form-data" or not boundary:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data request"
+            )
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    async def _feed(self) -> bool:
+        """Feed the next request chunk to the parser, returns False at end of body"""
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            return False
+        try:
+            self._parser.write(chunk)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Malformed multipart body: {str(e)}"
+            )
+        return True
+
+    async def open(self) -> "MultipartFileReader":
+        """Consume the body up to the start of the file field"""
+        self._init_parser()
+        while not self._found:
+            if not await self._feed():
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Missing file field '{self.field_name}'"
+                )
+        return self
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Yield the file contents as they are received"""
+        while True:
+            while self._pending:
+                chunk = self._pending.popleft()
+                if chunk:
+                    yield chunk
+            if self._done:
+                return
+            if not await self._feed():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Request body ended before the file was complete"
+                )
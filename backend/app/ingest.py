@@ -0,0 +1,277 @@
+# Path: backend/app/ingest.py
+import codecs
+import csv
+import time
+import zlib
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException, status
+
+try:
+    import zstandard
+except ImportError:  # zstd bodies are rejected without it
+    zstandard = None
+
+# CSV header -> speed_data column
+SPEED_CSV_COLUMNS = {
+    'Elapsed time (sec)': 'timestamp',
+    'Speed (km/h)': 'speed',
+    'Latitude': 'latitude',
+    'Longitude': 'longitude',
+    'Altitude (km)': 'altitude',
+    'Accuracy (km)': 'accuracy'
+}
+
+# Inclusive bounds of values that are physically possible
+VALID_RANGES = {
+    'latitude': (-90.0, 90.0),
+    'longitude': (-180.0, 180.0),
+    'speed': (0.0, np.inf)
+}
+
+BATCH_SIZE = 50000
+MAX_REPORTED_ERRORS = 100
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Columnar batch: speed_data column -> float64 array, all of the same length
+SpeedBatch = Dict[str, np.ndarray]
+
+
+def batch_size(batch: SpeedBatch) -> int:
+    return len(next(iter(batch.values()), []))
+
+
+
+def parse_button_data(content: bytes) -> List[dict]:
+    """Parse ``timestamp,state`` lines of a button data file"""
+    button_data = []
+    try:
+        lines = content.decode().splitlines()
+        for line in lines:
+            timestamp, state = line.strip().split(',')
+            button_data.append({
+                'timestamp': float(timestamp),
+                'state': state == '1'
+            })
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid button data format: {str(e)}"
+        )
+    return button_data
+
+
+async def iter_decompressed(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pass chunks through, decompressing gzip or zstd bodies detected by their magic bytes"""
+    head = b""
+    async for chunk in chunks:
+        head += chunk
+        if len(head) >= 4:
+            break
+    if head.startswith(GZIP_MAGIC):
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    elif head.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="zstd compressed uploads are not supported on this server"
+            )
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        if head:
+            yield head
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    gzip = head.startswith(GZIP_MAGIC)
+    try:
+        data = head
+        while True:
+            output = decompressor.decompress(data)
+            # gzip files may hold several members back to back
+            while gzip and decompressor.eof and decompressor.unused_data:
+                rest = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+                output += decompressor.decompress(rest)
+            if output:
+                yield output
+            try:
+                data = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+    except (zlib.error, getattr(zstandard, "ZstdError", zlib.error)) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid compressed CSV: {str(e)}"
+        )
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, List[str]]]:
+    """Decode and split CSV records as chunks arrive, yielding (line number, fields).
+
+    Records are split on line breaks, so quoted fields spanning lines are
+    not supported; telemetry files only hold numbers and dates.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_number = 0
+    try:
+        async for chunk in chunks:
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            pending = lines.pop()
+            for row in csv.reader(lines, skipinitialspace=True):
+                line_number += 1
+                if row:
+                    yield line_number, row
+        tail = pending + decoder.decode(b"", final=True)
+        for row in csv.reader([tail], skipinitialspace=True):
+            if row:
+                yield line_number + 1, row
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid CSV format: {str(e)}"
+        )
+
+
+def _to_float(values: List[str]) -> np.ndarray:
+    """Parse a column of strings, NaN where a cell is not a number"""
+    try:
+        # Casting from object avoids building a fixed-width unicode array first
+        return np.array(values, dtype=object).astype(np.float64)
+    except (ValueError, TypeError):
+        # Only batches with bad cells take the per-cell path
+        parsed = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except ValueError:
+                parsed[i] = np.nan
+        return parsed
+
+
+class SpeedCsvValidator:
+    """Converts raw CSV columns to float arrays and collects per-row errors.
+
+    All checks are array operations over a whole batch. The running maximum
+    of ``Elapsed time (sec)`` is carried between batches so monotonicity is
+    checked across batch boundaries.
+    """
+
+    def __init__(self, max_errors: int = MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.errors: List[dict] = []
+        self.error_count = 0
+        self.last_timestamp = -np.inf
+
+    def add_error(self, line: int, column: Optional[str], reason: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": line, "column": column, "reason": reason})
+
+    def _report(self, lines: np.ndarray, mask: np.ndarray, column: str, reason: str) -> None:
+        for i in np.flatnonzero(mask):
+            self.add_error(int(lines[i]), column, reason)
+
+    def convert(self, raw: Dict[str, List[str]], lines: np.ndarray) -> SpeedBatch:
+        batch: SpeedBatch = {}
+        for header, column in SPEED_CSV_COLUMNS.items():
+            values = _to_float(raw[column])
+            invalid = ~np.isfinite(values)
+            self._report(lines, invalid, header, "not a finite number")
+            if column in VALID_RANGES:
+                low, high = VALID_RANGES[column]
+                with np.errstate(invalid="ignore"):
+                    outside = (values < low) | (values > high)
+                self._report(lines, outside, header, f"outside [{low}, {high}]")
+            batch[column] = values
+
+        timestamps = batch["timestamp"]
+        finite = np.where(np.isfinite(timestamps), timestamps, -np.inf)
+        running_max = np.maximum.accumulate(np.concatenate(([self.last_timestamp], finite)))
+        decreasing = timestamps < running_max[:-1]
+        self._report(lines, decreasing, "Elapsed time (sec)", "earlier than a previous row")
+        self.last_timestamp = running_max[-1]
+        return batch
+
+    def raise_if_invalid(self) -> None:
+        if self.error_count:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": f"{self.error_count} invalid values in CSV, nothing was imported",
+                    "error_count": self.error_count,
+                    "errors": self.errors
+                }
+            )
+
+
+async def iter_speed_csv(chunks: AsyncIterator[bytes], size: int = BATCH_SIZE) -> AsyncIterator[SpeedBatch]:
+    """Columnar batches from a (possibly compressed) speed CSV byte stream.
+
+    The header is validated once; memory use depends on ``size``, not on the
+    file size. Once a row fails validation no further batches are yielded,
+    but parsing continues so the 422 report lists every bad row (up to
+    MAX_REPORTED_ERRORS).
+    """
+    rows = iter_csv_rows(iter_decompressed(chunks))
+    try:
+        _, header = await rows.__anext__()
+        header = [name.strip() for name in header]
+    except StopAsyncIteration:
+        header = []
+    missing = set(SPEED_CSV_COLUMNS) - set(header)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid CSV format. Required columns: {set(SPEED_CSV_COLUMNS)}"
+        )
+    indexes = {column: header.index(name) for name, column in SPEED_CSV_COLUMNS.items()}
+    validator = SpeedCsvValidator()
+
+    def flush(raw: Dict[str, List[str]], lines: List[int]) -> Optional[SpeedBatch]:
+        batch = validator.convert(raw, np.array(lines))
+        return None if validator.error_count else batch
+
+    raw: Dict[str, List[str]] = {column: [] for column in indexes}
+    lines: List[int] = []
+    async for line, row in rows:
+        if len(row) != len(header):
+            validator.add_error(line, None, f"expected {len(header)} fields, got {len(row)}")
+            continue
+        for column, index in indexes.items():
+            raw[column].append(row[index])
+        lines.append(line)
+        if len(lines) == size:
+            batch = flush(raw, lines)
+            if batch is not None:
+                yield batch
+            elif validator.error_count >= validator.max_errors:
+                break
+            raw = {column: [] for column in indexes}
+            lines = []
+    if lines:
+        batch = flush(raw, lines)
+        if batch is not None:
+            yield batch
+    validator.raise_if_invalid()
+
+
+class IngestStats:
+    """Row count and throughput of one ingestion"""
+
+    def __init__(self):
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        self.seconds = time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
@@ -0,0 +1,61 @@
+# Path: backend/app/intervals.py
+from typing import List, Optional, Tuple
+import numpy as np
+
+Interval = Tuple[float, float]  # [start, end)
+
+
+def compact_button_states(timestamps: np.ndarray, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Run-length compaction of a button log into its transitions.
+
+    Keeps the first sample, every sample whose state differs from the one
+    before it, and the last sample so the end of the log is still known.
+    The state at any time is unchanged by this.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    states = np.asarray(states, dtype=np.bool_)
+    order = np.argsort(timestamps, kind="stable")
+    timestamps, states = timestamps[order], states[order]
+    if len(timestamps) <= 2:
+        return timestamps, states
+    keep = np.empty(len(states), dtype=np.bool_)
+    keep[0] = keep[-1] = True
+    keep[1:-1] = states[1:-1] != states[:-2]
+    return timestamps[keep], states[keep]
+
+
+def state_at(timestamps: np.ndarray, states: np.ndarray, t: float) -> Optional[bool]:
+    """State of the last sample at or before ``t``, None before the log starts"""
+    i = int(np.searchsorted(timestamps, t, side="right")) - 1
+    return bool(states[i]) if i >= 0 else None
+
+
+def pressed_intervals(timestamps: np.ndarray, states: np.ndarray) -> List[Interval]:
+    """Intervals during which the button was pressed.
+
+    A press still held at the last sample ends there. Samples must be ordered
+    by timestamp; repeated states are allowed.
+    """
+    timestamps, states = compact_button_states(timestamps, states)
+    if not len(timestamps):
+        return []
+    changes = np.flatnonzero(np.diff(states.astype(np.int8))) + 1
+    bounds = np.concatenate(([0], changes, [len(states) - 1]))
+    return [
+        (float(timestamps[start]), float(timestamps[end]))
+        for start, end in zip(bounds[:-1], bounds[1:])
+        if states[start] and timestamps[end] > timestamps[start]
+    ]
+
+
+def window(timestamps: np.ndarray, start: float, end: float) -> slice:
+    """Samples needed to know the state over [start, end]: the last one at or
+    before ``start``, those inside, and the first one after ``end``"""
+    first = max(int(np.searchsorted(timestamps, start, side="right")) - 1, 0)
+    last = int(np.searchsorted(timestamps, end, side="right")) + 1
+    return slice(first, last)
+
+
+def overlapping(intervals: List[Interval], start: float, end: float) -> List[Interval]:
+    """Intervals that overlap [start, end]"""
+    return [interval for interval in intervals if interval[1] > start and interval[0] <= end]
@@ -0,0 +1,171 @@
+# Path: backend/app/jobs.py
+import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, Set
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, models
+from .content import register_uploaded_video
+from .database import AsyncSessionLocal
+from .ingest import SpeedBatch, batch_size, iter_speed_csv, parse_button_data
+from .storage import ObjectStorage, hashing_stream
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("succeeded", "failed", "dismissed")
+
+
+class JobProgress:
+    """Counts bytes read and rows parsed for a job and stores them as it goes.
+
+    Progress is written through its own session, because the job's data is
+    loaded in a single transaction that is only visible once it commits.
+    """
+
+    def __init__(self, session_factory, job_id: str):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.bytes = 0
+        self.rows = 0
+
+    async def count_bytes(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            self.bytes += len(chunk)
+            yield chunk
+
+    async def count_rows(self, batches: AsyncIterator[SpeedBatch]) -> AsyncIterator[SpeedBatch]:
+        async for batch in batches:
+            self.rows += batch_size(batch)
+            await self.save()
+            yield batch
+
+    async def save(self) -> None:
+        async with self.session_factory() as db:
+            await crud.update_ingest_job_progress(db, self.job_id, self.rows, self.bytes)
+
+
+class IngestWorker:
+    """Runs ingest jobs in the background, at most ``max_concurrency`` at a time.
+
+    Jobs live in the ingest_jobs table and their files in S3, so queued work
+    survives a restart: start() picks up jobs that were pending or were
+    interrupted while running. A job's file is deleted once it succeeds; a
+    failed job keeps it until it is retried or dismissed. Assumes one worker
+    per database.
+    """
+
+    def __init__(self, session_factory, storage: ObjectStorage, max_concurrency: int):
+        self.session_factory = session_factory
+        self.storage = storage
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_settings(cls, settings, storage: ObjectStorage) -> "IngestWorker":
+        return cls(AsyncSessionLocal, storage, max_concurrency=settings.INGEST_MAX_CONCURRENCY)
+
+    async def start(self) -> None:
+        async with self.session_factory() as db:
+            job_ids = await crud.requeue_ingest_jobs(db)
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} ingest jobs")
+
+    def submit(self, job_id: str) -> None:
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def join(self) -> None:
+        """Wait until every submitted job has finished"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        # Interrupted jobs stay "running" and are requeued by the next start()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job_id: str) -> None:
+        async with self._semaphore:
+            async with self.session_factory() as db:
+                job = await crud.claim_ingest_job(db, job_id)
+                if job is None:
+                    return
+                # Attributes expire on rollback, keep what is needed afterwards
+                s3_key, kind = job.s3_key, job.kind
+                try:
+                    rows = await self._process(db, job)
+                except HTTPException as e:
+                    await db.rollback()
+                    await crud.finish_ingest_job(db, job_id, "failed", error=e.detail)
+                except Exception as e:
+                    logger.exception(f"Ingest job {job_id} failed")
+                    await db.rollback()
+                    await crud.finish_ingest_job(db, job_id, "failed", error=str(e))
+                else:
+                    await crud.finish_ingest_job(db, job_id, "succeeded", rows=rows)
+                    logger.info(f"Ingest job {job_id} ({kind}) succeeded with {rows} rows")
+                    await self.storage.delete(s3_key)
+
+    async def _process(self, db: AsyncSession, job: models.IngestJob) -> int:
+        """Load the job's file, returning the number of rows stored"""
+        progress = JobProgress(self.session_factory, job.id)
+        stream = await self.storage.get(job.s3_key)
+        chunks = progress.count_bytes(stream.iter_chunks())
+
+        if job.kind == "speed_csv":
+            stats = await crud.create_speed_data_bulk(db, job.video_id, progress.count_rows(iter_speed_csv(chunks)))
+            return stats.rows
+
+        if job.kind == "button_data":
+            content = b"".join([chunk async for chunk in chunks])
+            await progress.save()
+            button_data = parse_button_data(content)
+            await crud.create_button_data_bulk(db, job.video_id, button_data)
+            return len(button_data)
+
+        if job.kind == "video_upload":
+            await self._register_upload(db, job, progress, chunks)
+            return 0
+
+        raise ValueError(f"Unknown ingest job kind: {job.kind}")
+
+    async def _register_upload(
+        self,
+        db: AsyncSession,
+        job: models.IngestJob,
+        progress: JobProgress,
+        chunks: AsyncIterator[bytes]
+    ) -> None:
+        """Hash an assembled resumable upload, then store it and create its video.
+
+        Parts arrive in any order, so the hash is only known once they are
+        assembled; reading the whole object back happens here instead of in
+        the /complete request.
+        """
+        upload_session = await crud.get_upload_session_for_job(db, job.id)
+        digest = hashlib.sha256()
+        async for _ in hashing_stream(chunks, digest):
+            pass
+        await progress.save()
+
+        content_hash = digest.hexdigest()
+        if upload_session.content_hash and upload_session.content_hash != content_hash:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded content does not match the declared sha256"
+            )
+        video, _ = await register_uploaded_video(
+            db,
+            self.storage,
+            job.s3_key,
+            content_hash,
+            filename=upload_session.filename,
+            user_id=job.user_id
+        )
+        await crud.set_ingest_job_video(db, job.id, video.id)
+        await crud.finish_upload_session(db, upload_session, "completed", video.id)
@@ -2,9 +2,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.database import async_engine, Base
-from app.routers import auth, videos, annotations, inference
+from app.database import async_engine, upgrade_schema
+from app.routers import auth, videos, annotations, inference, uploads, jobs
 from app.config import get_settings
+from app.storage import ObjectStorage
+from app.cache import BlockCache
+from app.jobs import IngestWorker
+from app.timeline import TimelineCache
 import logging
 import sys
 
@@ -26,12 +30,22 @@ async def lifespan(app: FastAPI):
     import os
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     
-    # Create tables on startup
+    # Create tables and apply column and index upgrades on startup
     async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables created")
+        await upgrade_schema(conn)
+    logger.info("Database schema is up to date")
+
+    # One pooled object storage client shared by all requests
+    app.state.storage = ObjectStorage.from_settings(settings)
+    if settings.VIDEO_CACHE_ENABLED:
+        app.state.video_cache = BlockCache.from_settings(settings)
+    app.state.timeline_cache = TimelineCache.from_settings(settings)
+    app.state.ingest_worker = IngestWorker.from_settings(settings, app.state.storage)
+    await app.state.ingest_worker.start()
     yield
     # Cleanup
+    await app.state.ingest_worker.close()
+    app.state.storage.close()
     logger.info("Application shutting down")
 
 app = FastAPI(
@@ -48,13 +62,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Columns", "X-Video-Id", "X-Next-Cursor", "ETag"],
 )
 
 # Include routers
 app.include_router(auth.router)
+app.include_router(uploads.router)
 app.include_router(videos.router)
 app.include_router(annotations.router)
 app.include_router(inference.router)
+app.include_router(jobs.router)
 
 @app.get("/health")
 async def health_check():
@@ -1,5 +1,5 @@
 # Path: backend/app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Boolean, Float, JSON, LargeBinary, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -30,13 +30,22 @@ class User(Base):
 
 class Video(Base):
     __tablename__ = "videos"
+    # Partial indexes for the annotation queue: waiting videos in upload
+    # order, and leases in progress by age to find expired ones
+    __table_args__ = (
+        Index("ix_videos_unannotated_upload_date", "upload_date", postgresql_where=text("status = 'unannotated'")),
+        Index("ix_videos_in_progress_lock_time", "lock_time", postgresql_where=text("status = 'in_progress'")),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     filename = Column(String)
     s3_key = Column(String)
+    content_hash = Column(String, index=True, nullable=True)  # SHA-256 of the uploaded file
     upload_date = Column(DateTime, default=datetime.utcnow)
     status = Column(String, default="unannotated")  # unannotated, in_progress, completed
     timestamp_offset = Column(Float, default=0.0)  # For video time synchronization
+    keyframe_index = Column(LargeBinary, nullable=True)  # Serialized mp4.KeyframeIndex
+    data_version = Column(Integer, default=0, nullable=False)  # Bumped by every write to the video's data
     
     user_id = Column(String, ForeignKey("users.id"))
     locked_by = Column(String, ForeignKey("users.id"), nullable=True)
@@ -48,9 +57,46 @@ class Video(Base):
     button_data = relationship("ButtonData", back_populates="video", cascade="all, delete-orphan")
     annotations = relationship("Annotation", back_populates="video", cascade="all, delete-orphan")
     inference_results = relationship("InferenceResult", back_populates="video", cascade="all, delete-orphan")
+    telemetry_series = relationship("TelemetrySeries", back_populates="video", cascade="all, delete-orphan")
+    telemetry_levels = relationship("TelemetryLevel", back_populates="video", cascade="all, delete-orphan")
+
+class UploadSession(Base):
+    """Resumable upload backed by an S3 multipart upload"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"))
+    filename = Column(String)
+    content_type = Column(String)
+    s3_key = Column(String)
+    s3_upload_id = Column(String)
+    chunk_size = Column(BigInteger)
+    total_size = Column(BigInteger)
+    content_hash = Column(String, nullable=True)  # Declared by the client, verified on completion
+    direct = Column(Boolean, default=False)  # Chunks go straight to S3 through presigned URLs
+    status = Column(String, default="active")  # active, completing, completed, aborted
+    created_at = Column(DateTime, default=datetime.utcnow)
+    video_id = Column(String, ForeignKey("videos.id"), nullable=True)
+    job_id = Column(String, ForeignKey("ingest_jobs.id"), nullable=True)  # Registers the video once assembled
+
+    chunks = relationship("UploadChunk", back_populates="session", cascade="all, delete-orphan")
+
+class UploadChunk(Base):
+    __tablename__ = "upload_chunks"
+    __table_args__ = (UniqueConstraint("session_id", "chunk_number"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = Column(String, ForeignKey("upload_sessions.id"))
+    chunk_number = Column(Integer)  # 1-based, same as the S3 part number
+    etag = Column(String)
+    size = Column(BigInteger)
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+    session = relationship("UploadSession", back_populates="chunks")
 
 class SpeedData(Base):
     __tablename__ = "speed_data"
+    __table_args__ = (Index("ix_speed_data_video_id_timestamp", "video_id", "timestamp"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String, ForeignKey("videos.id"))
@@ -65,7 +111,9 @@ class SpeedData(Base):
     video = relationship("Video", back_populates="speed_data")
 
 class ButtonData(Base):
+    """Button state transitions, see app.intervals.compact_button_states"""
     __tablename__ = "button_data"
+    __table_args__ = (Index("ix_button_data_video_id_timestamp", "video_id", "timestamp"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String, ForeignKey("videos.id"))
@@ -93,6 +141,7 @@ class Annotation(Base):
 
 class InferenceResult(Base):
     __tablename__ = "inference_results"
+    __table_args__ = (Index("ix_inference_results_video_id_timestamp", "video_id", "timestamp"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     video_id = Column(String, ForeignKey("videos.id"))
@@ -101,4 +150,66 @@ class InferenceResult(Base):
     confidence = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    video = relationship("Video", back_populates="inference_results")
\ No newline at end of file
+    video = relationship("Video", back_populates="inference_results")
+
+class TelemetrySeries(Base):
+    """Whole telemetry series of a video as compressed column arrays (app.telemetry)"""
+    __tablename__ = "telemetry_series"
+    __table_args__ = (UniqueConstraint("video_id", "series"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    video_id = Column(String, ForeignKey("videos.id"), index=True)
+    series = Column(String)  # speed, button, inference
+    row_count = Column(Integer)
+    data = Column(LargeBinary)
+    timestamp_offset = Column(Float, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    video = relationship("Video", back_populates="telemetry_series")
+
+class IngestJob(Base):
+    """File staged in S3 and processed by the background ingest worker (app.jobs).
+
+    Telemetry jobs load the file into a video. video_upload jobs hash an
+    assembled resumable upload and register it, setting video_id when done.
+    """
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    video_id = Column(String, ForeignKey("videos.id"), index=True)
+    user_id = Column(String, ForeignKey("users.id"))
+    kind = Column(String)  # speed_csv, button_data, video_upload
+    s3_key = Column(String)
+    status = Column(String, default="pending", index=True)  # pending, running, succeeded, failed, dismissed
+    bytes_total = Column(BigInteger)
+    bytes_processed = Column(BigInteger, default=0)
+    rows_processed = Column(BigInteger, default=0)
+    error = Column(JSON, nullable=True)  # HTTP error detail of a failed job
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+
+    @property
+    def rows_per_second(self) -> float:
+        seconds = self.seconds
+        return self.rows_processed / seconds if seconds else 0.0
+
+class TelemetryLevel(Base):
+    """One level of a video's downsampling pyramid (app.downsample)"""
+    __tablename__ = "telemetry_levels"
+    __table_args__ = (UniqueConstraint("video_id", "series", "points"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    video_id = Column(String, ForeignKey("videos.id"), index=True)
+    series = Column(String)  # speed
+    points = Column(Integer)  # Samples kept at this level
+    data = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    video = relationship("Video", back_populates="telemetry_levels")
@@ -0,0 +1,361 @@
+# Path: backend/app/mp4.py
+import asyncio
+import bisect
+import struct
+import sys
+from array import array
+from typing import Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Reads the inclusive byte range [start, end] of the file
+RangeReader = Callable[[int, int], Awaitable[bytes]]
+
+# Boxes whose payload is a list of child boxes
+CONTAINER_BOXES = {"moov", "trak", "mdia", "minf", "stbl", "edts", "dinf", "udta", "mvex"}
+
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+MAX_TOP_LEVEL_BOXES = 1024
+
+
+class Mp4Error(ValueError):
+    """The file is not an MP4 this module can index"""
+
+
+class Box(NamedTuple):
+    type: str
+    offset: int  # Offset of the box header
+    size: int  # Including the header
+    header_size: int
+
+    @property
+    def payload_offset(self) -> int:
+        return self.offset + self.header_size
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+def _parse_header(data: bytes, offset: int, limit: int) -> Box:
+    if limit - offset < 8:
+        raise Mp4Error(f"Truncated box header at offset {offset}")
+    size, box_type = struct.unpack_from(">I4s", data, offset)
+    header_size = 8
+    if size == 1:
+        if limit - offset < 16:
+            raise Mp4Error(f"Truncated box header at offset {offset}")
+        size = struct.unpack_from(">Q", data, offset + 8)[0]
+        header_size = 16
+    elif size == 0:
+        size = limit - offset
+    if size < header_size:
+        raise Mp4Error(f"Invalid size {size} of box at offset {offset}")
+    return Box(box_type.decode("latin-1"), offset, size, header_size)
+
+
+def iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Box]:
+    """Boxes laid out back to back in data[start:end], offsets relative to data"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset < end:
+        box = _parse_header(data, offset, end)
+        if box.end > end:
+            raise Mp4Error(f"Box '{box.type}' at offset {offset} overruns its parent")
+        yield box
+        offset = box.end
+
+
+def walk_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Box]:
+    """All boxes in data[start:end], descending into containers"""
+    for box in iter_boxes(data, start, end):
+        yield box
+        if box.type in CONTAINER_BOXES:
+            yield from walk_boxes(data, box.payload_offset, box.end)
+
+
+def find_box(data: bytes, path: List[str], start: int = 0, end: Optional[int] = None) -> Optional[Box]:
+    """First box matching a path of types, e.g. ["mdia", "minf", "stbl"]"""
+    for box in iter_boxes(data, start, end):
+        if box.type == path[0]:
+            if len(path) == 1:
+                return box
+            return find_box(data, path[1:], box.payload_offset, box.end)
+    return None
+
+
+async def scan_top_level(read: RangeReader, file_size: int) -> List[Box]:
+    """Top-level boxes of a file, reading only their headers"""
+    boxes = []
+    offset = 0
+    while offset < file_size:
+        if len(boxes) >= MAX_TOP_LEVEL_BOXES:
+            raise Mp4Error("Too many top-level boxes")
+        header = await read(offset, min(offset + 16, file_size) - 1)
+        box = _parse_header(header, 0, file_size - offset)
+        if not boxes and box.type != "ftyp":
+            raise Mp4Error("File does not start with an ftyp box")
+        boxes.append(Box(box.type, offset, box.size, box.header_size))
+        offset += box.size
+    if offset != file_size:
+        raise Mp4Error("Last box extends past the end of the file")
+    return boxes
+
+
+async def read_moov(read: RangeReader, file_size: int) -> Tuple[List[Box], Box, bytes]:
+    """Top-level boxes, the moov box and its bytes (moov offsets start at 0)"""
+    boxes = await scan_top_level(read, file_size)
+    moov = next((box for box in boxes if box.type == "moov"), None)
+    if moov is None:
+        raise Mp4Error("No moov box")
+    if moov.size > MAX_MOOV_SIZE:
+        raise Mp4Error(f"moov box of {moov.size} bytes is too large")
+    return boxes, moov, await read(moov.offset, moov.end - 1)
+
+
+def _be_array(typecode: str, data: bytes, offset: int, count: int) -> array:
+    values = array(typecode)
+    length = count * values.itemsize
+    if offset + length > len(data):
+        raise Mp4Error("Truncated sample table")
+    values.frombytes(data[offset:offset + length])
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values
+
+
+def _full_box_payload(box: Box) -> int:
+    """Offset of a full box payload, after version and flags"""
+    return box.payload_offset + 4
+
+
+class SampleTable:
+    """Sample tables of one track, enough to locate every sample"""
+
+    def __init__(self, moov: bytes, trak: Box):
+        mdhd = find_box(moov, ["mdia", "mdhd"], trak.payload_offset, trak.end)
+        hdlr = find_box(moov, ["mdia", "hdlr"], trak.payload_offset, trak.end)
+        stbl = find_box(moov, ["mdia", "minf", "stbl"], trak.payload_offset, trak.end)
+        if mdhd is None or hdlr is None or stbl is None:
+            raise Mp4Error("Track is missing mdhd, hdlr or stbl")
+
+        self.handler = moov[hdlr.payload_offset + 8:hdlr.payload_offset + 12].decode("latin-1")
+        if moov[mdhd.payload_offset] == 1:
+            self.timescale, duration = struct.unpack_from(">IQ", moov, mdhd.payload_offset + 20)
+        else:
+            self.timescale, duration = struct.unpack_from(">II", moov, mdhd.payload_offset + 12)
+        if not self.timescale:
+            raise Mp4Error("Track timescale is zero")
+        self.duration = duration / self.timescale
+
+        boxes: Dict[str, Box] = {box.type: box for box in iter_boxes(moov, stbl.payload_offset, stbl.end)}
+        for required in ("stts", "stsc", "stsz"):
+            if required not in boxes:
+                raise Mp4Error(f"Track has no {required} box")
+
+        # Decoding time to sample: (sample count, delta) runs
+        offset = _full_box_payload(boxes["stts"])
+        count = struct.unpack_from(">I", moov, offset)[0]
+        self.time_to_sample = _be_array("I", moov, offset + 4, count * 2)
+
+        # Sync samples (1-based), absent when every sample is a keyframe
+        self.sync_samples: Optional[array] = None
+        if "stss" in boxes:
+            offset = _full_box_payload(boxes["stss"])
+            count = struct.unpack_from(">I", moov, offset)[0]
+            self.sync_samples = _be_array("I", moov, offset + 4, count)
+
+        offset = _full_box_payload(boxes["stsz"])
+        sample_size, self.sample_count = struct.unpack_from(">II", moov, offset)
+        if sample_size:
+            self.sample_sizes = array("I", [sample_size]) * self.sample_count
+        else:
+            self.sample_sizes = _be_array("I", moov, offset + 8, self.sample_count)
+
+        # Sample to chunk: (first chunk, samples per chunk, description index) runs
+        offset = _full_box_payload(boxes["stsc"])
+        count = struct.unpack_from(">I", moov, offset)[0]
+        self.sample_to_chunk = _be_array("I", moov, offset + 4, count * 3)
+
+        if "stco" in boxes:
+            self.chunk_offset_box = boxes["stco"]
+            typecode = "I"
+        elif "co64" in boxes:
+            self.chunk_offset_box = boxes["co64"]
+            typecode = "Q"
+        else:
+            raise Mp4Error("Track has no stco or co64 box")
+        offset = _full_box_payload(self.chunk_offset_box)
+        count = struct.unpack_from(">I", moov, offset)[0]
+        self.chunk_offsets = _be_array(typecode, moov, offset + 4, count)
+
+    def sample_offsets(self) -> array:
+        """File offset of every sample"""
+        offsets = array("Q")
+        entries = self.sample_to_chunk
+        sample = 0
+        for i in range(0, len(entries), 3):
+            first_chunk, per_chunk = entries[i], entries[i + 1]
+            last_chunk = entries[i + 3] - 1 if i + 3 < len(entries) else len(self.chunk_offsets)
+            for chunk in range(first_chunk - 1, last_chunk):
+                position = self.chunk_offsets[chunk]
+                for _ in range(per_chunk):
+                    if sample >= self.sample_count:
+                        return offsets
+                    offsets.append(position)
+                    position += self.sample_sizes[sample]
+                    sample += 1
+        if sample < self.sample_count:
+            raise Mp4Error("Sample to chunk table does not cover every sample")
+        return offsets
+
+    def sample_times(self) -> array:
+        """Decoding time of every sample in seconds"""
+        times = array("d")
+        ticks = 0
+        runs = self.time_to_sample
+        for i in range(0, len(runs), 2):
+            count, delta = runs[i], runs[i + 1]
+            for _ in range(count):
+                times.append(ticks / self.timescale)
+                ticks += delta
+        if len(times) < self.sample_count:
+            raise Mp4Error("Time to sample table does not cover every sample")
+        return times
+
+
+def parse_tracks(moov: bytes) -> List[SampleTable]:
+    header = _parse_header(moov, 0, len(moov))
+    return [
+        SampleTable(moov, trak)
+        for trak in iter_boxes(moov, header.payload_offset)
+        if trak.type == "trak"
+    ]
+
+
+class KeyframeIndex:
+    """Keyframe times and file offsets of the video track.
+
+    Times are decoding times; composition offsets and edit lists are
+    ignored, which is well below a frame for seeking purposes.
+    """
+
+    HEADER = struct.Struct("<4sB3xIQd")
+    MAGIC = b"KFIX"
+    VERSION = 1
+
+    def __init__(self, times: array, offsets: array, data_end: int, duration: float):
+        self.times = times
+        self.offsets = offsets
+        self.data_end = data_end  # End of the last video sample
+        self.duration = duration
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def from_moov(cls, moov: bytes) -> "KeyframeIndex":
+        track = next((track for track in parse_tracks(moov) if track.handler == "vide"), None)
+        if track is None:
+            raise Mp4Error("No video track")
+        if not track.sample_count:
+            raise Mp4Error("Video track has no samples")
+
+        sample_times = track.sample_times()
+        sample_offsets = track.sample_offsets()
+        sync = track.sync_samples if track.sync_samples is not None else range(1, track.sample_count + 1)
+        times, offsets = array("d"), array("Q")
+        for sample in sync:
+            if 1 <= sample <= track.sample_count:
+                times.append(sample_times[sample - 1])
+                offsets.append(sample_offsets[sample - 1])
+        if not times:
+            raise Mp4Error("Video track has no keyframes")
+
+        data_end = max(offset + size for offset, size in zip(sample_offsets, track.sample_sizes))
+        return cls(times, offsets, data_end, track.duration)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KeyframeIndex":
+        magic, version, count, data_end, duration = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise Mp4Error("Unknown keyframe index format")
+        times, offsets = array("d"), array("Q")
+        start = cls.HEADER.size
+        times.frombytes(data[start:start + count * 8])
+        offsets.frombytes(data[start + count * 8:start + count * 16])
+        if sys.byteorder == "big":
+            times.byteswap()
+            offsets.byteswap()
+        return cls(times, offsets, data_end, duration)
+
+    def to_bytes(self) -> bytes:
+        times, offsets = array("d", self.times), array("Q", self.offsets)
+        if sys.byteorder == "big":
+            times.byteswap()
+            offsets.byteswap()
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, len(self), self.data_end, self.duration)
+        return header + times.tobytes() + offsets.tobytes()
+
+    def lookup(self, time: float) -> int:
+        """Position of the last keyframe at or before time"""
+        return max(bisect.bisect_right(self.times, time) - 1, 0)
+
+    def byte_range(self, position: int) -> Tuple[int, int]:
+        """Inclusive byte range from a keyframe up to the next one"""
+        start = self.offsets[position]
+        if position + 1 < len(self):
+            end = self.offsets[position + 1]
+        else:
+            end = self.data_end
+        return start, max(end, start + 1) - 1
+
+
+async def build_keyframe_index(read: RangeReader, file_size: int) -> KeyframeIndex:
+    """Index a stored MP4 with a handful of range reads (box headers and moov).
+
+    Walking the sample tables is pure Python, so it runs in a worker thread
+    instead of on the event loop.
+    """
+    _, _, moov = await read_moov(read, file_size)
+    return await asyncio.to_thread(KeyframeIndex.from_moov, moov)
+
+
+def shift_chunk_offsets(moov: bytes, start: int, end: int, delta: int) -> bytes:
+    """Copy of moov with every chunk offset in [start, end) moved by delta"""
+    patched = bytearray(moov)
+    for box in walk_boxes(moov):
+        if box.type not in ("stco", "co64"):
+            continue
+        offset = _full_box_payload(box)
+        count = struct.unpack_from(">I", moov, offset)[0]
+        typecode = "I" if box.type == "stco" else "Q"
+        offsets = _be_array(typecode, moov, offset + 4, count)
+        shifted = array("Q", (o + delta if start <= o < end else o for o in offsets))
+        if typecode == "I":
+            if shifted and max(shifted) > 0xFFFFFFFF:
+                raise Mp4Error("Shifted chunk offsets do not fit in stco")
+            shifted = array("I", shifted)
+        if sys.byteorder == "little":
+            shifted.byteswap()
+        patched[offset + 4:offset + 4 + len(shifted) * shifted.itemsize] = shifted.tobytes()
+    return bytes(patched)
+
+
+def faststart_layout(
+    boxes: List[Box],
+    moov: Box,
+    moov_data: bytes,
+    file_size: int
+) -> Optional[List[Union[bytes, Tuple[int, int]]]]:
+    """Pieces of the same file with moov moved in front of the media data.
+
+    Returns None when moov already precedes the first mdat. Otherwise a list
+    of literal bytes (the patched moov) and half-open byte ranges of the
+    original file, in their new order. Sample data is not touched: moov
+    keeps its size, so only the chunk offsets into the moved data change.
+    """
+    first_mdat = next((box for box in boxes if box.type == "mdat"), None)
+    if first_mdat is None or moov.offset < first_mdat.offset:
+        return None
+    patched = shift_chunk_offsets(moov_data, first_mdat.offset, moov.offset, moov.size)
+    pieces = [(0, first_mdat.offset), patched, (first_mdat.offset, moov.offset), (moov.end, file_size)]
+    return [piece for piece in pieces if isinstance(piece, bytes) or piece[0] < piece[1]]
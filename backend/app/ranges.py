@@ -0,0 +1,77 @@
+# Path: backend/app/ranges.py
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+
+# (first, last) as written in the header, either side may be open
+RangeSpec = Tuple[Optional[int], Optional[int]]
+
+MAX_RANGES = 16
+
+
+def parse_range_header(header: Optional[str]) -> Optional[List[RangeSpec]]:
+    """Parse a ``Range: bytes=...`` header into range specs.
+
+    Returns None when the header is absent or not a bytes range, in which
+    case the whole representation is served (RFC 9110, section 14.2).
+    """
+    if not header:
+        return None
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges:
+        return None
+
+    specs: List[RangeSpec] = []
+    for part in ranges.split(","):
+        first, sep, last = part.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            start = int(first) if first.strip() else None
+            end = int(last) if last.strip() else None
+        except ValueError:
+            return None
+        if start is None and end is None:
+            return None
+        if start is not None and end is not None and end < start:
+            return None
+        specs.append((start, end))
+
+    if len(specs) > MAX_RANGES:
+        return None
+    return specs
+
+
+def resolve_ranges(specs: List[RangeSpec], size: int) -> List[Tuple[int, int]]:
+    """Turn specs into inclusive absolute ranges, merging overlaps.
+
+    Raises 416 when none of the ranges can be satisfied.
+    """
+    resolved = []
+    for start, end in specs:
+        if start is None:
+            # Suffix range: the last `end` bytes
+            if end == 0:
+                continue
+            start, end = max(size - end, 0), size - 1
+        elif start >= size:
+            continue
+        else:
+            end = size - 1 if end is None else min(end, size - 1)
+        resolved.append((start, end))
+
+    if not resolved:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    resolved.sort()
+    merged = [resolved[0]]
+    for start, end in resolved[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
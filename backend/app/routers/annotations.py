@@ -31,15 +31,34 @@ async def get_next_unannotated(
         "lock_time": video.lock_time
     }
 
+def _lock_response(video: models.Video, user_id: str) -> dict:
+    return {
+        "status": "started",
+        "video_id": video.id,
+        "user_id": user_id,
+        "locked_by": video.locked_by,
+        "lock_time": video.lock_time,
+        "lease_expires": crud.lease_expires(video)
+    }
+
+@router.post("/claim", response_model=schemas.LockResponse)
+async def claim_next_video(
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Lease the next video in the annotation queue to the current user"""
+    video = await crud.claim_next_video(db, current_user.id)
+    if not video:
+        raise HTTPException(status_code=404, detail="No unannotated videos available")
+    return _lock_response(video, current_user.id)
+
 @router.post("/{video_id}/start", response_model=schemas.LockResponse)
 async def start_annotation(
     video_id: str,
     current_user: models.User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Start annotating a video and lock it"""
-    video = await get_video_or_404(video_id, db)
-    
+    """Start annotating a video and lock it, or renew the lease on it"""
     try:
         video = await crud.lock_video(db, video_id, current_user.id)
     except HTTPException as e:
@@ -50,13 +69,7 @@ async def start_annotation(
             )
         raise e
     
-    return {
-        "status": "started",
-        "video_id": video.id,
-        "user_id": current_user.id,
-        "locked_by": video.locked_by,
-        "lock_time": video.lock_time
-    }
+    return _lock_response(video, current_user.id)
 
 @router.post("/{video_id}/commit", response_model=schemas.AnnotationResponse)
 async def commit_annotations(
@@ -4,9 +4,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from .. import crud, schemas, models
 from ..database import get_db
-from ..dependencies import get_current_user, get_video_or_404
+from ..dependencies import get_current_user, get_video_or_404, TelemetryWindow, TelemetryVersion, get_telemetry_version
+from ..telemetry import encode_cursor
+from ..formats import WireFormat, columns_response, get_wire_format, json_response
+from ..config import get_settings
 import numpy as np
 
+settings = get_settings()
+
 router = APIRouter(
     prefix="/api",
     tags=["inference", "geolocation"]
@@ -49,6 +54,11 @@ async def run_inference(
     # Store results
     await crud.create_inference_results_bulk(db, video_id, predictions)
 
+    if settings.AUTO_ALIGN_MIN_CONFIDENCE is not None:
+        await crud.auto_align_video(
+            db, video_id, settings.AUTO_ALIGN_MIN_CONFIDENCE, settings.AUTO_ALIGN_MAX_OFFSET
+        )
+
 @router.post("/inference/{video_id}/run", response_model=schemas.StandardResponse)
 async def start_inference(
     video_id: str,
@@ -69,52 +79,49 @@ async def start_inference(
 @router.get("/inference/{video_id}/results", response_model=schemas.DataResponse)
 async def get_inference_results(
     video_id: str,
+    wire_format: WireFormat = Depends(get_wire_format),
     current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
     db: AsyncSession = Depends(get_db)
 ):
-    video = await get_video_or_404(video_id, db)
-    results = await crud.get_inference_results(db, video_id)
-    
-    return {
-        "status": "success",
-        "message": "Inference results retrieved successfully",
-        "data": {
-            "video_id": video_id,
-            "predictions": [
-                {
-                    "timestamp": result.timestamp,
-                    "predicted_speed": result.predicted_speed,
-                    "confidence": result.confidence
-                }
-                for result in results
-            ]
-        }
-    }
+    results, _ = await crud.get_telemetry_columns(db, video_id, "inference")
+
+    if not wire_format.is_json:
+        return version.apply(columns_response(wire_format, {"predictions": results}, {"video_id": video_id}))
+
+    return version.apply(json_response(
+        "Inference results retrieved successfully",
+        {"video_id": video_id},
+        {"predictions": (results, ["timestamp", "predicted_speed", "confidence"])}
+    ))
 
 @router.get("/geolocation/{video_id}", response_model=schemas.DataResponse)
 async def get_geolocation_data(
     video_id: str,
+    window: TelemetryWindow = Depends(),
+    wire_format: WireFormat = Depends(get_wire_format),
     current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
     db: AsyncSession = Depends(get_db)
 ):
-    video = await get_video_or_404(video_id, db)
-    speed_data = await crud.get_speed_data(db, video_id)
-    
-    return {
-        "status": "success",
-        "message": "Geolocation data retrieved successfully",
-        "data": {
-            "video_id": video_id,
-            "locations": [
-                {
-                    "timestamp": data.timestamp,
-                    "latitude": data.latitude,
-                    "longitude": data.longitude,
-                    "altitude": data.altitude,
-                    "accuracy": data.accuracy,
-                    "speed": data.speed
-                }
-                for data in speed_data
-            ]
-        }
-    }
+    if window.is_set:
+        speed, cursor = await crud.get_telemetry_page(
+            db, video_id, "speed", window.start, window.end, window.limit, window.cursor
+        )
+    else:
+        speed, _ = await crud.get_telemetry_columns(db, video_id, "speed")
+        cursor = None
+
+    location_columns = ["timestamp", "latitude", "longitude", "altitude", "accuracy", "speed"]
+    if not wire_format.is_json:
+        return version.apply(columns_response(
+            wire_format,
+            {"locations": {name: speed[name] for name in location_columns}},
+            {"video_id": video_id, "next_cursor": encode_cursor(cursor)}
+        ))
+
+    return version.apply(json_response(
+        "Geolocation data retrieved successfully",
+        {"video_id": video_id, "next_cursor": encode_cursor(cursor)},
+        {"locations": (speed, location_columns)}
+    ))
@@ -0,0 +1,128 @@
+# Path: backend/app/routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import crud, schemas, models
+from ..database import get_db
+from ..dependencies import get_current_user, get_ingest_worker, get_storage
+from ..jobs import FINISHED_STATUSES, IngestWorker
+from ..storage import ObjectStorage
+import asyncio
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"]
+)
+
+EVENTS_POLL_INTERVAL = 1.0  # Seconds between progress checks of a subscribed job
+
+
+def _job_response(job: models.IngestJob) -> schemas.IngestJobResponse:
+    return schemas.IngestJobResponse(
+        job_id=job.id,
+        video_id=job.video_id,
+        kind=job.kind,
+        status=job.status,
+        rows_processed=job.rows_processed,
+        bytes_processed=job.bytes_processed,
+        bytes_total=job.bytes_total,
+        progress=job.bytes_processed / job.bytes_total if job.bytes_total else 1.0,
+        seconds=job.seconds,
+        rows_per_second=job.rows_per_second,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+async def _get_job_or_404(db: AsyncSession, job_id: str, user_id: str) -> models.IngestJob:
+    job = await crud.get_ingest_job(db, job_id, user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingest job not found"
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=schemas.IngestJobResponse)
+async def get_ingest_job(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress, throughput and final status of a background ingest job"""
+    return _job_response(await _get_job_or_404(db, job_id, current_user.id))
+
+
+@router.post("/{job_id}/retry", response_model=schemas.IngestJobResponse)
+async def retry_ingest_job(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    worker: IngestWorker = Depends(get_ingest_worker)
+):
+    """Run a failed job again on the file it kept in S3"""
+    await _get_job_or_404(db, job_id, current_user.id)
+    if not await crud.retry_ingest_job(db, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only failed jobs can be retried"
+        )
+    worker.submit(job_id)
+    return _job_response(await _get_job_or_404(db, job_id, current_user.id))
+
+
+@router.delete("/{job_id}", response_model=schemas.IngestJobResponse)
+async def dismiss_ingest_job(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Give up on a failed job and delete its file"""
+    job = await _get_job_or_404(db, job_id, current_user.id)
+    s3_key = job.s3_key
+    if not await crud.dismiss_ingest_job(db, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only failed jobs can be dismissed"
+        )
+    await storage.delete(s3_key)
+    # A dismissed video_upload job leaves its resumable upload with nothing to register
+    upload_session = await crud.get_upload_session_for_job(db, job_id)
+    if upload_session is not None:
+        await crud.transition_upload_session(db, upload_session, "completing", "aborted")
+    return _job_response(await _get_job_or_404(db, job_id, current_user.id))
+
+
+@router.get("/{job_id}/events")
+async def subscribe_ingest_job(
+    job_id: str,
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    worker: IngestWorker = Depends(get_ingest_worker)
+):
+    """Server-sent events with the job state, until the job has finished"""
+    await _get_job_or_404(db, job_id, current_user.id)
+    user_id = current_user.id
+
+    async def events():
+        while True:
+            # The request session is closed once the response starts. A short
+            # session per poll keeps watchers from holding a pooled connection
+            # idle in transaction between polls.
+            async with worker.session_factory() as session:
+                job = await crud.get_ingest_job(session, job_id, user_id)
+            yield f"data: {_job_response(job).model_dump_json()}\n\n"
+            if job.status in FINISHED_STATUSES or await request.is_disconnected():
+                return
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
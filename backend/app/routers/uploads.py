@@ -0,0 +1,386 @@
+# Path: backend/app/routers/uploads.py
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import crud, schemas, models
+from ..database import get_db
+from ..dependencies import get_current_user, get_storage, get_ingest_worker
+from ..jobs import IngestWorker
+from ..config import get_settings
+from ..storage import ObjectStorage, MIN_PART_SIZE, staging_key
+from .videos import MAX_FILE_SIZE, validate_content_hash
+from typing import List
+import uuid
+
+settings = get_settings()
+
+router = APIRouter(
+    prefix="/api/data/uploads",
+    tags=["uploads"]
+)
+
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_CHUNKS = 10000  # S3 multipart part number limit
+
+
+def _total_chunks(upload_session: models.UploadSession) -> int:
+    return max(1, -(-upload_session.total_size // upload_session.chunk_size))
+
+
+def _expected_chunk_size(upload_session: models.UploadSession, chunk_number: int) -> int:
+    if chunk_number < _total_chunks(upload_session):
+        return upload_session.chunk_size
+    return upload_session.total_size - upload_session.chunk_size * (chunk_number - 1)
+
+
+async def _received_parts(
+    db: AsyncSession,
+    storage: ObjectStorage,
+    upload_session: models.UploadSession
+) -> List[dict]:
+    """Received chunks as {"PartNumber", "ETag", "Size"}.
+
+    Direct uploads bypass the backend, so S3 is asked which parts it has.
+    """
+    if upload_session.direct and upload_session.status == "active":
+        return await storage.list_parts(upload_session.s3_key, upload_session.s3_upload_id)
+    chunks = await crud.get_upload_chunks(db, upload_session.id)
+    return [
+        {"PartNumber": chunk.chunk_number, "ETag": chunk.etag, "Size": chunk.size}
+        for chunk in chunks
+    ]
+
+
+async def _session_response(
+    db: AsyncSession,
+    storage: ObjectStorage,
+    upload_session: models.UploadSession
+) -> dict:
+    parts = await _received_parts(db, storage, upload_session)
+    received = sorted(part["PartNumber"] for part in parts)
+    received_set = set(received)
+    if upload_session.status in ("completing", "completed"):
+        received_set = set(range(1, _total_chunks(upload_session) + 1))
+    return {
+        "status": upload_session.status,
+        "upload_id": upload_session.id,
+        "chunk_size": upload_session.chunk_size,
+        "total_size": upload_session.total_size,
+        "total_chunks": _total_chunks(upload_session),
+        "received_chunks": received,
+        "missing_chunks": [
+            n for n in range(1, _total_chunks(upload_session) + 1) if n not in received_set
+        ],
+        "direct": bool(upload_session.direct),
+        "video_id": upload_session.video_id,
+        "job_id": upload_session.job_id
+    }
+
+
+async def get_active_session(
+    upload_id: str,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> models.UploadSession:
+    upload_session = await crud.get_upload_session(db, upload_id, current_user.id)
+    if upload_session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload_session
+
+
+@router.post("", response_model=schemas.UploadSessionResponse, status_code=201)
+async def create_upload_session(
+    session_data: schemas.UploadSessionCreate,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Start a resumable upload, chunks can then be sent in any order"""
+    if not session_data.content_type.startswith('video/'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type"
+        )
+    if session_data.total_size <= 0 or session_data.total_size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size must be between 1 and {MAX_FILE_SIZE} bytes"
+        )
+
+    chunk_size = session_data.chunk_size or max(settings.UPLOAD_PART_SIZE, MIN_PART_SIZE)
+    if not MIN_PART_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk size must be between {MIN_PART_SIZE} and {MAX_CHUNK_SIZE} bytes"
+        )
+    if -(-session_data.total_size // chunk_size) > MAX_CHUNKS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk size too small, at most {MAX_CHUNKS} chunks are allowed"
+        )
+
+    content_hash = validate_content_hash(session_data.sha256)
+    if content_hash:
+        existing = await crud.get_video_by_hash(db, content_hash, user_id=current_user.id)
+        if existing:
+            # The caller already uploaded this content: the session completes without any chunks
+            video = await crud.create_video(
+                db,
+                filename=session_data.filename,
+                s3_key=existing.s3_key,
+                user_id=current_user.id,
+                content_hash=content_hash,
+                keyframe_index=existing.keyframe_index
+            )
+            upload_session = await crud.create_upload_session(
+                db,
+                user_id=current_user.id,
+                filename=session_data.filename,
+                content_type=session_data.content_type,
+                s3_key=existing.s3_key,
+                s3_upload_id=None,
+                chunk_size=chunk_size,
+                total_size=session_data.total_size,
+                content_hash=content_hash
+            )
+            await crud.finish_upload_session(db, upload_session, "completed", video.id)
+            return await _session_response(db, storage, upload_session)
+
+    session_id = str(uuid.uuid4())
+    s3_key = staging_key(session_id)
+    s3_upload_id = await storage.create_multipart_upload(s3_key, session_data.content_type)
+    upload_session = await crud.create_upload_session(
+        db,
+        session_id=session_id,
+        user_id=current_user.id,
+        filename=session_data.filename,
+        content_type=session_data.content_type,
+        s3_key=s3_key,
+        s3_upload_id=s3_upload_id,
+        chunk_size=chunk_size,
+        total_size=session_data.total_size,
+        content_hash=content_hash,
+        direct=session_data.direct
+    )
+    return await _session_response(db, storage, upload_session)
+
+
+@router.get("/{upload_id}", response_model=schemas.UploadSessionResponse)
+async def get_upload_session(
+    upload_session: models.UploadSession = Depends(get_active_session),
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Report which chunks have been received so clients can resume"""
+    return await _session_response(db, storage, upload_session)
+
+
+def _check_chunk_number(upload_session: models.UploadSession, chunk_number: int) -> None:
+    if upload_session.status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {upload_session.status}"
+        )
+    if chunk_number > _total_chunks(upload_session):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk number must be between 1 and {_total_chunks(upload_session)}"
+        )
+
+
+@router.get("/{upload_id}/chunks/{chunk_number}/url", response_model=schemas.UploadChunkUrlResponse)
+async def get_chunk_upload_url(
+    chunk_number: int = Path(..., ge=1),
+    upload_session: models.UploadSession = Depends(get_active_session),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Presigned URL to PUT a chunk of a direct upload straight to S3"""
+    if not upload_session.direct:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload session was not created with direct=true"
+        )
+    _check_chunk_number(upload_session, chunk_number)
+    return {
+        "upload_id": upload_session.id,
+        "chunk_number": chunk_number,
+        "size": _expected_chunk_size(upload_session, chunk_number),
+        "url": storage.presign_upload_part(
+            upload_session.s3_key,
+            upload_session.s3_upload_id,
+            chunk_number,
+            settings.PRESIGNED_URL_EXPIRES
+        ),
+        "expires_in": settings.PRESIGNED_URL_EXPIRES
+    }
+
+
+@router.put("/{upload_id}/chunks/{chunk_number}", response_model=schemas.UploadChunkResponse)
+async def upload_chunk(
+    request: Request,
+    chunk_number: int = Path(..., ge=1),
+    upload_session: models.UploadSession = Depends(get_active_session),
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Upload one chunk as the raw request body, retries overwrite earlier attempts"""
+    _check_chunk_number(upload_session, chunk_number)
+
+    expected_size = _expected_chunk_size(upload_session, chunk_number)
+    body = bytearray()
+    async for data in request.stream():
+        body.extend(data)
+        if len(body) > expected_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Chunk {chunk_number} must be {expected_size} bytes"
+            )
+    if len(body) != expected_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk {chunk_number} must be {expected_size} bytes, got {len(body)}"
+        )
+
+    # /complete or abort may have claimed the session while the body was
+    # streaming. The share lock is held until the chunk is saved, so they
+    # wait for this part instead of finishing the multipart upload under it.
+    session_status = await crud.lock_upload_session(db, upload_session.id)
+    if session_status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {session_status}"
+        )
+    part = await storage.upload_part(
+        upload_session.s3_key,
+        upload_session.s3_upload_id,
+        chunk_number,
+        bytes(body)
+    )
+    await crud.save_upload_chunk(db, upload_session.id, chunk_number, part["ETag"], len(body))
+
+    return {
+        "status": "success",
+        "upload_id": upload_session.id,
+        "chunk_number": chunk_number,
+        "size": len(body)
+    }
+
+
+def _finished_response(upload_session: models.UploadSession, response: Response) -> dict:
+    """Result of a session that is no longer active, 409 if it has none"""
+    if upload_session.status == "completing" and upload_session.job_id:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {
+            "status": "accepted",
+            "message": "Video queued for registration",
+            "upload_id": upload_session.id,
+            "job_id": upload_session.job_id
+        }
+    if upload_session.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {upload_session.status}"
+        )
+    return {
+        "status": "success",
+        "message": "Video uploaded successfully",
+        "upload_id": upload_session.id,
+        "video_id": upload_session.video_id,
+        "job_id": upload_session.job_id
+    }
+
+
+@router.post(
+    "/{upload_id}/complete",
+    response_model=schemas.UploadCompleteResponse,
+    response_model_exclude_none=True,
+    status_code=201
+)
+async def complete_upload_session(
+    response: Response,
+    upload_session: models.UploadSession = Depends(get_active_session),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage),
+    worker: IngestWorker = Depends(get_ingest_worker)
+):
+    """Assemble the uploaded chunks and queue the video for registration.
+
+    Assembly happens inside S3. Hashing the assembled object, the faststart
+    rewrite and keyframe indexing read it in full, so they run in an ingest
+    job and the request returns 202 with its id; the session then turns
+    ``completed`` with its ``video_id``.
+    """
+    if upload_session.status != "active":
+        return _finished_response(upload_session, response)
+
+    parts = await _received_parts(db, storage, upload_session)
+    received = {part["PartNumber"] for part in parts}
+    missing = [n for n in range(1, _total_chunks(upload_session) + 1) if n not in received]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Missing chunks: {missing}"
+        )
+    # Sizes of directly uploaded parts were never seen by the backend
+    for part in parts:
+        expected_size = _expected_chunk_size(upload_session, part["PartNumber"])
+        if part["Size"] != expected_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {part['PartNumber']} must be {expected_size} bytes, got {part['Size']}"
+            )
+
+    # Claim the session before touching S3, a concurrent /complete gets the
+    # job or 409 instead of completing the multipart upload twice
+    if not await crud.transition_upload_session(db, upload_session, "active", "completing"):
+        return _finished_response(upload_session, response)
+    try:
+        await storage.complete_multipart_upload(
+            upload_session.s3_key,
+            upload_session.s3_upload_id,
+            [{"PartNumber": part["PartNumber"], "ETag": part["ETag"]} for part in parts]
+        )
+    except Exception:
+        # The parts are still there, so the client can retry
+        await crud.transition_upload_session(db, upload_session, "completing", "active")
+        raise
+
+    try:
+        job = await crud.create_ingest_job(
+            db,
+            None,
+            current_user.id,
+            "video_upload",
+            upload_session.s3_key,
+            upload_session.total_size
+        )
+        await crud.queue_upload_session(db, upload_session, job.id)
+    except Exception:
+        # The multipart upload no longer exists, so the session cannot be retried
+        await db.rollback()
+        await crud.transition_upload_session(db, upload_session, "completing", "aborted")
+        raise
+    worker.submit(job.id)
+
+    return _finished_response(upload_session, response)
+
+
+@router.delete("/{upload_id}", response_model=schemas.StandardResponse)
+async def abort_upload_session(
+    upload_session: models.UploadSession = Depends(get_active_session),
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Abort a resumable upload and discard its chunks"""
+    if not await crud.transition_upload_session(db, upload_session, "active", "aborted"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {upload_session.status}"
+        )
+
+    await storage.abort_multipart_upload(upload_session.s3_key, upload_session.s3_upload_id)
+
+    return {
+        "status": "success",
+        "message": "Upload aborted"
+    }
@@ -1,172 +1,266 @@
 # Path: backend/app/routers/videos.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form, Header, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import List
+from typing import List, Literal, Optional, Tuple
 from .. import crud, schemas, models
 from ..database import get_db
-from ..dependencies import get_current_user, get_video_or_404, check_video_lock
+from ..dependencies import get_current_user, get_video_or_404, check_video_lock, get_storage, get_video_cache, get_ingest_worker, get_timeline_cache, TelemetryWindow, TelemetryVersion, get_telemetry_version
+from ..config import get_settings
+from ..formstream import MultipartFileReader
+from ..storage import ObjectStorage, hashing_stream, staging_key, ingest_key
+from ..ranges import parse_range_header, resolve_ranges
+from ..cache import BlockCache, CachedRangeResponse
+from ..mp4 import KeyframeIndex
+from ..content import index_keyframes, register_uploaded_video
+from ..ingest import iter_speed_csv, parse_button_data
+from ..jobs import IngestWorker
+from ..telemetry import encode_cursor
+from ..timeline import ANNOTATION_COLUMNS, MAX_TIMELINE_RATE, TIMELINE_COLUMNS, TimelineCache, json_states, time_window
+from ..formats import WireFormat, columns_response, get_wire_format, json_response
 from starlette.background import BackgroundTask
-import csv
-import io
-import aiofiles
+import logging
+import hashlib
+import math
 import os
-import boto3
+import re
+import uuid
 from botocore.exceptions import ClientError
 from fastapi.responses import FileResponse
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, RedirectResponse
 
-# Create uploads directory
-UPLOAD_DIR = "/code/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/data",
     tags=["videos"]
 )
 
-MAX_FILE_SIZE = 500 * 1024 * 1024  # 500 MB
+MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE
+MAX_CHART_WIDTH = 16384
+
+def validate_content_hash(content_hash: Optional[str]) -> Optional[str]:
+    """Normalize a client supplied SHA-256 hex digest"""
+    if content_hash is None:
+        return None
+    content_hash = content_hash.strip().lower()
+    if not re.fullmatch(r"[0-9a-f]{64}", content_hash):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Content hash must be a hex encoded SHA-256 digest"
+        )
+    return content_hash
 
-async def get_s3_client():
-    """Get configured S3 client"""
-    return boto3.client(
-        's3',
-        endpoint_url=os.getenv('S3_ENDPOINT_URL', 'https://storage.yandexcloud.net'),
-        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-        region_name="ru-central1"
-    ), os.getenv('S3_BUCKET_NAME', os.getenv('S3_BUCKET_NAME'))
+def file_field_body(field_name: str) -> dict:
+    """OpenAPI request body of an endpoint that streams one file field itself"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [field_name],
+                        "properties": {field_name: {"type": "string", "format": "binary"}}
+                    }
+                }
+            }
+        }
+    }
 
-@router.post("/upload_video", response_model=schemas.VideoUploadResponse, status_code=201)
+@router.post(
+    "/upload_video",
+    response_model=schemas.VideoUploadResponse,
+    status_code=201,
+    openapi_extra=file_field_body("video_file")
+)
 async def upload_video(
-    video_file: UploadFile = File(...),
+    request: Request,
     current_user: models.User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-    s3_info: tuple = Depends(get_s3_client)
+    storage: ObjectStorage = Depends(get_storage),
+    declared_hash: Optional[str] = Header(None, alias="X-Content-SHA256")
 ):
+    declared_hash = validate_content_hash(declared_hash)
+
+    # The body is streamed straight into S3 multipart parts, never read in full
+    video_file = await MultipartFileReader(request, "video_file").open()
     if not video_file.content_type.startswith('video/'):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file type"
         )
 
-    temp_file_path = None
-    try:
-        s3_key = f"videos/{current_user.id}/{video_file.filename}"
-        video = await crud.create_video(
-            db,
-            filename=video_file.filename,
-            s3_key=s3_key,
-            user_id=current_user.id
-        )
+    if declared_hash:
+        existing = await crud.get_video_by_hash(db, declared_hash, user_id=current_user.id)
+        if existing:
+            # The caller already uploaded this content, skip the transfer entirely
+            video = await crud.create_video(
+                db,
+                filename=video_file.filename,
+                s3_key=existing.s3_key,
+                user_id=current_user.id,
+                content_hash=declared_hash,
+                keyframe_index=existing.keyframe_index
+            )
+            return {
+                "status": "success",
+                "video_id": video.id,
+                "message": "Video uploaded successfully",
+                "deduplicated": True
+            }
 
-        s3_client, bucket_name = s3_info
-        temp_file_path = f"{UPLOAD_DIR}/{video_file.filename}"
+    upload_key = staging_key(str(uuid.uuid4()))
+    digest = hashlib.sha256()
+    await storage.stream_upload(
+        upload_key,
+        hashing_stream(video_file.iter_chunks(), digest),
+        content_type=video_file.content_type,
+        part_size=settings.UPLOAD_PART_SIZE,
+        max_concurrency=settings.UPLOAD_MAX_CONCURRENCY,
+        max_size=MAX_FILE_SIZE
+    )
 
-        async with aiofiles.open(temp_file_path, 'wb') as out_file:
-            content = await video_file.read()
-            await out_file.write(content)
+    content_hash = digest.hexdigest()
+    if declared_hash and declared_hash != content_hash:
+        await storage.delete(upload_key)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded content does not match X-Content-SHA256"
+        )
 
-        with open(temp_file_path, 'rb') as file_data:
-            s3_client.upload_fileobj(
-                file_data,
-                bucket_name,
-                s3_key,
-                ExtraArgs={'ContentType': video_file.content_type}
-            )
+    # Only register the video once the object is durable in the bucket
+    video, deduplicated = await register_uploaded_video(
+        db,
+        storage,
+        upload_key,
+        content_hash,
+        filename=video_file.filename,
+        user_id=current_user.id
+    )
 
-        return {
-            "status": "success",
-            "video_id": video.id,
-            "message": "Video uploaded successfully"
-        }
+    return {
+        "status": "success",
+        "video_id": video.id,
+        "message": "Video uploaded successfully",
+        "deduplicated": deduplicated
+    }
 
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+async def submit_ingest_job(
+    db: AsyncSession,
+    storage: ObjectStorage,
+    worker: IngestWorker,
+    video_id: str,
+    user_id: str,
+    kind: str,
+    upload: MultipartFileReader
+) -> models.IngestJob:
+    """Stream an uploaded telemetry file into S3 and queue it for the ingest worker"""
+    job_id = str(uuid.uuid4())
+    s3_key = ingest_key(job_id)
+    size = await storage.stream_upload(
+        s3_key,
+        upload.iter_chunks(),
+        content_type=upload.content_type,
+        part_size=settings.UPLOAD_PART_SIZE,
+        max_concurrency=settings.UPLOAD_MAX_CONCURRENCY,
+        max_size=MAX_FILE_SIZE
+    )
+    job = await crud.create_ingest_job(db, video_id, user_id, kind, s3_key, size, job_id=job_id)
+    worker.submit(job.id)
+    return job
 
-@router.post("/upload_csv/{video_id}", response_model=schemas.StandardResponse)
+# Background ingest is opt-in: a synchronous upload returns the row count or
+# the parse errors directly, and callers (the frontend included) read the
+# data right after it. Both modes stream the body, so memory stays flat;
+# background mode only takes the processing time out of the request.
+@router.post(
+    "/upload_csv/{video_id}",
+    response_model=schemas.IngestResponse,
+    response_model_exclude_none=True,
+    openapi_extra=file_field_body("csv_file")
+)
 async def upload_csv_data(
     video_id: str,
-    csv_file: UploadFile = File(...),
+    request: Request,
+    response: Response,
+    background: bool = Query(False, description="Process the file in an ingest job and return 202 with its id"),
     current_user: models.User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage),
+    worker: IngestWorker = Depends(get_ingest_worker)
 ):
-    """Upload and process speed data CSV"""
+    """Upload and process speed data CSV, plain or gzip/zstd compressed.
+
+    The file is parsed as it is received and written in batches, so memory
+    use does not grow with the number of rows. With ``background=true`` the
+    file is only streamed to S3; progress is reported by GET /api/jobs/{job_id}.
+    """
     video = await get_video_or_404(video_id, db)
-    
-    content = await csv_file.read()
-    try:
-        decoded_content = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(decoded_content), skipinitialspace=True)
-        
-        required_columns = {
-            'Elapsed time (sec)',
-            'Speed (km/h)',
-            'Latitude',
-            'Longitude',
-            'Altitude (km)',
-            'Accuracy (km)'
-        }
-        
-        first_row = next(csv_reader, None)
-        if not first_row or not required_columns.issubset(set(first_row.keys())):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid CSV format. Required columns: {required_columns}"
-            )
+    csv_file = await MultipartFileReader(request, "csv_file").open()
 
-        rows = [first_row] + list(csv_reader)
-        await crud.create_speed_data_bulk(db, video_id, rows)
-        
+    if background:
+        job = await submit_ingest_job(db, storage, worker, video_id, current_user.id, "speed_csv", csv_file)
+        response.status_code = status.HTTP_202_ACCEPTED
         return {
-            "status": "success",
-            "message": "CSV data uploaded successfully"
+            "status": "accepted",
+            "message": "CSV data queued for processing",
+            "job_id": job.id
         }
-        
-    except (UnicodeDecodeError, csv.Error) as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid CSV format: {str(e)}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
 
-@router.post("/upload_button_data/{video_id}", response_model=schemas.StandardResponse)
+    stats = await crud.create_speed_data_bulk(db, video_id, iter_speed_csv(csv_file.iter_chunks()))
+    logger.info(
+        f"Ingested {stats.rows} speed rows for video {video_id} "
+        f"in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/s)"
+    )
+
+    return {
+        "status": "success",
+        "message": "CSV data uploaded successfully",
+        "rows": stats.rows,
+        "seconds": stats.seconds,
+        "rows_per_second": stats.rows_per_second
+    }
+
+@router.post(
+    "/upload_button_data/{video_id}",
+    response_model=schemas.IngestResponse,
+    response_model_exclude_none=True,
+    openapi_extra=file_field_body("button_data_file")
+)
 async def upload_button_data(
     video_id: str,
-    button_data_file: UploadFile = File(...),
+    request: Request,
+    response: Response,
+    background: bool = Query(False, description="Process the file in an ingest job and return 202 with its id"),
     current_user: models.User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage),
+    worker: IngestWorker = Depends(get_ingest_worker)
 ):
     video = await crud.get_video(db, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
+    button_data_file = await MultipartFileReader(request, "button_data_file").open()
 
-    content = await button_data_file.read()
-    button_data = []
-    try:
-        lines = content.decode().splitlines()
-        for line in lines:
-            timestamp, state = line.strip().split(',')
-            button_data.append({
-                'timestamp': float(timestamp),
-                'state': state == '1'
-            })
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid button data format: {str(e)}"
-        )
+    if background:
+        job = await submit_ingest_job(db, storage, worker, video_id, current_user.id, "button_data", button_data_file)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {
+            "status": "accepted",
+            "message": "Button data queued for processing",
+            "job_id": job.id
+        }
 
+    button_data = parse_button_data(b"".join([chunk async for chunk in button_data_file.iter_chunks()]))
     await crud.create_button_data_bulk(db, video_id, button_data)
     
     return {
         "status": "success",
-        "message": "Button data uploaded successfully"
+        "message": "Button data uploaded successfully",
+        "rows": len(button_data)
     }
 
 @router.post("/add_video_timestamp/{video_id}", response_model=schemas.StandardResponse)
@@ -187,82 +281,392 @@ async def add_video_timestamp(
 @router.get("/{video_id}/data", response_model=schemas.DataResponse)
 async def get_video_data(
     video_id: str,
+    window: TelemetryWindow = Depends(),
+    wire_format: WireFormat = Depends(get_wire_format),
     current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
     db: AsyncSession = Depends(get_db)
 ):
-    video = await get_video_or_404(video_id, db)
-    speed_data = await crud.get_speed_data(db, video_id)
-    button_data = await crud.get_button_data(db, video_id)
-    
+    """Speed and button data of a video, optionally a time window or page of it.
+
+    Pages are taken over speed samples; button data covers the time span of
+    the page, including the transition that sets the state at its start.
+    Besides JSON, msgpack, Arrow IPC and packed columns are served on request
+    through the Accept header.
+    """
+    if window.is_set:
+        speed, cursor = await crud.get_telemetry_page(
+            db, video_id, "speed", window.start, window.end, window.limit, window.cursor
+        )
+        timestamps = speed["timestamp"]
+        if window.cursor is not None and len(timestamps):
+            span_start = float(timestamps[0])
+        else:
+            span_start = window.start if window.start is not None else -math.inf
+        if cursor is not None:
+            span_end = float(timestamps[-1])
+        else:
+            span_end = window.end if window.end is not None else math.inf
+        button, _ = await crud.get_button_window(db, video_id, span_start, span_end)
+    else:
+        speed, _ = await crud.get_telemetry_columns(db, video_id, "speed")
+        button, _ = await crud.get_telemetry_columns(db, video_id, "button")
+        cursor = None
+
+    speed_columns = ["timestamp", "speed", "latitude", "longitude"]
+    if not wire_format.is_json:
+        return version.apply(columns_response(
+            wire_format,
+            {
+                "speed_data": {name: speed[name] for name in speed_columns},
+                "button_data": button
+            },
+            {"video_id": video_id, "next_cursor": encode_cursor(cursor)}
+        ))
+
+    return version.apply(json_response(
+        "Video data retrieved successfully",
+        {"video_id": video_id, "next_cursor": encode_cursor(cursor)},
+        {"speed_data": (speed, speed_columns), "button_data": (button, ["timestamp", "state"])}
+    ))
+
+@router.get("/{video_id}/speed/downsampled", response_model=schemas.DownsampledSpeedResponse)
+async def get_downsampled_speed(
+    video_id: str,
+    width: int = Query(..., ge=3, le=MAX_CHART_WIDTH, description="Chart width in pixels, the maximum number of points"),
+    start: Optional[float] = Query(None, description="Only samples with timestamp >= start"),
+    end: Optional[float] = Query(None, description="Only samples with timestamp < end"),
+    current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
+    db: AsyncSession = Depends(get_db)
+):
+    """Speed series reduced to about one point per pixel, keeping peaks (LTTB)"""
+    timestamps, speed, level = await crud.get_downsampled_speed(db, video_id, width, start, end)
     return {
-        "status": "success",
-        "message": "Video data retrieved successfully",
-        "data": {
-            "video_id": video.id,
-            "speed_data": [
-                {
-                    "timestamp": data.timestamp,
-                    "speed": data.speed,
-                    "latitude": data.latitude,
-                    "longitude": data.longitude
-                } for data in speed_data
-            ],
-            "button_data": [
-                {
-                    "timestamp": data.timestamp,
-                    "state": data.state
-                } for data in button_data
-            ]
+        "video_id": video_id,
+        "level": level,
+        "points": len(timestamps),
+        "timestamps": timestamps.tolist(),
+        "speed": speed.tolist()
+    }
+
+@router.get("/{video_id}/button/state", response_model=schemas.ButtonStateResponse)
+async def get_button_state(
+    video_id: str,
+    t: float = Query(..., description="Time in the button log"),
+    current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
+    db: AsyncSession = Depends(get_db)
+):
+    """Button state at time t, null before the log starts"""
+    state, timestamp_offset = await crud.get_button_state_at(db, video_id, t)
+    return {"video_id": video_id, "t": t, "state": state, "timestamp_offset": timestamp_offset}
+
+@router.get("/{video_id}/button/intervals", response_model=schemas.ButtonIntervalsResponse)
+async def get_button_intervals(
+    video_id: str,
+    start: float = Query(..., description="Start of the range in button log time"),
+    end: float = Query(..., description="End of the range in button log time"),
+    current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
+    db: AsyncSession = Depends(get_db)
+):
+    """Pressed intervals [start, end) overlapping the range"""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+    intervals, timestamp_offset = await crud.get_button_intervals(db, video_id, start, end)
+    return {
+        "video_id": video_id,
+        "timestamp_offset": timestamp_offset,
+        "intervals": [{"start": interval_start, "end": interval_end} for interval_start, interval_end in intervals]
+    }
+
+@router.get("/{video_id}/timeline", response_model=schemas.DataResponse)
+async def get_video_timeline(
+    video_id: str,
+    rate: float = Query(10.0, gt=0, le=MAX_TIMELINE_RATE, description="Samples per second"),
+    start: Optional[float] = Query(None, description="Only points with video time >= start"),
+    end: Optional[float] = Query(None, description="Only points with video time < end"),
+    wire_format: WireFormat = Depends(get_wire_format),
+    current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
+    cache: Optional[TimelineCache] = Depends(get_timeline_cache),
+    db: AsyncSession = Depends(get_db)
+):
+    """Speed, button state and predicted speed on one time grid in video time,
+    with offsets applied, plus the annotations in the same range.
+
+    The whole timeline at a rate is built once per data version and cached,
+    windows are cut from it.
+    """
+    key = (video_id, version.data_version, rate)
+    timeline = cache.get(key) if cache is not None else None
+    if timeline is None:
+        timeline = await crud.get_video_timeline(db, video_id, rate)
+        if cache is not None:
+            cache.put(key, timeline)
+    timeline = time_window(timeline, start, end)
+    metadata = {"video_id": video_id, "rate": rate}
+
+    if not wire_format.is_json:
+        return version.apply(columns_response(wire_format, timeline, metadata))
+
+    grid, annotations = timeline["timeline"], timeline["annotations"]
+    return version.apply(json_response(
+        "Video timeline retrieved successfully",
+        metadata,
+        {
+            "timeline": ({**grid, "button_state": json_states(grid["button_state"])}, TIMELINE_COLUMNS),
+            "annotations": ({**annotations, "button_state": json_states(annotations["button_state"])}, ANNOTATION_COLUMNS)
         }
+    ))
+
+@router.get("/{video_id}/alignment", response_model=schemas.AlignmentResponse)
+async def estimate_alignment(
+    video_id: str,
+    target: Literal["video", "button"] = Query("video", description="Offset to estimate"),
+    max_offset: float = Query(300.0, gt=0, description="Largest offset considered, in seconds"),
+    current_user: models.User = Depends(get_current_user),
+    version: TelemetryVersion = Depends(get_telemetry_version),
+    db: AsyncSession = Depends(get_db)
+):
+    """Offset that best aligns GPS speed with predicted speed ("video"), or
+    button transitions with speed changes ("button"), by FFT cross-correlation.
+    Nothing is changed; the offset can be applied with the shift endpoints.
+    """
+    offset, confidence = await crud.estimate_alignment(db, video_id, target, max_offset)
+    return {"video_id": video_id, "target": target, "timestamp_offset": offset, "confidence": confidence}
+
+@router.get("/cache/stats")
+async def get_video_cache_stats(
+    current_user: models.User = Depends(get_current_user),
+    cache: Optional[BlockCache] = Depends(get_video_cache)
+):
+    """Hit/miss counters of the local video block cache"""
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+def _video_headers(video: models.Video, metadata: dict) -> dict:
+    headers = {
+        "Content-Disposition": f'inline; filename="{video.filename}"',
+        "Accept-Ranges": "bytes"
+    }
+    if metadata.get("ETag"):
+        headers["ETag"] = metadata["ETag"]
+    return headers
+
+async def _stream_byteranges(
+    storage: ObjectStorage,
+    key: str,
+    ranges: List[Tuple[int, int]],
+    part_headers: List[bytes],
+    boundary: str
+):
+    """multipart/byteranges body, each range is fetched from S3 only when reached"""
+    for (start, end), part_header in zip(ranges, part_headers):
+        yield part_header
+        s3_object = await storage.get(key, (start, end))
+        async for chunk in s3_object.iter_chunks():
+            yield chunk
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode()
+
+def _presigned_video_url(storage: ObjectStorage, video: models.Video) -> str:
+    return storage.presign_get(
+        video.s3_key,
+        settings.PRESIGNED_URL_EXPIRES,
+        filename=video.filename
+    )
+
+@router.get("/video/{video_id}/keyframe", response_model=schemas.KeyframeResponse)
+async def get_video_keyframe(
+    video_id: str,
+    background_tasks: BackgroundTasks,
+    t: float = Query(..., ge=0, description="Video time in seconds"),
+    prefetch: bool = False,
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage),
+    cache: Optional[BlockCache] = Depends(get_video_cache)
+):
+    """Byte range of the keyframe at or before `t`, up to the next keyframe.
+
+    Fetching this range is enough to start decoding at `t`. With `prefetch`
+    the range is also loaded into the block cache in the background.
+    """
+    video = await crud.get_video(db, video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    if video.keyframe_index is None:
+        # Videos uploaded before indexing existed are indexed on first use
+        keyframe_index = await index_keyframes(storage, video.s3_key)
+        if keyframe_index is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Video is not an MP4 file that can be indexed"
+            )
+        await crud.set_keyframe_index(db, video, keyframe_index)
+
+    index = KeyframeIndex.from_bytes(video.keyframe_index)
+    position = index.lookup(t)
+    start, end = index.byte_range(position)
+    if prefetch and cache is not None:
+        background_tasks.add_task(cache.prefetch, storage, video.s3_key, start, end)
+
+    return {
+        "time": t,
+        "keyframe_time": index.times[position],
+        "next_keyframe_time": index.times[position + 1] if position + 1 < len(index) else None,
+        "start": start,
+        "end": end,
+        "duration": index.duration
+    }
+
+@router.get("/video/{video_id}/url", response_model=schemas.PresignedUrlResponse)
+async def get_video_url(
+    video_id: str,
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage)
+):
+    """Short-lived presigned URL to play the video directly from S3"""
+    video = await crud.get_video(db, video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return {
+        "url": _presigned_video_url(storage, video),
+        "expires_in": settings.PRESIGNED_URL_EXPIRES
     }
 
 @router.api_route("/video/{video_id}", methods=["GET", "HEAD"])
 async def get_video_file(
     video_id: str,
     request: Request,
-    response: Response,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    storage: ObjectStorage = Depends(get_storage),
+    cache: Optional[BlockCache] = Depends(get_video_cache)
 ):
     video = await crud.get_video(db, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
-    
-    try:
-        s3_client, bucket_name = await get_s3_client()
-        
-        # Получаем объект напрямую из S3
+
+    # Clients follow the redirect and send their Range requests to S3 directly
+    if settings.VIDEO_DELIVERY == "presigned":
+        return RedirectResponse(
+            _presigned_video_url(storage, video),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT
+        )
+
+    # HEAD is answered from object metadata, no body stream is opened
+    if request.method == "HEAD":
+        try:
+            metadata = await storage.head(video.s3_key)
+        except ClientError:
+            raise HTTPException(status_code=404, detail="Video not found in S3")
+        headers = _video_headers(video, metadata)
+        headers["Content-Length"] = str(metadata["ContentLength"])
+        return Response(
+            status_code=status.HTTP_200_OK,
+            media_type=metadata.get("ContentType") or "video/mp4",
+            headers=headers
+        )
+
+    specs = parse_range_header(request.headers.get("range"))
+
+    if cache is not None and (specs is None or len(specs) == 1):
+        try:
+            metadata = await cache.object_metadata(storage, video.s3_key)
+        except ClientError:
+            raise HTTPException(status_code=404, detail="Video not found in S3")
+        size = metadata["ContentLength"]
+        headers = _video_headers(video, metadata)
+        media_type = metadata.get("ContentType") or "video/mp4"
+        if specs is None:
+            start, end = 0, size - 1
+            status_code = status.HTTP_200_OK
+        else:
+            start, end = resolve_ranges(specs, size)[0]
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        if size == 0:
+            return Response(status_code=status_code, media_type=media_type, headers=headers)
+        return CachedRangeResponse(
+            cache,
+            storage,
+            video.s3_key,
+            size,
+            start,
+            end,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type
+        )
+
+    if specs is not None and len(specs) > 1:
         try:
-            s3_response = s3_client.get_object(
-                Bucket=bucket_name,
-                Key=video.s3_key
+            metadata = await storage.head(video.s3_key)
+        except ClientError:
+            raise HTTPException(status_code=404, detail="Video not found in S3")
+        size = metadata["ContentLength"]
+        ranges = resolve_ranges(specs, size)
+        media_type = metadata.get("ContentType") or "video/mp4"
+        headers = _video_headers(video, metadata)
+
+        if len(ranges) == 1:
+            specs = ranges
+        else:
+            boundary = uuid.uuid4().hex
+            part_headers = [
+                (
+                    f"--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode()
+                for start, end in ranges
+            ]
+            content_length = len(f"--{boundary}--\r\n") + sum(
+                len(part_header) + (end - start + 1) + 2
+                for (start, end), part_header in zip(ranges, part_headers)
             )
-            
-            # Настраиваем заголовки для стриминга
-            response.headers["Content-Type"] = "video/mp4"
-            response.headers["Accept-Ranges"] = "bytes"
-            response.headers["Content-Length"] = str(s3_response['ContentLength'])
-            
-            # Возвращаем тело ответа как стрим
+            headers["Content-Length"] = str(content_length)
             return StreamingResponse(
-                s3_response['Body'].iter_chunks(),
-                media_type="video/mp4",
-                headers={
-                    "Content-Disposition": f'inline; filename="{video.filename}"',
-                    "Accept-Ranges": "bytes"
-                }
+                _stream_byteranges(storage, video.s3_key, ranges, part_headers, boundary),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=f"multipart/byteranges; boundary={boundary}",
+                headers=headers
             )
-            
-        except Exception as e:
-            print(f"S3 error: {str(e)}")
-            raise HTTPException(status_code=404, detail="Video not found in S3")
-            
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
 
-async def get_file_size(s3_client, bucket_name: str, key: str) -> int:
+    # Single range is passed straight to S3, which also resolves open/suffix ranges
+    byte_range = specs[0] if specs else None
+    try:
+        s3_object = await storage.get(video.s3_key, byte_range)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            metadata = await storage.head(video.s3_key)
+            resolve_ranges(specs, metadata["ContentLength"])
+        print(f"S3 error: {str(e)}")
+        raise HTTPException(status_code=404, detail="Video not found in S3")
+
+    headers = _video_headers(video, {"ETag": s3_object.etag})
+    headers["Content-Length"] = str(s3_object.content_length)
+    status_code = status.HTTP_200_OK
+    if byte_range is not None:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = s3_object.content_range
+
+    return StreamingResponse(
+        s3_object.iter_chunks(),
+        status_code=status_code,
+        media_type=s3_object.content_type or "video/mp4",
+        headers=headers
+    )
+
+async def get_file_size(storage: ObjectStorage, key: str) -> int:
     try:
-        response = s3_client.head_object(Bucket=bucket_name, Key=key)
+        response = await storage.head(key)
         return response['ContentLength']
-    except Exception:
-        return 0
\ No newline at end of file
+    except ClientError:
+        return 0
@@ -45,13 +45,115 @@ class StandardResponse(BaseModel):
     status: str
     message: str
 
+class IngestResponse(StandardResponse):
+    rows: Optional[int] = None
+    seconds: Optional[float] = None
+    rows_per_second: Optional[float] = None
+    job_id: Optional[str] = None  # Set instead of the counts when processing in the background
+
+class IngestJobResponse(BaseModel):
+    job_id: str
+    video_id: Optional[str] = None
+    kind: str
+    status: str
+    rows_processed: int
+    bytes_processed: int
+    bytes_total: int
+    progress: float  # Fraction of the file read, 0..1
+    seconds: float
+    rows_per_second: float
+    error: Optional[Any] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class DataResponse(BaseModel):
     status: str
     message: str
     data: Dict[str, Any]
 
+class ButtonStateResponse(BaseModel):
+    video_id: str
+    t: float
+    state: Optional[bool] = None
+    timestamp_offset: float
+
+class ButtonInterval(BaseModel):
+    start: float
+    end: float
+
+class ButtonIntervalsResponse(BaseModel):
+    video_id: str
+    timestamp_offset: float
+    intervals: List[ButtonInterval]
+
+class DownsampledSpeedResponse(BaseModel):
+    video_id: str
+    level: Optional[int] = None  # Pyramid level the points were taken from, None for raw samples
+    points: int
+    timestamps: List[float]
+    speed: List[float]
+
+class AlignmentResponse(BaseModel):
+    video_id: str
+    target: str  # "video" or "button"
+    timestamp_offset: float  # Value for shift_timestamp / shift_button_timestamp
+    confidence: float  # Correlation at the estimated offset, 0..1
+
 class VideoUploadResponse(StandardResponse):
     video_id: str
+    deduplicated: bool = False
+
+# Resumable upload schemas
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str = "video/mp4"
+    total_size: int
+    chunk_size: Optional[int] = None
+    sha256: Optional[str] = None
+    direct: bool = False
+
+class UploadSessionResponse(BaseModel):
+    status: str
+    upload_id: str
+    chunk_size: int
+    total_size: int
+    total_chunks: int
+    received_chunks: List[int]
+    missing_chunks: List[int]
+    direct: bool = False
+    video_id: Optional[str] = None
+    job_id: Optional[str] = None
+
+class UploadCompleteResponse(StandardResponse):
+    upload_id: str
+    video_id: Optional[str] = None
+    job_id: Optional[str] = None  # Set with 202 while the video is being registered
+
+class UploadChunkResponse(BaseModel):
+    status: str
+    upload_id: str
+    chunk_number: int
+    size: int
+
+class UploadChunkUrlResponse(BaseModel):
+    upload_id: str
+    chunk_number: int
+    size: int
+    url: str
+    expires_in: int
+
+class KeyframeResponse(BaseModel):
+    time: float
+    keyframe_time: float
+    next_keyframe_time: Optional[float] = None
+    start: int
+    end: int
+    duration: float
+
+class PresignedUrlResponse(BaseModel):
+    url: str
+    expires_in: int
 
 # Video schemas
 class VideoBase(BaseModel):
@@ -103,6 +205,7 @@ class LockResponse(BaseModel):
     user_id: str
     locked_by: str
     lock_time: datetime
+    lease_expires: Optional[datetime] = None  # Renew with /start before this
 
 class UnlockResponse(BaseModel):
     status: str
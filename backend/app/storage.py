@@ -0,0 +1,448 @@
+# Path: backend/app/storage.py
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple, Union
+import boto3
+from botocore.config import Config
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+# S3 rejects multipart parts smaller than this (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Literal bytes, or the half-open byte range [start, end) of a source object
+Piece = Union[bytes, Tuple[int, int]]
+
+
+def content_key(content_hash: str) -> str:
+    """Content-addressed object key for a SHA-256 hex digest"""
+    return f"videos/sha256/{content_hash}"
+
+
+def staging_key(upload_id: str) -> str:
+    """Temporary key for an upload whose content hash is not known yet"""
+    return f"uploads/{upload_id}"
+
+
+def ingest_key(job_id: str) -> str:
+    """Key of a telemetry file waiting for its ingest job"""
+    return f"ingest/{job_id}"
+
+
+async def hashing_stream(chunks: AsyncIterator[bytes], digest) -> AsyncIterator[bytes]:
+    """Pass chunks through while feeding them to a hashlib digest"""
+    async for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+class ObjectStream:
+    """Body of a GET response whose reads run off the event loop"""
+
+    def __init__(self, storage: "ObjectStorage", response: dict):
+        self._storage = storage
+        self._body = response["Body"]
+        self.content_length: int = response["ContentLength"]
+        self.content_type: Optional[str] = response.get("ContentType")
+        self.content_range: Optional[str] = response.get("ContentRange")
+        self.etag: Optional[str] = response.get("ETag")
+
+    async def iter_chunks(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await self._storage.run(self._body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.close()
+
+    async def read(self) -> bytes:
+        try:
+            return await self._storage.run(self._body.read)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._body.close()
+
+
+class ObjectStorage:
+    """Shared S3 client for the whole application.
+
+    Created once at startup: the botocore connection pool (and its TLS
+    sessions) is reused across requests, and every blocking boto3 call runs
+    on a dedicated thread pool sized to match, so slow object storage never
+    stalls the event loop.
+    """
+
+    def __init__(self, client, bucket_name: str, max_workers: int = 16, presign_client=None):
+        self.client = client
+        self.bucket_name = bucket_name
+        # Presigned URLs are used by browsers, which may reach S3 under another endpoint
+        self.presign_client = presign_client or client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3")
+
+    @classmethod
+    def from_settings(cls, settings) -> "ObjectStorage":
+        def make_client(endpoint_url: str):
+            return boto3.client(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+                region_name=settings.S3_REGION_NAME,
+                config=Config(
+                    signature_version="s3v4",
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 3, "mode": "standard"}
+                )
+            )
+
+        client = make_client(settings.S3_ENDPOINT_URL)
+        presign_client = None
+        if settings.S3_PUBLIC_ENDPOINT_URL:
+            presign_client = make_client(settings.S3_PUBLIC_ENDPOINT_URL)
+        return cls(
+            client,
+            settings.S3_BUCKET_NAME,
+            max_workers=settings.S3_MAX_POOL_CONNECTIONS,
+            presign_client=presign_client
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking call on the storage thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.client.close()
+        if self.presign_client is not self.client:
+            self.presign_client.close()
+
+    # Single object operations
+    async def head(self, key: str) -> dict:
+        return await self.run(self.client.head_object, Bucket=self.bucket_name, Key=key)
+
+    async def get(
+        self,
+        key: str,
+        byte_range: Optional[Tuple[Optional[int], Optional[int]]] = None
+    ) -> ObjectStream:
+        """Open an object (or the inclusive byte range ``(start, end)`` of it) for streaming.
+
+        Either side of the range may be None, as in an HTTP Range header.
+        """
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if byte_range is not None:
+            start, end = byte_range
+            params["Range"] = f"bytes={'' if start is None else start}-{'' if end is None else end}"
+        response = await self.run(self.client.get_object, **params)
+        return ObjectStream(self, response)
+
+    async def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Read the inclusive byte range [start, end] of an object"""
+        stream = await self.get(key, (start, end))
+        return await stream.read()
+
+    async def put(self, key: str, body: bytes, content_type: str) -> None:
+        await self.run(
+            self.client.put_object,
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=body,
+            ContentType=content_type
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.run(self.client.delete_object, Bucket=self.bucket_name, Key=key)
+
+    async def move(self, source_key: str, target_key: str) -> None:
+        """Server-side copy followed by delete, no object bytes pass through the backend"""
+        await self.run(
+            self.client.copy,
+            {"Bucket": self.bucket_name, "Key": source_key},
+            self.bucket_name,
+            target_key
+        )
+        await self.delete(source_key)
+
+    # Presigned URLs, signed locally without a request to S3
+    def presign_get(
+        self,
+        key: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        filename: Optional[str] = None
+    ) -> str:
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if content_type:
+            params["ResponseContentType"] = content_type
+        if filename:
+            params["ResponseContentDisposition"] = f'inline; filename="{filename}"'
+        return self.presign_client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
+
+    def presign_upload_part(self, key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+        return self.presign_client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": key,
+                "UploadId": upload_id,
+                "PartNumber": part_number
+            },
+            ExpiresIn=expires_in
+        )
+
+    # Multipart operations
+    async def create_multipart_upload(self, key: str, content_type: str) -> str:
+        """Start a multipart upload and return its upload id"""
+        response = await self.run(
+            self.client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+            ContentType=content_type
+        )
+        return response["UploadId"]
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        response = await self.run(
+            self.client.upload_part,
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    async def upload_part_copy(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        source_key: str,
+        start: int,
+        end: int
+    ) -> dict:
+        """Server-side copy of the inclusive range [start, end] of another object into a part"""
+        response = await self.run(
+            self.client.upload_part_copy,
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource={"Bucket": self.bucket_name, "Key": source_key},
+            CopySourceRange=f"bytes={start}-{end}"
+        )
+        return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: List[dict]) -> None:
+        await self.run(
+            self.client.complete_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])}
+        )
+
+    async def list_parts(self, key: str, upload_id: str) -> List[dict]:
+        """Parts S3 has received for a multipart upload, as {"PartNumber", "ETag", "Size"}"""
+        parts = []
+        marker = 0
+        while True:
+            response = await self.run(
+                self.client.list_parts,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumberMarker=marker
+            )
+            parts.extend(
+                {"PartNumber": part["PartNumber"], "ETag": part["ETag"], "Size": part["Size"]}
+                for part in response.get("Parts", [])
+            )
+            if not response.get("IsTruncated"):
+                return parts
+            marker = response["NextPartNumberMarker"]
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Abort a multipart upload, logging instead of raising on failure"""
+        try:
+            await self.run(
+                self.client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id
+            )
+        except Exception as e:
+            logger.warning(f"Failed to abort multipart upload {upload_id}: {str(e)}")
+
+    async def stream_upload(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        part_size: int,
+        max_concurrency: int,
+        max_size: int
+    ) -> int:
+        """Upload an async byte stream as a multipart upload.
+
+        At most ``max_concurrency`` parts of ``part_size`` bytes are buffered or in
+        flight at any time, so memory use is bounded regardless of the object size.
+        The object is complete (durable) in the bucket when this returns.
+        Returns the number of bytes uploaded.
+        """
+        part_size = max(part_size, MIN_PART_SIZE)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks: List[asyncio.Task] = []
+        upload_id = None
+        buffer = bytearray()
+        total = 0
+
+        async def submit(body: bytes) -> None:
+            nonlocal upload_id
+            if upload_id is None:
+                upload_id = await self.create_multipart_upload(key, content_type)
+            # Waiting here applies backpressure on reading the request body
+            await semaphore.acquire()
+            part_number = len(tasks) + 1
+
+            async def run() -> dict:
+                try:
+                    return await self.upload_part(key, upload_id, part_number, body)
+                finally:
+                    semaphore.release()
+
+            tasks.append(asyncio.create_task(run()))
+
+        try:
+            async for chunk in chunks:
+                total += len(chunk)
+                if total > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File exceeds maximum size of {max_size} bytes"
+                    )
+                buffer.extend(chunk)
+                while len(buffer) >= part_size:
+                    await submit(bytes(buffer[:part_size]))
+                    del buffer[:part_size]
+                # Surface failed parts early instead of after reading the whole body
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+
+            if upload_id is None:
+                # Small file: a single PUT is cheaper than a multipart upload
+                await self.put(key, bytes(buffer), content_type)
+                return total
+
+            if buffer:
+                await submit(bytes(buffer))
+                buffer.clear()
+
+            parts = await asyncio.gather(*tasks)
+            await self.complete_multipart_upload(key, upload_id, list(parts))
+            return total
+
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if upload_id is not None:
+                await self.abort_multipart_upload(key, upload_id)
+            raise
+
+    async def compose(
+        self,
+        key: str,
+        source_key: str,
+        pieces: List[Piece],
+        content_type: str,
+        part_size: int,
+        max_concurrency: int
+    ) -> None:
+        """Write an object made of literal bytes and byte ranges of ``source_key``.
+
+        Ranges of at least one part are copied server-side with upload_part_copy;
+        only literals and short ranges that have to be merged into a part pass
+        through memory, so memory use stays around one part.
+        """
+        part_size = max(part_size, MIN_PART_SIZE)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks: List[asyncio.Task] = []
+        upload_id = None
+        buffer = bytearray()
+
+        async def submit(make_part) -> None:
+            nonlocal upload_id
+            if upload_id is None:
+                upload_id = await self.create_multipart_upload(key, content_type)
+            await semaphore.acquire()
+            part_number = len(tasks) + 1
+
+            async def run() -> dict:
+                try:
+                    return await make_part(upload_id, part_number)
+                finally:
+                    semaphore.release()
+
+            tasks.append(asyncio.create_task(run()))
+
+        async def submit_buffer() -> None:
+            nonlocal buffer
+            body, buffer = bytes(buffer), bytearray()
+            await submit(lambda upload_id, n: self.upload_part(key, upload_id, n, body))
+
+        async def submit_copy(start: int, end: int) -> None:
+            await submit(lambda upload_id, n: self.upload_part_copy(key, upload_id, n, source_key, start, end - 1))
+
+        try:
+            for piece in pieces:
+                if isinstance(piece, bytes):
+                    buffer.extend(piece)
+                    if len(buffer) >= MIN_PART_SIZE:
+                        await submit_buffer()
+                    continue
+
+                position, end = piece
+                while position < end:
+                    if buffer:
+                        # Top the buffered part up to the minimum part size
+                        n = min(MIN_PART_SIZE - len(buffer), end - position)
+                        buffer.extend(await self.get_range(source_key, position, position + n - 1))
+                        if len(buffer) >= MIN_PART_SIZE:
+                            await submit_buffer()
+                    else:
+                        remaining = end - position
+                        # The last part of a range absorbs a tail that would be too small
+                        n = part_size if remaining >= part_size + MIN_PART_SIZE else remaining
+                        if n >= MIN_PART_SIZE:
+                            await submit_copy(position, position + n)
+                        else:
+                            buffer.extend(await self.get_range(source_key, position, position + n - 1))
+                    position += n
+
+            if upload_id is None:
+                await self.put(key, bytes(buffer), content_type)
+                return
+            if buffer:
+                await submit_buffer()
+            parts = await asyncio.gather(*tasks)
+            await self.complete_multipart_upload(key, upload_id, list(parts))
+
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if upload_id is not None:
+                await self.abort_multipart_upload(key, upload_id)
+            raise
@@ -0,0 +1,132 @@
+# Path: backend/app/telemetry.py
+import io
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+import numpy as np
+
+# Column dtypes of each series stored in the columnar telemetry store
+SERIES_COLUMNS = {
+    "speed": {
+        "timestamp": np.float64,
+        "speed": np.float64,
+        "latitude": np.float64,
+        "longitude": np.float64,
+        "altitude": np.float64,
+        "accuracy": np.float64
+    },
+    "button": {
+        "timestamp": np.float64,
+        "state": np.bool_
+    },
+    "inference": {
+        "timestamp": np.float64,
+        "predicted_speed": np.float64,
+        "confidence": np.float64
+    }
+}
+
+# Read-only rows with the attributes of the matching ORM models
+SpeedRow = namedtuple("SpeedRow", ["video_id", "timestamp_offset", *SERIES_COLUMNS["speed"]])
+ButtonRow = namedtuple("ButtonRow", ["video_id", "timestamp_offset", *SERIES_COLUMNS["button"]])
+InferenceRow = namedtuple("InferenceRow", ["video_id", "timestamp_offset", *SERIES_COLUMNS["inference"]])
+
+SERIES_ROWS = {"speed": SpeedRow, "button": ButtonRow, "inference": InferenceRow}
+
+Columns = Dict[str, np.ndarray]
+
+# Position after the last sample of a page: (its timestamp, number of samples
+# with that timestamp already returned), valid in both stores
+SeriesCursor = Tuple[float, int]
+
+
+def encode_series(series: str, columns: Columns) -> bytes:
+    """Compressed npz blob with one typed array per column"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **{
+        name: np.asarray(columns[name], dtype=dtype)
+        for name, dtype in SERIES_COLUMNS[series].items()
+    })
+    return buffer.getvalue()
+
+
+def decode_series(series: str, data: bytes) -> Columns:
+    with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+        return {name: arrays[name] for name in SERIES_COLUMNS[series]}
+
+
+def empty_series(series: str) -> Columns:
+    return {name: np.empty(0, dtype=dtype) for name, dtype in SERIES_COLUMNS[series].items()}
+
+
+def merge_series(series: str, *parts: Columns) -> Columns:
+    """Concatenate column sets and order them by timestamp, keeping arrival order for ties"""
+    merged = {
+        name: np.concatenate([np.asarray(part[name], dtype=dtype) for part in parts])
+        for name, dtype in SERIES_COLUMNS[series].items()
+    }
+    order = np.argsort(merged["timestamp"], kind="stable")
+    return {name: values[order] for name, values in merged.items()}
+
+
+def encode_cursor(cursor: Optional[SeriesCursor]) -> Optional[str]:
+    if cursor is None:
+        return None
+    return f"{cursor[0]!r}:{cursor[1]}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[SeriesCursor]:
+    if cursor is None:
+        return None
+    try:
+        timestamp, skip = cursor.rsplit(":", 1)
+        decoded = (float(timestamp), int(skip))
+    except ValueError:
+        decoded = None
+    if decoded is None or decoded[1] < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return decoded
+
+
+def page_cursor(
+    timestamps: np.ndarray,
+    limit: Optional[int],
+    cursor: Optional[SeriesCursor]
+) -> Tuple[int, Optional[SeriesCursor]]:
+    """Size of the page among samples fetched with ``limit + 1``, and the cursor of the next page"""
+    if limit is None or len(timestamps) <= limit:
+        return len(timestamps), None
+    last = float(timestamps[limit - 1])
+    skip = limit - int(np.searchsorted(timestamps[:limit], last, side="left"))
+    if skip == limit and cursor is not None and cursor[0] == last:
+        # The whole page shares the cursor's timestamp
+        skip += cursor[1]
+    return limit, (last, skip)
+
+
+def rows_to_columns(series: str, rows: List[tuple]) -> Columns:
+    """Columns of a series from row tuples selected in SERIES_COLUMNS order"""
+    if not rows:
+        return empty_series(series)
+    values = np.array(rows, dtype=np.float64)
+    return {
+        name: values[:, i].astype(dtype)
+        for i, (name, dtype) in enumerate(SERIES_COLUMNS[series].items())
+    }
+
+
+def series_rows(series: str, video_id: str, columns: Columns, timestamp_offset: float) -> List[tuple]:
+    """Materialize columns as row tuples for code written against the row tables"""
+    row_type = SERIES_ROWS[series]
+    count = len(columns["timestamp"])
+    return list(map(
+        row_type._make,
+        zip(
+            [video_id] * count,
+            [timestamp_offset] * count,
+            *(columns[name].tolist() for name in SERIES_COLUMNS[series])
+        )
+    ))
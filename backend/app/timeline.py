@@ -0,0 +1,120 @@
+# Path: backend/app/timeline.py
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+import numpy as np
+from fastapi import HTTPException, status
+from .telemetry import Columns
+
+MAX_TIMELINE_RATE = 100.0  # Samples per second
+MAX_TIMELINE_POINTS = 500000
+
+TIMELINE_COLUMNS = ["timestamp", "speed", "button_state", "predicted_speed"]
+ANNOTATION_COLUMNS = ["timestamp", "speed", "button_state"]
+
+# {"timeline": grid columns, "annotations": annotation columns}, both in video time
+Timeline = Dict[str, Columns]
+
+
+def interpolate(grid: np.ndarray, timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Linear interpolation onto ``grid``, NaN outside the sampled range"""
+    if not len(timestamps):
+        return np.full(len(grid), np.nan)
+    return np.interp(grid, timestamps, values.astype(np.float64), left=np.nan, right=np.nan)
+
+
+def step(grid: np.ndarray, timestamps: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """State of the last sample at or before each grid time as 0/1, NaN before the first"""
+    result = np.full(len(grid), np.nan)
+    if not len(timestamps):
+        return result
+    indices = np.searchsorted(timestamps, grid, side="right") - 1
+    known = indices >= 0
+    result[known] = states[indices[known]]
+    return result
+
+
+def build_timeline(
+    speed: Columns,
+    speed_offset: float,
+    button: Columns,
+    button_offset: float,
+    predictions: Columns,
+    rate: float
+) -> Columns:
+    """Speed, button state and predicted speed on one grid of ``rate`` samples
+    per second in video time, spanning all three series.
+
+    Offsets are added to the log timestamps, predictions are already in video
+    time. Speed and predictions are interpolated linearly, the button state
+    holds until the next transition.
+    """
+    speed_t = speed["timestamp"] + speed_offset
+    button_t = button["timestamp"] + button_offset
+    predictions_t = predictions["timestamp"]
+    spans = [(t[0], t[-1]) for t in (speed_t, button_t, predictions_t) if len(t)]
+    if not spans:
+        return {name: np.empty(0) for name in TIMELINE_COLUMNS}
+
+    start = min(first for first, _ in spans)
+    end = max(last for _, last in spans)
+    # Tolerance keeps the end on the grid despite rounding in (end - start) * rate
+    count = int(np.floor((end - start) * rate + 1e-9)) + 1
+    if count > MAX_TIMELINE_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Timeline at {rate} Hz would have {count} points, the maximum is {MAX_TIMELINE_POINTS}"
+        )
+    grid = start + np.arange(count) / rate
+    return {
+        "timestamp": grid,
+        "speed": interpolate(grid, speed_t, speed["speed"]),
+        "button_state": step(grid, button_t, button["state"]),
+        "predicted_speed": interpolate(grid, predictions_t, predictions["predicted_speed"])
+    }
+
+
+def time_window(timeline: Timeline, start: Optional[float], end: Optional[float]) -> Timeline:
+    """Grid points and annotations with start <= timestamp < end"""
+    windowed = {}
+    for name, columns in timeline.items():
+        timestamps = columns["timestamp"]
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        windowed[name] = {column: values[first:max(first, last)] for column, values in columns.items()}
+    return windowed
+
+
+def json_states(values: np.ndarray) -> np.ndarray:
+    """0/1/NaN button states as True/False/None for JSON"""
+    states = np.full(len(values), None, dtype=object)
+    known = ~np.isnan(values)
+    states[known] = values[known] == 1
+    return states
+
+
+class TimelineCache:
+    """In-memory LRU of built timelines.
+
+    Keys include the video's data version, so a write makes the old entries
+    unreachable and they age out instead of being invalidated.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Timeline]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings) -> "TimelineCache":
+        return cls(settings.TIMELINE_CACHE_SIZE)
+
+    def get(self, key: Hashable) -> Optional[Timeline]:
+        timeline = self._entries.get(key)
+        if timeline is not None:
+            self._entries.move_to_end(key)
+        return timeline
+
+    def put(self, key: Hashable, timeline: Timeline) -> None:
+        self._entries[key] = timeline
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
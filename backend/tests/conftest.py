@@ -2,7 +2,9 @@
 import os
 import pytest
 from httpx import AsyncClient
-from app.routers.videos import get_s3_client
+from app.dependencies import get_storage, get_ingest_worker
+from app.jobs import IngestWorker
+from app.storage import ObjectStorage
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 import boto3
@@ -50,26 +52,39 @@ async def test_engine():
     await engine.dispose()
 
 @pytest.fixture(scope="function")
-async def test_s3_client():
-    return boto3.client(
-        's3',
-        endpoint_url=os.getenv('S3_ENDPOINT_URL'),
-        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-        region_name="ru-central1"
-    ), os.getenv('S3_TEST_BUCKET')
+async def test_storage() -> AsyncGenerator[ObjectStorage, None]:
+    storage = ObjectStorage(
+        boto3.client(
+            's3',
+            endpoint_url=os.getenv('S3_ENDPOINT_URL'),
+            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+            region_name="ru-central1"
+        ),
+        os.getenv('S3_TEST_BUCKET')
+    )
+    yield storage
+    storage.close()
+
+@pytest.fixture(scope="function")
+async def ingest_worker(test_engine, test_storage) -> AsyncGenerator[IngestWorker, None]:
+    worker = IngestWorker(
+        async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+        test_storage,
+        max_concurrency=2
+    )
+    yield worker
+    await worker.close()
 
 @pytest.fixture(scope="function")
-async def client(test_session, test_s3_client) -> AsyncGenerator[AsyncClient, None]:
+async def client(test_session, test_storage, ingest_worker) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client."""
     async def override_get_db():
         yield test_session
-        
-    async def override_get_s3_client():
-        return test_s3_client
 
     app.dependency_overrides[get_db] = override_get_db
-    app.dependency_overrides[get_s3_client] = override_get_s3_client
+    app.dependency_overrides[get_storage] = lambda: test_storage
+    app.dependency_overrides[get_ingest_worker] = lambda: ingest_worker
     
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select
+from app import crud, models
+from app.alignment import change_signal, estimate_offset, transition_signal
+
+rng = np.random.default_rng(0)
+# Half an hour of speed at 1 Hz, steady for 2 to 30 s at a time
+LOG_TIMES = np.arange(0, 1800, 1.0)
+SPEED = np.repeat(rng.uniform(0, 90, 200), rng.integers(2, 30, 200))[:len(LOG_TIMES)]
+
+class TestEstimateOffset:
+    def test_recovers_shift(self):
+        video_times = np.arange(60, 1700, 0.5)
+        predicted = np.interp(video_times - 7.3, LOG_TIMES, SPEED) + rng.normal(0, 2, len(video_times))
+        offset, confidence = estimate_offset((video_times, predicted), (LOG_TIMES, SPEED), max_offset=60)
+        assert offset == pytest.approx(7.3, abs=0.1)
+        assert confidence > 0.9
+
+        noise = rng.normal(0, 1, len(video_times))
+        _, confidence = estimate_offset((video_times, noise), (LOG_TIMES, SPEED), max_offset=60)
+        assert confidence < 0.2
+
+    def test_button_transitions(self):
+        # A press or release at every change of speed, logged 4 s early
+        changes = LOG_TIMES[1:][np.diff(SPEED) != 0]
+        states = np.arange(len(changes)) % 2 == 1
+        offset, confidence = estimate_offset(
+            change_signal(LOG_TIMES, SPEED),
+            transition_signal(changes - 4.0, states),
+            max_offset=30
+        )
+        # With 1 Hz speed a change is only known to fall between two samples
+        assert offset == pytest.approx(4.0, abs=0.6)
+        assert confidence > 0.5
+
+    def test_not_enough_samples(self):
+        with pytest.raises(HTTPException) as e:
+            estimate_offset((np.array([0.0]), np.array([1.0])), (LOG_TIMES, SPEED), max_offset=60)
+        assert e.value.status_code == 400
+
+class TestAlignmentEndpoint:
+    async def test_estimate_and_auto_align(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"alignment", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+        lines = ["Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"]
+        lines += [f"{t}, {speed}, 55.7, 37.7, 0.1, 0.005" for t, speed in zip(LOG_TIMES, SPEED)]
+        await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", "\n".join(lines).encode(), "text/csv")},
+            headers=headers
+        )
+
+        response = await client.get(f"/api/data/{video_id}/alignment", headers=headers)
+        assert response.status_code == 400
+
+        video_times = np.arange(30, 1750, 0.5)
+        predicted = np.interp(video_times + 12.0, LOG_TIMES, SPEED) + rng.normal(0, 5, len(video_times))
+        await crud.create_inference_results_bulk(test_session, video_id, [
+            {"timestamp": t, "predicted_speed": speed}
+            for t, speed in zip(video_times.tolist(), predicted.tolist())
+        ])
+        response = await client.get(f"/api/data/{video_id}/alignment?target=video", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["timestamp_offset"] == pytest.approx(-12.0, abs=0.1)
+        assert data["confidence"] > 0.9
+
+        assert await crud.auto_align_video(test_session, video_id, 0.999, 300) is None
+        offset = await crud.auto_align_video(test_session, video_id, 0.9, 300)
+        assert offset == pytest.approx(-12.0, abs=0.1)
+        result = await test_session.execute(select(models.Video.timestamp_offset).filter(models.Video.id == video_id))
+        assert result.scalar_one() == offset
+        # A set offset is left alone
+        assert await crud.auto_align_video(test_session, video_id, 0.9, 300) is None
@@ -1,8 +1,10 @@
 # Path: backend/tests/test_annotations.py
 from httpx import AsyncClient
+import asyncio
 import pytest
 from sqlalchemy import select, text
-from app import models
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app import crud, models
 from .test_data import get_test_video_path, get_test_speed_data_path, get_test_button_data_path
 
 class TestAnnotations:
@@ -179,4 +181,58 @@ class TestAnnotations:
         )
         
         assert response.status_code == 404
-        assert response.json()["detail"] == "No unannotated videos available"
\ No newline at end of file
+        assert response.json()["detail"] == "No unannotated videos available"
+
+    async def test_claim_queue(
+        self,
+        client: AsyncClient,
+        test_user,
+        test_user2,
+        test_engine,
+        monkeypatch
+    ):
+        """Concurrent claims lease distinct videos, expired leases are reclaimed"""
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_ids = []
+        for i in range(3):
+            video_response = await client.post(
+                "/api/data/upload_video",
+                files={"video_file": ("test_video.mp4", f"queue {i}".encode(), "video/mp4")},
+                headers=headers
+            )
+            video_ids.append(video_response.json()["video_id"])
+
+        # More than one video waiting
+        response = await client.get("/api/annotations/next_unannotated", headers=headers)
+        assert response.json()["video_id"] == video_ids[0]
+
+        sessionmaker = async_sessionmaker(test_engine, expire_on_commit=False)
+        async def claim(user_id):
+            async with sessionmaker() as session:
+                video = await crud.claim_next_video(session, user_id)
+                return video and video.id
+        claimed = await asyncio.gather(*[claim(test_user.id) for _ in range(4)])
+        assert sorted(filter(None, claimed)) == sorted(video_ids)
+        assert claimed.count(None) == 1
+
+        response = await client.post(
+            "/api/annotations/claim",
+            headers={"Authorization": f"Bearer {test_user2.get_token()}"}
+        )
+        assert response.status_code == 404
+        response = await client.post(
+            f"/api/annotations/{video_ids[0]}/start",
+            headers={"Authorization": f"Bearer {test_user2.get_token()}"}
+        )
+        assert response.status_code == 409
+
+        monkeypatch.setattr(crud.settings, "ANNOTATION_LEASE_SECONDS", 0)
+        response = await client.post(
+            "/api/annotations/claim",
+            headers={"Authorization": f"Bearer {test_user2.get_token()}"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["video_id"] in video_ids
+        assert data["locked_by"] == test_user2.id
+        assert data["lease_expires"] == data["lock_time"]
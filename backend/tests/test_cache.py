@@ -0,0 +1,93 @@
+import asyncio
+import os
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.cache import BlockCache, CachedRangeResponse
+from app.dependencies import get_video_cache
+from app.storage import ObjectStorage
+
+pytestmark = pytest.mark.asyncio
+
+BLOCK_SIZE = 256
+
+class TestBlockCache:
+    async def test_blocks_are_cached_and_evicted(self, test_storage: ObjectStorage, tmp_path):
+        content = os.urandom(BLOCK_SIZE * 4)
+        await test_storage.put("tests/cached.bin", content, "video/mp4")
+        cache = BlockCache(str(tmp_path), block_size=BLOCK_SIZE, max_bytes=BLOCK_SIZE * 2)
+
+        # Concurrent requests for one block share a single fetch
+        files = await asyncio.gather(*[
+            cache.open_block(test_storage, "tests/cached.bin", 1, len(content)) for _ in range(3)
+        ])
+        assert [f.read() for f in files] == [content[BLOCK_SIZE:2 * BLOCK_SIZE]] * 3
+        for f in files:
+            f.close()
+        assert cache.misses == 1
+        assert cache.coalesced == 2
+
+        segments = [
+            (f.read(), offset, count)
+            async for f, offset, count in cache.iter_segments(
+                test_storage, "tests/cached.bin", len(content), 10, BLOCK_SIZE * 3 + 5
+            )
+        ]
+        data = b"".join(block[offset:offset + count] for block, offset, count in segments)
+        assert data == content[10:BLOCK_SIZE * 3 + 6]
+        assert cache.hits == 1
+        assert cache.evictions == 2
+        assert cache.used_bytes <= cache.max_bytes
+
+        # The index survives a restart
+        reopened = BlockCache(str(tmp_path), block_size=BLOCK_SIZE, max_bytes=BLOCK_SIZE * 2)
+        assert reopened.stats()["blocks"] == cache.stats()["blocks"]
+
+    async def test_zerocopy_send(self, test_storage: ObjectStorage, tmp_path):
+        content = os.urandom(BLOCK_SIZE * 2)
+        await test_storage.put("tests/zerocopy.bin", content, "video/mp4")
+        cache = BlockCache(str(tmp_path), block_size=BLOCK_SIZE, max_bytes=BLOCK_SIZE * 4)
+        response = CachedRangeResponse(
+            cache, test_storage, "tests/zerocopy.bin", len(content), 100, BLOCK_SIZE + 99, status_code=206
+        )
+
+        received = []
+        async def send(message):
+            if message["type"] == "http.response.zerocopysend":
+                f = message["file"]
+                f.seek(message["offset"])
+                received.append(f.read(message["count"]))
+            elif message["type"] == "http.response.body":
+                received.append(message["body"])
+
+        scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+        await response(scope, None, send)
+        assert b"".join(received) == content[100:BLOCK_SIZE + 100]
+
+    async def test_video_served_from_cache(self, client: AsyncClient, test_user, tmp_path):
+        cache = BlockCache(str(tmp_path), block_size=BLOCK_SIZE, max_bytes=BLOCK_SIZE * 64)
+        app.dependency_overrides[get_video_cache] = lambda: cache
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+
+        content = os.urandom(BLOCK_SIZE * 5 + 17)
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("cached.mp4", content, "video/mp4")},
+            headers=headers
+        )
+        url = f"/api/data/video/{response.json()['video_id']}"
+
+        response = await client.get(url, headers={"Range": "bytes=300-899"})
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == f"bytes 300-899/{len(content)}"
+        assert response.content == content[300:900]
+        misses = cache.misses
+
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.content == content
+        assert cache.hits >= 3
+
+        response = await client.get("/api/data/cache/stats", headers=headers)
+        assert response.json()["enabled"] is True
+        assert response.json()["misses"] == misses + 3
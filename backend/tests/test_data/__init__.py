@@ -1,4 +1,5 @@
 # Path: backend/tests/test_data/__init__.py
+import struct
 from pathlib import Path
 
 # Get the directory containing test data
@@ -12,4 +13,77 @@ def get_test_speed_data_path():
     return TEST_DATA_DIR / "speed_data.csv"
 
 def get_test_button_data_path():
-    return TEST_DATA_DIR / "button_data.txt"
\ No newline at end of file
+    return TEST_DATA_DIR / "button_data.txt"
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+def _full_box(box_type: bytes, payload: bytes) -> bytes:
+    return _box(box_type, b"\0\0\0\0" + payload)
+
+def _table(fmt: str, rows) -> bytes:
+    rows = list(rows)
+    return struct.pack(">I", len(rows)) + b"".join(struct.pack(fmt, *row) for row in rows)
+
+def _track(handler: bytes, timescale: int, delta: int, sizes, chunk_lengths, chunk_offsets, sync, co64) -> bytes:
+    stbl = [
+        _full_box(b"stsd", struct.pack(">I", 0)),
+        _full_box(b"stts", _table(">II", [(len(sizes), delta)])),
+    ]
+    if sync is not None:
+        stbl.append(_full_box(b"stss", _table(">I", [(n,) for n in sync])))
+    stbl += [
+        _full_box(b"stsc", _table(">III", [(n + 1, length, 1) for n, length in enumerate(chunk_lengths)])),
+        _full_box(b"stsz", struct.pack(">I", 0) + _table(">I", [(size,) for size in sizes])),
+        _full_box(b"co64" if co64 else b"stco", _table(">Q" if co64 else ">I", [(o,) for o in chunk_offsets])),
+    ]
+    mdia = [
+        _full_box(b"mdhd", struct.pack(">IIIIHH", 0, 0, timescale, len(sizes) * delta, 0, 0)),
+        _full_box(b"hdlr", struct.pack(">I4s12x", 0, handler) + b"\0"),
+        _box(b"minf", _box(b"stbl", b"".join(stbl))),
+    ]
+    return _box(b"trak", _box(b"mdia", b"".join(mdia)))
+
+def build_test_mp4(
+    seconds: int = 4,
+    fps: int = 10,
+    keyframe_interval: int = 10,
+    frame_size: int = 200,
+    moov_first: bool = True,
+    co64: bool = False
+) -> bytes:
+    """Synthetic MP4 with an interleaved video and audio track.
+
+    Every video sample starts with b"F%06d" % frame_number so tests can
+    check that byte offsets point at the right frame. One chunk per second
+    per track, video chunk first.
+    """
+    frames = [
+        (b"F%06d" % n).ljust(frame_size + n % 7 + (frame_size if n % keyframe_interval == 0 else 0), b"v")
+        for n in range(seconds * fps)
+    ]
+    audio = [b"a" * 100 for _ in range(seconds * 4)]
+
+    chunks = []  # (track, samples)
+    for second in range(seconds):
+        chunks.append(("video", frames[second * fps:(second + 1) * fps]))
+        chunks.append(("audio", audio[second * 4:(second + 1) * 4]))
+
+    def moov(base: int) -> bytes:
+        offsets = {"video": [], "audio": []}
+        position = base
+        for track, samples in chunks:
+            offsets[track].append(position)
+            position += sum(len(sample) for sample in samples)
+        video = _track(
+            b"vide", fps * 100, 100, [len(f) for f in frames], [fps] * seconds, offsets["video"],
+            range(1, len(frames) + 1, keyframe_interval), co64
+        )
+        sound = _track(b"soun", 48000, 12000, [len(a) for a in audio], [4] * seconds, offsets["audio"], None, co64)
+        return _box(b"moov", _full_box(b"mvhd", bytes(96)) + video + sound)
+
+    ftyp = _box(b"ftyp", b"isom\0\0\2\0isomiso2mp41")
+    mdat_payload = b"".join(sample for _, samples in chunks for sample in samples)
+    moov_size = len(moov(0))
+    if moov_first:
+        return ftyp + moov(len(ftyp) + moov_size + 8) + _box(b"mdat", mdat_payload)
+    return ftyp + _box(b"mdat", mdat_payload) + moov(len(ftyp) + 8)
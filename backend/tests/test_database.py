@@ -0,0 +1,37 @@
+from sqlalchemy import select, text
+from app import models
+from app.database import upgrade_schema
+
+class TestUpgradeSchema:
+    async def test_upgrades_existing_tables(
+        self,
+        test_engine,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        video = models.Video(filename="old.mp4", s3_key="videos/old.mp4", user_id=test_user.id)
+        test_session.add(video)
+        await test_session.commit()
+
+        # A database created before these columns and indexes existed
+        async with test_engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_speed_data_video_id_timestamp"))
+            await conn.execute(text("DROP INDEX ix_videos_content_hash"))
+            for column in ("content_hash", "keyframe_index", "data_version"):
+                await conn.execute(text(f"ALTER TABLE videos DROP COLUMN {column}"))
+
+        # Idempotent, so running it twice is fine
+        for _ in range(2):
+            async with test_engine.begin() as conn:
+                await upgrade_schema(conn)
+
+        async with test_engine.begin() as conn:
+            result = await conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename IN ('videos', 'speed_data')"))
+            indexes = set(result.scalars().all())
+        assert {"ix_speed_data_video_id_timestamp", "ix_videos_content_hash"} <= indexes
+
+        test_session.expunge_all()
+        result = await test_session.execute(select(models.Video).filter(models.Video.id == video.id))
+        upgraded = result.scalar_one()
+        assert upgraded.data_version == 0
+        assert upgraded.content_hash is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from app import crud
+from app.downsample import build_pyramid, level_sizes, lttb
+
+class TestLttb:
+    def test_keeps_endpoints_and_peaks(self):
+        x = np.arange(10000, dtype=np.float64)
+        y = np.sin(x / 500)
+        y[4321] = 10.0
+        indices = lttb(x, y, 100)
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 9999
+        assert np.all(np.diff(indices) > 0)
+        assert 4321 in indices
+
+    def test_small_inputs_are_unchanged(self):
+        x = np.arange(5, dtype=np.float64)
+        assert lttb(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_pyramid_levels(self):
+        assert level_sizes(1000) == []
+        assert level_sizes(100000) == [512, 2048, 8192, 32768]
+        x = np.arange(5000, dtype=np.float64)
+        pyramid = build_pyramid(x, x % 7)
+        assert {points: len(indices) for points, indices in pyramid.items()} == {512: 512, 2048: 2048}
+
+class TestDownsampledSpeedApi:
+    @pytest.mark.parametrize("store", ["rows", "columnar"])
+    async def test_level_matches_width(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession",
+        monkeypatch,
+        store
+    ):
+        monkeypatch.setattr(crud.settings, "TELEMETRY_STORE", store)
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", f"downsample {store}".encode(), "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+
+        rows = 5000
+        lines = ["Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"]
+        lines += [f"{i / 10}, {120 if i == 2500 else i % 60}, 55.7, 37.7, 0.1, 0.005" for i in range(rows)]
+        await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", "\n".join(lines).encode(), "text/csv")},
+            headers=headers
+        )
+        assert await crud.get_speed_level_sizes(test_session, video_id) == [512, 2048]
+
+        response = await client.get(f"/api/data/{video_id}/speed/downsampled?width=300", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["level"] == 512
+        assert data["points"] == 300
+        assert 120.0 in data["speed"]
+
+        # A narrow range is served from a finer level, then from raw samples
+        response = await client.get(f"/api/data/{video_id}/speed/downsampled?width=300&start=100&end=300", headers=headers)
+        assert response.json()["level"] == 2048
+        response = await client.get(f"/api/data/{video_id}/speed/downsampled?width=300&start=240&end=260", headers=headers)
+        data = response.json()
+        assert data["level"] is None
+        assert data["points"] == 200
+        assert data["timestamps"][0] == 240.0
@@ -0,0 +1,93 @@
+import json
+import msgpack
+import numpy as np
+import pyarrow
+import pyarrow.ipc
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from app.formats import ARROW, COLUMNS, JSON, MSGPACK, json_response, negotiate
+
+class TestNegotiation:
+    def test_preferences(self):
+        assert negotiate(None).media_type == JSON
+        assert negotiate("*/*").media_type == JSON
+        assert negotiate("application/x-msgpack").media_type == MSGPACK
+        assert negotiate(f"application/json;q=0.5, {ARROW}").media_type == ARROW
+        assert negotiate(f"{COLUMNS}; dtype=float32") == (COLUMNS, "float32")
+        assert negotiate(f"{COLUMNS}; dtype=int8, application/json").media_type == JSON
+        with pytest.raises(HTTPException) as e:
+            negotiate("text/csv")
+        assert e.value.status_code == 406
+
+class TestJsonStreaming:
+    async def test_chunked_body(self):
+        columns = {"timestamp": np.arange(7, dtype=np.float64), "state": np.array([0, 1] * 3 + [0], dtype=np.bool_)}
+        empty = {"timestamp": np.empty(0)}
+        response = json_response(
+            "ok",
+            {"video_id": "v"},
+            {"rows": (columns, ["timestamp", "state"]), "empty": (empty, ["timestamp"])},
+            chunk_rows=3
+        )
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert len(chunks) > 3
+        body = json.loads(b"".join(chunks))
+        assert body["status"] == "success"
+        assert body["data"]["video_id"] == "v"
+        assert body["data"]["rows"] == [{"timestamp": float(i), "state": bool(i % 2)} for i in range(7)]
+        assert body["data"]["empty"] == []
+
+class TestWireFormats:
+    async def test_video_data_formats(
+        self,
+        client: AsyncClient,
+        test_user: "User"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"wire formats", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+        lines = ["Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"]
+        lines += [f"{i}, {i * 10}, 55.{i}, 37.{i}, 0.1, 0.005" for i in range(5)]
+        await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", "\n".join(lines).encode(), "text/csv")},
+            headers=headers
+        )
+        await client.post(
+            f"/api/data/upload_button_data/{video_id}",
+            files={"button_data_file": ("button_data.txt", b"0,0\n2,1\n4,1", "text/plain")},
+            headers=headers
+        )
+        url = f"/api/data/{video_id}/data"
+        expected = (await client.get(url, headers=headers)).json()["data"]
+        speeds = [sample["speed"] for sample in expected["speed_data"]]
+
+        response = await client.get(url, headers={**headers, "Accept": MSGPACK})
+        assert response.headers["content-type"] == MSGPACK
+        data = msgpack.unpackb(response.content)
+        assert data["video_id"] == video_id
+        assert np.frombuffer(data["speed_data"]["speed"], "<f8").tolist() == speeds
+        assert np.frombuffer(data["button_data"]["state"], "<f8").tolist() == [0.0, 1.0, 1.0]
+
+        response = await client.get(url, headers={**headers, "Accept": ARROW})
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+        assert json.loads(table.schema.metadata[b"rows"]) == {"speed_data": 5, "button_data": 3}
+        assert table.column("speed_data.speed").to_pylist() == speeds
+        assert table.column("button_data.state").to_pylist() == [False, True, True, None, None]
+
+        response = await client.get(url, headers={**headers, "Accept": f"{COLUMNS}; dtype=float32"})
+        assert response.headers["x-video-id"] == video_id
+        layout = [entry.split(":") for entry in response.headers["x-columns"].split(",")]
+        assert layout[1] == ["speed_data.speed", "5"]
+        values = np.frombuffer(response.content, "<f4")
+        assert values[5:10].tolist() == speeds
+        assert len(values) == sum(int(rows) for _, rows in layout)
+
+        response = await client.get(f"/api/geolocation/{video_id}", headers={**headers, "Accept": ARROW})
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+        assert table.column("locations.latitude").to_pylist()[:2] == [55.0, 55.1]
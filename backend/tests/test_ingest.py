@@ -0,0 +1,55 @@
+import gzip
+import pytest
+from fastapi import HTTPException
+from app.ingest import iter_speed_csv
+
+pytestmark = pytest.mark.asyncio
+
+HEADER = "Date, Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)\n"
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+async def collect(data: bytes, chunk_size: int, batch_size: int):
+    return [batch async for batch in iter_speed_csv(chunked(data, chunk_size), batch_size)]
+
+class TestSpeedCsv:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    async def test_batches_independent_of_chunking(self, chunk_size):
+        lines = [f"02/06/24, {i}, {i * 2}, 55.{i}, 37.{i}, 0.1, 0.01\n" for i in range(25)]
+        data = ("﻿" + HEADER + "".join(lines)).encode()
+        batches = await collect(data, chunk_size, batch_size=10)
+        assert [len(batch["timestamp"]) for batch in batches] == [10, 10, 5]
+        assert [t for batch in batches for t in batch["timestamp"]] == [float(i) for i in range(25)]
+        assert batches[2]["speed"][-1] == 48.0
+
+    async def test_gzip_members_and_missing_trailing_newline(self):
+        data = gzip.compress(HEADER.encode()) + gzip.compress(b"d, 1, 2, 3, 4, 5, 6")
+        batches = await collect(data, 5, batch_size=10)
+        assert batches[0]["accuracy"] == [6.0]
+
+    async def test_error_report(self):
+        lines = [
+            "d, 0, 10, 55.7, 37.7, 0.1, 0.01",
+            "d, 1, -5, 55.7, 37.7, 0.1, 0.01",
+            "d, 2, 10, 95.0, 37.7, 0.1, 0.01",
+            "d, 3, abc, 55.7, 37.7, 0.1, 0.01",
+            "d, 1.5, 10, 55.7, 37.7, 0.1, 0.01",
+            "d, 5, 10, 55.7",
+            "d, 6, 10, 55.7, 190, 0.1, 0.01",
+        ]
+        data = (HEADER + "\n".join(lines)).encode()
+        with pytest.raises(HTTPException) as error:
+            # Batches of 3 rows: monotonicity is checked across batch boundaries
+            await collect(data, 64, batch_size=3)
+        assert error.value.status_code == 422
+        assert error.value.detail["error_count"] == 6
+        assert sorted((e["row"], e["column"]) for e in error.value.detail["errors"]) == [
+            (3, "Speed (km/h)"),
+            (4, "Latitude"),
+            (5, "Speed (km/h)"),
+            (6, "Elapsed time (sec)"),
+            (7, None),
+            (8, "Longitude"),
+        ]
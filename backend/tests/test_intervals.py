@@ -0,0 +1,74 @@
+import numpy as np
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from app import crud, models
+from app.intervals import compact_button_states, overlapping, pressed_intervals, state_at, window
+
+# 0..9 released, 10..19 pressed, 20..29 released, 30..39 pressed
+TIMESTAMPS = np.arange(40, dtype=np.float64)
+STATES = (TIMESTAMPS // 10) % 2 == 1
+
+class TestIntervals:
+    def test_compaction_keeps_transitions_and_last_sample(self):
+        timestamps, states = compact_button_states(TIMESTAMPS, STATES)
+        assert timestamps.tolist() == [0.0, 10.0, 20.0, 30.0, 39.0]
+        assert states.tolist() == [False, True, False, True, True]
+        for t in [-1.0, 0.0, 9.5, 10.0, 25.0, 39.0, 100.0]:
+            assert state_at(timestamps, states, t) == state_at(TIMESTAMPS, STATES, t)
+
+    def test_pressed_intervals(self):
+        assert pressed_intervals(TIMESTAMPS, STATES) == [(10.0, 20.0), (30.0, 39.0)]
+        assert pressed_intervals(np.array([1.0]), np.array([True])) == []
+
+    def test_window_and_overlapping(self):
+        timestamps, states = compact_button_states(TIMESTAMPS, STATES)
+        rows = window(timestamps, 15.0, 25.0)
+        assert timestamps[rows].tolist() == [10.0, 20.0, 30.0]
+        intervals = pressed_intervals(timestamps[rows], states[rows])
+        assert overlapping(intervals, 15.0, 25.0) == [(10.0, 20.0)]
+        assert overlapping(intervals, 20.0, 25.0) == []
+
+class TestButtonIntervalsApi:
+    async def test_compacted_upload_and_queries(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"button intervals", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+
+        lines = "\n".join(f"{t},{int(state)}" for t, state in zip(TIMESTAMPS / 10, STATES))
+        response = await client.post(
+            f"/api/data/upload_button_data/{video_id}",
+            files={"button_data_file": ("button_data.txt", lines.encode(), "text/plain")},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["rows"] == 40
+
+        result = await test_session.execute(
+            select(func.count()).select_from(models.ButtonData).filter(models.ButtonData.video_id == video_id)
+        )
+        assert result.scalar() == 5
+
+        response = await client.get(f"/api/data/{video_id}/button/state?t=1.5", headers=headers)
+        assert response.json()["state"] is True
+        response = await client.get(f"/api/data/{video_id}/button/state?t=-1", headers=headers)
+        assert response.json()["state"] is None
+
+        response = await client.get(f"/api/data/{video_id}/button/intervals?start=0&end=5", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["intervals"] == [{"start": 1.0, "end": 2.0}, {"start": 3.0, "end": 3.9}]
+        response = await client.get(f"/api/data/{video_id}/button/intervals?start=2.1&end=2.9", headers=headers)
+        assert response.json()["intervals"] == []
+
+        # A later upload is merged with what is stored and compacted again
+        await crud.create_button_data_bulk(test_session, video_id, [{"timestamp": 5.0, "state": False}])
+        intervals, _ = await crud.get_button_intervals(test_session, video_id, 0.0, 10.0)
+        assert intervals == [(1.0, 2.0), (3.0, 5.0)]
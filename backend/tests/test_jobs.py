@@ -0,0 +1,125 @@
+import json
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from app.jobs import IngestWorker
+from app.storage import ingest_key
+
+pytestmark = pytest.mark.asyncio
+
+HEADER = "Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"
+
+async def upload_video(client: AsyncClient, headers: dict) -> str:
+    response = await client.post(
+        "/api/data/upload_video",
+        files={"video_file": ("test_video.mp4", b"background ingest", "video/mp4")},
+        headers=headers
+    )
+    return response.json()["video_id"]
+
+class TestIngestJobs:
+    async def test_background_csv_upload(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession",
+        test_storage,
+        ingest_worker: IngestWorker
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_id = await upload_video(client, headers)
+
+        rows = 1000
+        data = "\n".join([HEADER] + [f"{i}, 50, 55.7, 37.7, 0.1, 0.005" for i in range(rows)]).encode()
+        response = await client.post(
+            f"/api/data/upload_csv/{video_id}?background=true",
+            files={"csv_file": ("speed_data.csv", data, "text/csv")},
+            headers=headers
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "accepted"
+        job_id = response.json()["job_id"]
+
+        await ingest_worker.join()
+        response = await client.get(f"/api/jobs/{job_id}", headers=headers)
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "succeeded"
+        assert job["rows_processed"] == rows
+        assert job["bytes_processed"] == job["bytes_total"] == len(data)
+        assert job["progress"] == 1.0
+        assert job["rows_per_second"] > 0
+
+        result = await test_session.execute(
+            text("SELECT count(*) FROM speed_data WHERE video_id = :video_id"),
+            {"video_id": video_id}
+        )
+        assert result.scalar() == rows
+        # The staged file is dropped once the job is done
+        with pytest.raises(Exception):
+            await test_storage.head(ingest_key(job_id))
+
+        response = await client.get(f"/api/jobs/{job_id}/events", headers=headers)
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line]
+        assert events[-1]["status"] == "succeeded"
+
+    async def test_background_failures(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_user2: "User",
+        test_storage,
+        ingest_worker: IngestWorker
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_id = await upload_video(client, headers)
+
+        data = f"{HEADER}\n0, 50, 95.0, 37.7, 0.1, 0.005".encode()
+        response = await client.post(
+            f"/api/data/upload_csv/{video_id}?background=true",
+            files={"csv_file": ("speed_data.csv", data, "text/csv")},
+            headers=headers
+        )
+        csv_job_id = response.json()["job_id"]
+        response = await client.post(
+            f"/api/data/upload_button_data/{video_id}?background=true",
+            files={"button_data_file": ("button_data.txt", b"0.5,1\nbroken", "text/plain")},
+            headers=headers
+        )
+        button_job_id = response.json()["job_id"]
+        await ingest_worker.join()
+
+        job = (await client.get(f"/api/jobs/{csv_job_id}", headers=headers)).json()
+        assert job["status"] == "failed"
+        assert job["error"]["errors"][0]["column"] == "Latitude"
+        assert job["rows_processed"] == 0
+
+        job = (await client.get(f"/api/jobs/{button_job_id}", headers=headers)).json()
+        assert job["status"] == "failed"
+        assert "Invalid button data format" in job["error"]
+
+        # A failed job keeps its file, so it can be retried
+        await test_storage.head(ingest_key(csv_job_id))
+        response = await client.post(f"/api/jobs/{csv_job_id}/retry", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["status"] in ("pending", "running", "failed")
+        await ingest_worker.join()
+        job = (await client.get(f"/api/jobs/{csv_job_id}", headers=headers)).json()
+        assert job["status"] == "failed"
+
+        # Dismissing it drops the file, and only failed jobs can be dismissed or retried
+        response = await client.delete(f"/api/jobs/{csv_job_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["status"] == "dismissed"
+        with pytest.raises(Exception):
+            await test_storage.head(ingest_key(csv_job_id))
+        assert (await client.post(f"/api/jobs/{csv_job_id}/retry", headers=headers)).status_code == 409
+        assert (await client.delete(f"/api/jobs/{csv_job_id}", headers=headers)).status_code == 409
+
+        # Jobs are only visible to the user that submitted them
+        response = await client.get(
+            f"/api/jobs/{csv_job_id}",
+            headers={"Authorization": f"Bearer {test_user2.get_token()}"}
+        )
+        assert response.status_code == 404
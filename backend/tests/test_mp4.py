@@ -0,0 +1,58 @@
+import pytest
+from app.mp4 import KeyframeIndex, Mp4Error, build_keyframe_index, faststart_layout, read_moov
+from .test_data import build_test_mp4
+
+pytestmark = pytest.mark.asyncio
+
+def reader(data: bytes):
+    async def read(start: int, end: int) -> bytes:
+        return data[start:end + 1]
+    return read
+
+class TestKeyframeIndex:
+    @pytest.mark.parametrize("moov_first", [True, False])
+    @pytest.mark.parametrize("co64", [False, True])
+    async def test_keyframes_point_at_frames(self, moov_first, co64):
+        data = build_test_mp4(seconds=5, fps=25, keyframe_interval=50, moov_first=moov_first, co64=co64)
+        index = await build_keyframe_index(reader(data), len(data))
+
+        assert list(index.times) == [0.0, 2.0, 4.0]
+        assert [data[offset:offset + 7] for offset in index.offsets] == [b"F000000", b"F000050", b"F000100"]
+        assert index.duration == 5.0
+
+        assert index.lookup(3.9) == 1
+        start, end = index.byte_range(1)
+        assert (start, end + 1) == (index.offsets[1], index.offsets[2])
+        # The last range ends with the last video sample
+        assert data[index.byte_range(2)[1] + 1:].startswith(b"a")
+
+    async def test_serialization_roundtrip(self):
+        data = build_test_mp4()
+        index = await build_keyframe_index(reader(data), len(data))
+        restored = KeyframeIndex.from_bytes(index.to_bytes())
+        assert list(restored.times) == list(index.times)
+        assert list(restored.offsets) == list(index.offsets)
+        assert (restored.data_end, restored.duration) == (index.data_end, index.duration)
+
+    async def test_rejects_non_mp4(self):
+        with pytest.raises(Mp4Error):
+            await build_keyframe_index(reader(b"\0\0\0\x10junkjunkjunkjunk"), 16)
+        data = build_test_mp4()
+        with pytest.raises(Mp4Error):
+            await read_moov(reader(data[:-10]), len(data) - 10)
+
+class TestFaststart:
+    @pytest.mark.parametrize("co64", [False, True])
+    async def test_moov_moved_in_front(self, co64):
+        data = build_test_mp4(moov_first=False, co64=co64)
+        boxes, moov, moov_data = await read_moov(reader(data), len(data))
+        pieces = faststart_layout(boxes, moov, moov_data, len(data))
+        rewritten = b"".join(
+            piece if isinstance(piece, bytes) else data[piece[0]:piece[1]] for piece in pieces
+        )
+        assert rewritten == build_test_mp4(moov_first=True, co64=co64)
+
+    async def test_faststart_file_is_left_alone(self):
+        data = build_test_mp4(moov_first=True)
+        boxes, moov, moov_data = await read_moov(reader(data), len(data))
+        assert faststart_layout(boxes, moov, moov_data, len(data)) is None
@@ -0,0 +1,58 @@
+import os
+import pytest
+from app.storage import ObjectStorage
+
+pytestmark = pytest.mark.asyncio
+
+async def _chunks(content: bytes, size: int):
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+class TestObjectStorage:
+    async def test_object_operations(self, test_storage: ObjectStorage):
+        await test_storage.put("tests/object.bin", b"0123456789", "application/octet-stream")
+
+        head = await test_storage.head("tests/object.bin")
+        assert head["ContentLength"] == 10
+
+        assert await test_storage.get_range("tests/object.bin", 2, 5) == b"2345"
+
+        stream = await test_storage.get("tests/object.bin")
+        assert stream.content_length == 10
+        assert b"".join([chunk async for chunk in stream.iter_chunks(4)]) == b"0123456789"
+
+        await test_storage.move("tests/object.bin", "tests/moved.bin")
+        assert await test_storage.get_range("tests/moved.bin", 0, 3) == b"0123"
+        await test_storage.delete("tests/moved.bin")
+
+    async def test_stream_upload(self, test_storage: ObjectStorage):
+        content = os.urandom(11 * 1024 * 1024)
+        size = await test_storage.stream_upload(
+            "tests/streamed.bin",
+            _chunks(content, 64 * 1024),
+            content_type="application/octet-stream",
+            part_size=5 * 1024 * 1024,
+            max_concurrency=2,
+            max_size=len(content)
+        )
+        assert size == len(content)
+        stream = await test_storage.get("tests/streamed.bin")
+        assert await stream.read() == content
+
+    async def test_compose(self, test_storage: ObjectStorage):
+        mb = 1024 * 1024
+        source = os.urandom(13 * mb)
+        await test_storage.put("tests/source.bin", source, "application/octet-stream")
+
+        # A literal followed by ranges that need both copied and buffered parts
+        pieces = [b"head", (0, 6 * mb), (6 * mb + 100, 13 * mb), b"tail", (10, 20)]
+        await test_storage.compose(
+            "tests/composed.bin",
+            "tests/source.bin",
+            pieces,
+            content_type="application/octet-stream",
+            part_size=5 * mb,
+            max_concurrency=2
+        )
+        stream = await test_storage.get("tests/composed.bin")
+        assert await stream.read() == b"head" + source[:6 * mb] + source[6 * mb + 100:] + b"tail" + source[10:20]
@@ -0,0 +1,211 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from app import crud, models
+from app.telemetry import decode_series, encode_series, merge_series, series_rows
+from .test_data import get_test_speed_data_path, get_test_button_data_path
+
+class TestTelemetryColumns:
+    def test_encode_roundtrip(self):
+        columns = {"timestamp": [0.5, 1.0], "state": [1, 0]}
+        decoded = decode_series("button", encode_series("button", columns))
+        assert decoded["timestamp"].tolist() == [0.5, 1.0]
+        assert decoded["state"].dtype == np.bool_
+        assert decoded["state"].tolist() == [True, False]
+
+    def test_merge_orders_by_timestamp(self):
+        first = {"timestamp": np.array([0.0, 2.0]), "state": np.array([True, True])}
+        second = {"timestamp": np.array([1.0, 2.0]), "state": np.array([False, False])}
+        merged = merge_series("button", first, second)
+        assert merged["timestamp"].tolist() == [0.0, 1.0, 2.0, 2.0]
+        assert merged["state"].tolist() == [True, False, True, False]
+
+    def test_series_rows(self):
+        rows = series_rows("button", "video", {"timestamp": np.array([1.0]), "state": np.array([True])}, 2.5)
+        assert rows[0].video_id == "video"
+        assert rows[0].timestamp_offset == 2.5
+        assert rows[0].state is True
+
+class TestColumnarStore:
+    async def test_reads_are_transparent(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession",
+        monkeypatch
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"columnar", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+
+        # Button data lands in the row table first, then is moved on the first columnar write
+        with open(get_test_button_data_path(), 'rb') as button_file:
+            response = await client.post(
+                f"/api/data/upload_button_data/{video_id}",
+                files={"button_data_file": ("button_data.txt", button_file, "text/plain")},
+                headers=headers
+            )
+        assert response.status_code == 200
+        rows_response = await client.get(f"/api/data/{video_id}/data", headers=headers)
+
+        monkeypatch.setattr(crud.settings, "TELEMETRY_STORE", "columnar")
+        with open(get_test_speed_data_path(), 'rb') as speed_file:
+            response = await client.post(
+                f"/api/data/upload_csv/{video_id}",
+                files={"csv_file": ("speed_data.csv", speed_file, "text/csv")},
+                headers=headers
+            )
+        assert response.status_code == 200
+        await crud.create_button_data_bulk(test_session, video_id, [{"timestamp": 0.0, "state": True}])
+
+        for model in (models.SpeedData, models.ButtonData):
+            result = await test_session.execute(
+                select(func.count()).select_from(model).filter(model.video_id == video_id)
+            )
+            assert result.scalar() == 0
+
+        speed = await crud.get_telemetry_series(test_session, video_id, "speed")
+        assert speed.row_count == response.json()["rows"]
+
+        response = await client.get(f"/api/data/{video_id}/data", headers=headers)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert len(data["speed_data"]) == speed.row_count
+        assert data["button_data"][0] == {"timestamp": 0.0, "state": True}
+        assert data["button_data"][1:] == rows_response.json()["data"]["button_data"]
+
+        response = await client.get(f"/api/geolocation/{video_id}", headers=headers)
+        assert response.status_code == 200
+
+        await crud.update_button_data_timestamp_offset(test_session, video_id, 1.5)
+        button_data = await crud.get_button_data(test_session, video_id)
+        assert button_data[0].timestamp_offset == 1.5
+
+    async def test_store_follows_existing_series(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession",
+        monkeypatch
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"store switch", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+
+        monkeypatch.setattr(crud.settings, "TELEMETRY_STORE", "columnar")
+        await crud.create_inference_results_bulk(test_session, video_id, [{"timestamp": 0.0, "predicted_speed": 10.0}])
+        # Switching back to rows keeps appending to the series the video already has
+        monkeypatch.setattr(crud.settings, "TELEMETRY_STORE", "rows")
+        await crud.create_inference_results_bulk(test_session, video_id, [{"timestamp": 1.0, "predicted_speed": 20.0}])
+
+        result = await test_session.execute(
+            select(func.count()).select_from(models.InferenceResult).filter(models.InferenceResult.video_id == video_id)
+        )
+        assert result.scalar() == 0
+        results = await crud.get_inference_results(test_session, video_id)
+        assert [r.predicted_speed for r in results] == [10.0, 20.0]
+
+class TestTelemetryPages:
+    @pytest.mark.parametrize("store", ["rows", "columnar"])
+    async def test_cursor_pages_and_windows(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        monkeypatch,
+        store
+    ):
+        monkeypatch.setattr(crud.settings, "TELEMETRY_STORE", store)
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", f"pages {store}".encode(), "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+
+        # Runs of equal timestamps longer than a page
+        timestamps = [0, 0, 0, 0, 0, 1, 2, 2, 3, 4, 5, 6, 7, 8, 9]
+        lines = ["Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"]
+        lines += [f"{t}, {i}, 55.7, 37.7, 0.1, 0.005" for i, t in enumerate(timestamps)]
+        await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", "\n".join(lines).encode(), "text/csv")},
+            headers=headers
+        )
+        await client.post(
+            f"/api/data/upload_button_data/{video_id}",
+            files={"button_data_file": ("button_data.txt", b"0,0\n2.5,1\n6.5,0\n9,0", "text/plain")},
+            headers=headers
+        )
+
+        # Ties are ordered by row id in the row store, so only compare the set of samples
+        speeds, cursor, pages = [], None, 0
+        while True:
+            url = f"/api/geolocation/{video_id}?limit=3" + (f"&cursor={cursor}" if cursor else "")
+            data = (await client.get(url, headers=headers)).json()["data"]
+            speeds += [location["speed"] for location in data["locations"]]
+            cursor = data["next_cursor"]
+            pages += 1
+            if cursor is None:
+                break
+        assert sorted(speeds) == [float(i) for i in range(len(timestamps))]
+        assert pages == 5
+
+        response = await client.get(f"/api/data/{video_id}/data?start=3&end=6", headers=headers)
+        data = response.json()["data"]
+        assert [sample["timestamp"] for sample in data["speed_data"]] == [3.0, 4.0, 5.0]
+        # The transition at 2.5 sets the state at the start of the window
+        assert [sample["timestamp"] for sample in data["button_data"]] == [2.5, 6.5]
+        assert data["next_cursor"] is None
+
+        response = await client.get(f"/api/data/{video_id}/data?cursor=bad", headers=headers)
+        assert response.status_code == 400
+
+class TestConditionalGet:
+    async def test_etag_follows_data_version(
+        self,
+        client: AsyncClient,
+        test_user: "User"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"etags", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+        upload = {"button_data_file": ("button_data.txt", b"0,0\n1,1", "text/plain")}
+        await client.post(f"/api/data/upload_button_data/{video_id}", files=upload, headers=headers)
+
+        url = f"/api/data/{video_id}/data"
+        response = await client.get(url, headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        response = await client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        # Other representations and endpoints get their own tags
+        response = await client.get(url, headers={**headers, "Accept": "application/msgpack", "If-None-Match": etag})
+        assert response.status_code == 200
+        response = await client.get(f"{url}?start=0", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+        await client.post(f"/api/data/upload_button_data/{video_id}", files=upload, headers=headers)
+        response = await client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+        response = await client.get("/api/data/missing/data", headers=headers)
+        assert response.status_code == 404
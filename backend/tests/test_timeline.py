@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from app import crud
+from app.timeline import TimelineCache, build_timeline, json_states, time_window
+
+SPEED = {"timestamp": np.array([0.0, 1.0, 2.0]), "speed": np.array([0.0, 10.0, 30.0])}
+BUTTON = {"timestamp": np.array([0.0, 1.0]), "state": np.array([False, True])}
+PREDICTIONS = {"timestamp": np.array([2.0, 3.0]), "predicted_speed": np.array([20.0, 40.0])}
+
+class TestBuildTimeline:
+    def test_offsets_and_resampling(self):
+        timeline = build_timeline(SPEED, 1.0, BUTTON, 0.5, PREDICTIONS, rate=2)
+        # Video time 0.5 (first button sample) .. 3.0 (last prediction and speed sample)
+        assert timeline["timestamp"].tolist() == [0.5, 1.0, 1.5, 2.0, 2.5, 3.0]
+        assert np.isnan(timeline["speed"][0])
+        assert timeline["speed"][1:].tolist() == [0.0, 5.0, 10.0, 20.0, 30.0]
+        assert timeline["button_state"].tolist() == [0.0, 0.0, 1.0, 1.0, 1.0, 1.0]
+        assert np.isnan(timeline["predicted_speed"][:3]).all()
+        assert timeline["predicted_speed"][3:].tolist() == [20.0, 30.0, 40.0]
+
+    def test_empty_and_oversized(self):
+        empty = {"timestamp": np.empty(0), "speed": np.empty(0), "state": np.empty(0), "predicted_speed": np.empty(0)}
+        assert len(build_timeline(empty, 0.0, empty, 0.0, empty, rate=10)["timestamp"]) == 0
+        long = {"timestamp": np.array([0.0, 1e6]), "speed": np.array([0.0, 1.0])}
+        with pytest.raises(HTTPException) as e:
+            build_timeline(long, 0.0, empty, 0.0, empty, rate=100)
+        assert e.value.status_code == 400
+
+    def test_window_and_json_states(self):
+        timeline = {"timeline": build_timeline(SPEED, 1.0, BUTTON, 0.5, PREDICTIONS, rate=2)}
+        windowed = time_window(timeline, 1.0, 2.5)["timeline"]
+        assert windowed["timestamp"].tolist() == [1.0, 1.5, 2.0]
+        assert json_states(np.array([np.nan, 0.0, 1.0])).tolist() == [None, False, True]
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = TimelineCache(max_entries=2)
+        cache.put("a", {})
+        cache.put("b", {})
+        assert cache.get("a") == {}
+        cache.put("c", {})
+        assert cache.get("b") is None
+        assert cache.get("a") == {} and cache.get("c") == {}
+
+class TestTimelineEndpoint:
+    async def test_timeline(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"timeline", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+        lines = ["Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"]
+        lines += [f"{i}, {i * 10}, 55.7, 37.7, 0.1, 0.005" for i in range(5)]
+        await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", "\n".join(lines).encode(), "text/csv")},
+            headers=headers
+        )
+        await client.post(
+            f"/api/data/upload_button_data/{video_id}",
+            files={"button_data_file": ("button_data.txt", b"0,0\n2,1\n4,1", "text/plain")},
+            headers=headers
+        )
+        await crud.update_video_timestamp_offset(test_session, video_id, 1.0)
+        await crud.update_button_data_timestamp_offset(test_session, video_id, 0.5)
+        await crud.create_annotations_bulk(
+            test_session, video_id, test_user.id, [{"timestamp": 2.0, "speed": 60.0, "button_state": True}]
+        )
+
+        response = await client.get(f"/api/data/{video_id}/timeline?rate=2&start=2&end=4", headers=headers)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["rate"] == 2
+        # Speed starts at video time 1, button transitions at 1.5 and 3.5
+        assert data["timeline"] == [
+            {"timestamp": 2.0, "speed": 10.0, "button_state": False, "predicted_speed": None},
+            {"timestamp": 2.5, "speed": 15.0, "button_state": False, "predicted_speed": None},
+            {"timestamp": 3.0, "speed": 20.0, "button_state": False, "predicted_speed": None},
+            {"timestamp": 3.5, "speed": 25.0, "button_state": True, "predicted_speed": None}
+        ]
+        assert data["annotations"] == [{"timestamp": 2.0, "speed": 60.0, "button_state": True}]
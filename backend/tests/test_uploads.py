@@ -0,0 +1,299 @@
+import hashlib
+import os
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from app import crud, models
+from app.jobs import IngestWorker
+
+pytestmark = pytest.mark.asyncio
+
+CHUNK_SIZE = 5 * 1024 * 1024
+
+class TestResumableUploads:
+    async def test_chunked_upload_workflow(
+        self,
+        client: AsyncClient,
+        s3,
+        test_user: "User",
+        test_session: "AsyncSession",
+        ingest_worker: IngestWorker
+    ):
+        content = os.urandom(2 * CHUNK_SIZE + 1000)
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+
+        response = await client.post(
+            "/api/data/uploads",
+            json={
+                "filename": "drive.mp4",
+                "content_type": "video/mp4",
+                "total_size": len(content),
+                "chunk_size": CHUNK_SIZE
+            },
+            headers=headers
+        )
+        assert response.status_code == 201
+        session = response.json()
+        upload_id = session["upload_id"]
+        assert session["total_chunks"] == 3
+        assert session["missing_chunks"] == [1, 2, 3]
+
+        # Chunks may arrive in any order
+        for chunk_number in (3, 1):
+            start = (chunk_number - 1) * CHUNK_SIZE
+            response = await client.put(
+                f"/api/data/uploads/{upload_id}/chunks/{chunk_number}",
+                content=content[start:start + CHUNK_SIZE],
+                headers=headers
+            )
+            assert response.status_code == 200
+
+        # Wrong sized chunk is rejected
+        response = await client.put(
+            f"/api/data/uploads/{upload_id}/chunks/2",
+            content=b"short",
+            headers=headers
+        )
+        assert response.status_code == 400
+
+        response = await client.get(f"/api/data/uploads/{upload_id}", headers=headers)
+        assert response.json()["received_chunks"] == [1, 3]
+        assert response.json()["missing_chunks"] == [2]
+
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        assert response.status_code == 409
+
+        response = await client.put(
+            f"/api/data/uploads/{upload_id}/chunks/2",
+            content=content[CHUNK_SIZE:2 * CHUNK_SIZE],
+            headers=headers
+        )
+        assert response.status_code == 200
+
+        # The video is registered by a job, /complete does not read the object back
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        assert response.status_code == 202
+        assert response.json()["job_id"] == job_id
+
+        await ingest_worker.join()
+        response = await client.get(f"/api/data/uploads/{upload_id}", headers=headers)
+        assert response.json()["status"] == "completed"
+        video_id = response.json()["video_id"]
+        job = (await client.get(f"/api/jobs/{job_id}", headers=headers)).json()
+        assert job["status"] == "succeeded"
+        assert job["video_id"] == video_id
+
+        video = await test_session.get(models.Video, video_id)
+        assert video.content_hash == hashlib.sha256(content).hexdigest()
+        s3_client, bucket_name = s3
+        assert s3_client.get_object(Bucket=bucket_name, Key=video.s3_key)["Body"].read() == content
+
+        # A repeated /complete returns the same video
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        assert response.status_code == 201
+        assert response.json()["video_id"] == video_id
+
+    async def test_declared_hash_mismatch(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        ingest_worker: IngestWorker
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        response = await client.post(
+            "/api/data/uploads",
+            json={
+                "filename": "drive.mp4",
+                "total_size": 100,
+                "sha256": hashlib.sha256(b"something else").hexdigest()
+            },
+            headers=headers
+        )
+        upload_id = response.json()["upload_id"]
+        await client.put(f"/api/data/uploads/{upload_id}/chunks/1", content=b"x" * 100, headers=headers)
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        job_id = response.json()["job_id"]
+
+        await ingest_worker.join()
+        job = (await client.get(f"/api/jobs/{job_id}", headers=headers)).json()
+        assert job["status"] == "failed"
+        assert job["error"] == "Uploaded content does not match the declared sha256"
+        assert job["video_id"] is None
+
+        response = await client.delete(f"/api/jobs/{job_id}", headers=headers)
+        assert response.status_code == 200
+        response = await client.get(f"/api/data/uploads/{upload_id}", headers=headers)
+        assert response.json()["status"] == "aborted"
+
+    async def test_session_is_completed_once(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        response = await client.post(
+            "/api/data/uploads",
+            json={"filename": "drive.mp4", "content_type": "video/mp4", "total_size": 100},
+            headers=headers
+        )
+        upload_id = response.json()["upload_id"]
+        response = await client.put(f"/api/data/uploads/{upload_id}/chunks/1", content=b"x" * 100, headers=headers)
+        assert response.status_code == 200
+
+        # Another request claimed the session first
+        upload_session = await crud.get_upload_session(test_session, upload_id, test_user.id)
+        assert await crud.transition_upload_session(test_session, upload_session, "active", "completing")
+        assert not await crud.transition_upload_session(test_session, upload_session, "active", "completing")
+
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        assert response.status_code == 409
+        response = await client.delete(f"/api/data/uploads/{upload_id}", headers=headers)
+        assert response.status_code == 409
+
+    async def test_chunk_after_completion(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession",
+        test_engine
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        response = await client.post(
+            "/api/data/uploads",
+            json={"filename": "drive.mp4", "content_type": "video/mp4", "total_size": 2 * CHUNK_SIZE, "chunk_size": CHUNK_SIZE},
+            headers=headers
+        )
+        upload_id = response.json()["upload_id"]
+        chunk = b"x" * CHUNK_SIZE
+        await client.put(f"/api/data/uploads/{upload_id}/chunks/1", content=chunk, headers=headers)
+
+        # Another request completes the upload while this chunk is streaming:
+        # the session this request loaded (held here) still says active
+        upload_session = await crud.get_upload_session(test_session, upload_id, test_user.id)
+        async with test_engine.begin() as conn:
+            await conn.execute(text("UPDATE upload_sessions SET status = 'completing' WHERE id = :id"), {"id": upload_id})
+        response = await client.put(f"/api/data/uploads/{upload_id}/chunks/2", content=chunk, headers=headers)
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Upload session is completing"
+        assert upload_session.status == "active"
+
+        # A session already seen as no longer active refuses chunks before the body is read
+        response = await client.put(f"/api/data/uploads/{upload_id}/chunks/2", content=chunk, headers=headers)
+        assert response.status_code == 409
+
+    async def test_known_content_completes_immediately(
+        self,
+        client: AsyncClient,
+        test_user: "User"
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        content = b"already uploaded drive"
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("drive.mp4", content, "video/mp4")},
+            headers=headers
+        )
+        assert response.status_code == 201
+
+        response = await client.post(
+            "/api/data/uploads",
+            json={
+                "filename": "drive.mp4",
+                "total_size": len(content),
+                "sha256": hashlib.sha256(content).hexdigest()
+            },
+            headers=headers
+        )
+        assert response.status_code == 201
+        session = response.json()
+        assert session["status"] == "completed"
+        assert session["missing_chunks"] == []
+        assert session["video_id"] is not None
+
+    async def test_upload_session_is_private(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_user2: "User"
+    ):
+        response = await client.post(
+            "/api/data/uploads",
+            json={"filename": "drive.mp4", "total_size": 100},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        upload_id = response.json()["upload_id"]
+
+        response = await client.get(
+            f"/api/data/uploads/{upload_id}",
+            headers={"Authorization": f"Bearer {test_user2.get_token()}"}
+        )
+        assert response.status_code == 404
+
+    async def test_direct_upload_through_presigned_urls(
+        self,
+        client: AsyncClient,
+        s3,
+        test_user: "User",
+        test_session: "AsyncSession",
+        ingest_worker: IngestWorker
+    ):
+        content = os.urandom(CHUNK_SIZE + 1000)
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+
+        response = await client.post(
+            "/api/data/uploads",
+            json={
+                "filename": "direct.mp4",
+                "total_size": len(content),
+                "chunk_size": CHUNK_SIZE,
+                "direct": True
+            },
+            headers=headers
+        )
+        assert response.status_code == 201
+        assert response.json()["direct"] is True
+        upload_id = response.json()["upload_id"]
+
+        # The bytes go straight to S3, the backend only hands out URLs
+        async with AsyncClient() as s3_http:
+            for chunk_number in (1, 2):
+                response = await client.get(
+                    f"/api/data/uploads/{upload_id}/chunks/{chunk_number}/url",
+                    headers=headers
+                )
+                assert response.status_code == 200
+                part = response.json()
+                start = (chunk_number - 1) * CHUNK_SIZE
+                assert part["size"] == len(content[start:start + CHUNK_SIZE])
+                response = await s3_http.put(part["url"], content=content[start:start + CHUNK_SIZE])
+                assert response.status_code == 200
+
+        response = await client.get(f"/api/data/uploads/{upload_id}", headers=headers)
+        assert response.json()["received_chunks"] == [1, 2]
+        assert response.json()["missing_chunks"] == []
+
+        response = await client.post(f"/api/data/uploads/{upload_id}/complete", headers=headers)
+        assert response.status_code == 202
+        await ingest_worker.join()
+        response = await client.get(f"/api/data/uploads/{upload_id}", headers=headers)
+        video_id = response.json()["video_id"]
+
+        video = await test_session.get(models.Video, video_id)
+        assert video.content_hash == hashlib.sha256(content).hexdigest()
+        s3_client, bucket_name = s3
+        assert s3_client.get_object(Bucket=bucket_name, Key=video.s3_key)["Body"].read() == content
+
+    async def test_chunk_urls_require_direct_session(self, client: AsyncClient, test_user: "User"):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        response = await client.post(
+            "/api/data/uploads",
+            json={"filename": "proxied.mp4", "total_size": 1000},
+            headers=headers
+        )
+        upload_id = response.json()["upload_id"]
+        response = await client.get(f"/api/data/uploads/{upload_id}/chunks/1/url", headers=headers)
+        assert response.status_code == 400
@@ -1,10 +1,15 @@
 # Path: backend/tests/test_videos.py
+import gzip
+import hashlib
+import os
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select
-from app import models
-from .test_data import get_test_video_path, get_test_speed_data_path, get_test_button_data_path
+from sqlalchemy import event, text, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app import crud, models
+from app.routers import videos
+from .test_data import get_test_video_path, get_test_speed_data_path, get_test_button_data_path, build_test_mp4
 
 pytestmark = pytest.mark.asyncio
 
@@ -48,6 +53,187 @@ class TestVideos:
         assert video.user_id == test_user.id
         assert video.status == "unannotated"
 
+    async def test_upload_video_multipart_parts(
+        self,
+        client: AsyncClient,
+        s3,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        """Files larger than one part are streamed as an S3 multipart upload"""
+        test_content = os.urandom(12 * 1024 * 1024 + 123)
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("large_video.mp4", test_content, "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert response.status_code == 201
+        video_id = response.json()["video_id"]
+
+        video = await test_session.get(models.Video, video_id)
+        s3_client, bucket_name = s3
+        s3_object = s3_client.get_object(Bucket=bucket_name, Key=video.s3_key)
+        assert s3_object["ContentLength"] == len(test_content)
+        assert s3_object["Body"].read() == test_content
+
+        # Missing file field is rejected before anything is stored
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"other_file": ("large_video.mp4", b"content", "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert response.status_code == 422
+
+    async def test_upload_video_deduplication(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_user2: "User",
+        test_session: "AsyncSession"
+    ):
+        """Identical content shares one object, same filenames no longer collide"""
+        content = b"drive recording"
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        first = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("drive.mp4", content, "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert first.status_code == 201
+        assert first.json()["deduplicated"] is False
+
+        # Another user has to send the file, it is then stored once
+        second = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("copy.mp4", content, "video/mp4")},
+            headers={
+                "Authorization": f"Bearer {test_user2.get_token()}",
+                "X-Content-SHA256": content_hash
+            }
+        )
+        assert second.status_code == 201
+        assert second.json()["deduplicated"] is True
+
+        other = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("drive.mp4", b"another drive", "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert other.status_code == 201
+
+        # Knowing the hash is not enough to get someone else's video
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("copy.mp4", b"not the drive", "video/mp4")},
+            headers={
+                "Authorization": f"Bearer {test_user2.get_token()}",
+                "X-Content-SHA256": hashlib.sha256(b"another drive").hexdigest()
+            }
+        )
+        assert response.status_code == 400
+
+        first_video = await test_session.get(models.Video, first.json()["video_id"])
+        second_video = await test_session.get(models.Video, second.json()["video_id"])
+        other_video = await test_session.get(models.Video, other.json()["video_id"])
+        assert first_video.content_hash == content_hash
+        assert second_video.s3_key == first_video.s3_key
+        assert other_video.s3_key != first_video.s3_key
+
+        # The owner of known content skips the transfer
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("again.mp4", b"", "video/mp4")},
+            headers={
+                "Authorization": f"Bearer {test_user.get_token()}",
+                "X-Content-SHA256": content_hash
+            }
+        )
+        assert response.status_code == 201
+        assert response.json()["deduplicated"] is True
+
+        # A declared hash that does not match the body is rejected
+        response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("drive.mp4", b"tampered", "video/mp4")},
+            headers={
+                "Authorization": f"Bearer {test_user.get_token()}",
+                "X-Content-SHA256": hashlib.sha256(b"something else").hexdigest()
+            }
+        )
+        assert response.status_code == 400
+
+    async def test_presigned_video_delivery(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        monkeypatch
+    ):
+        content = os.urandom(4096)
+        upload_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("presigned.mp4", content, "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = upload_response.json()["video_id"]
+
+        response = await client.get(f"/api/data/video/{video_id}/url")
+        assert response.status_code == 200
+        assert response.json()["expires_in"] > 0
+
+        monkeypatch.setattr(videos.settings, "VIDEO_DELIVERY", "presigned")
+        response = await client.get(f"/api/data/video/{video_id}")
+        assert response.status_code == 307
+        presigned_url = response.headers["Location"]
+
+        async with AsyncClient() as s3_http:
+            response = await s3_http.get(presigned_url, headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == content[100:200]
+
+    async def test_video_range_requests(
+        self,
+        client: AsyncClient,
+        test_user: "User"
+    ):
+        content = bytes(range(256)) * 4
+        upload_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("range.mp4", content, "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = upload_response.json()["video_id"]
+        url = f"/api/data/video/{video_id}"
+
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.content == content
+
+        response = await client.get(url, headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == f"bytes 100-199/{len(content)}"
+        assert response.content == content[100:200]
+
+        response = await client.get(url, headers={"Range": "bytes=-24"})
+        assert response.status_code == 206
+        assert response.content == content[-24:]
+
+        response = await client.get(url, headers={"Range": "bytes=0-9,500-509"})
+        assert response.status_code == 206
+        assert response.headers["Content-Type"].startswith("multipart/byteranges")
+        assert int(response.headers["Content-Length"]) == len(response.content)
+        assert f"Content-Range: bytes 500-509/{len(content)}".encode() in response.content
+        assert content[500:510] in response.content
+
+        response = await client.get(url, headers={"Range": f"bytes={len(content)}-"})
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == f"bytes */{len(content)}"
+
+        response = await client.head(url)
+        assert response.status_code == 200
+        assert response.headers["Content-Length"] == str(len(content))
+        assert response.content == b""
+
     async def test_upload_csv_data(
         self,
         client: AsyncClient,
@@ -82,6 +268,40 @@ class TestVideos:
         )
         speed_records = result.scalars().all()
         assert len(speed_records) > 0
+        assert response.json()["rows"] == len(speed_records)
+        assert speed_records[0].timestamp_offset == 0.0
+
+    async def test_upload_csv_data_large(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        """Rows spanning several COPY batches all land in the table"""
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"large csv", "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = video_response.json()["video_id"]
+
+        rows = 120000
+        lines = ["Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)"]
+        lines += [f"{i / 10}, {i % 90}, 55.7, 37.7, 0.1, 0.005" for i in range(rows)]
+        response = await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", "\n".join(lines).encode(), "text/csv")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert response.status_code == 200
+        assert response.json()["rows"] == rows
+        assert response.json()["rows_per_second"] > 0
+
+        result = await test_session.execute(
+            text("SELECT count(*), max(timestamp) FROM speed_data WHERE video_id = :video_id"),
+            {"video_id": video_id}
+        )
+        assert tuple(result.one()) == (rows, (rows - 1) / 10)
 
     async def test_upload_button_data(
         self,
@@ -202,6 +422,40 @@ class TestVideos:
         assert data["status"] == "success"
         assert data["message"] == "Video timestamps added/adjusted successfully"
 
+    async def test_video_lookup_is_metadata_only(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_engine
+    ):
+        headers = {"Authorization": f"Bearer {test_user.get_token()}"}
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"metadata only", "video/mp4")},
+            headers=headers
+        )
+        video_id = video_response.json()["video_id"]
+        with open(get_test_speed_data_path(), "rb") as speed_file:
+            await client.post(
+                f"/api/data/upload_csv/{video_id}",
+                files={"csv_file": ("speed_data.csv", speed_file, "text/csv")},
+                headers=headers
+            )
+
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            async with async_sessionmaker(test_engine, expire_on_commit=False)() as session:
+                video = await crud.get_video(session, video_id)
+                # The second lookup in the same session comes from the identity map
+                assert await crud.get_video(session, video_id) is video
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+        assert len(statements) == 1
+        assert "speed_data" not in statements[0]
+
     async def test_error_cases(
         self,
         client: AsyncClient,
@@ -247,3 +501,142 @@ class TestVideos:
             f"/api/data/{video_id}/data"
         )
         assert response.status_code == 401
+
+    async def test_video_keyframe_seek(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: AsyncSession
+    ):
+        content = build_test_mp4(seconds=4, fps=10, keyframe_interval=10)
+        upload_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("indexed.mp4", content, "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = upload_response.json()["video_id"]
+        video = await test_session.get(models.Video, video_id)
+        assert video.keyframe_index is not None
+
+        response = await client.get(f"/api/data/video/{video_id}/keyframe", params={"t": 2.5})
+        assert response.status_code == 200
+        keyframe = response.json()
+        assert keyframe["keyframe_time"] == 2.0
+        assert keyframe["next_keyframe_time"] == 3.0
+        assert keyframe["duration"] == 4.0
+        assert content[keyframe["start"]:keyframe["start"] + 7] == b"F000020"
+        assert content[keyframe["end"] + 1:keyframe["end"] + 8] == b"F000030"
+
+        response = await client.get(f"/api/data/video/{video_id}/keyframe", params={"t": 60})
+        assert response.json()["keyframe_time"] == 3.0
+        assert response.json()["next_keyframe_time"] is None
+
+    async def test_video_keyframe_seek_not_mp4(self, client: AsyncClient, test_user: "User"):
+        upload_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("noise.mp4", os.urandom(2048), "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = upload_response.json()["video_id"]
+        response = await client.get(f"/api/data/video/{video_id}/keyframe", params={"t": 1})
+        assert response.status_code == 422
+
+    async def test_upload_rewrites_mp4_for_faststart(
+        self,
+        client: AsyncClient,
+        s3,
+        test_user: "User",
+        test_session: AsyncSession
+    ):
+        content = build_test_mp4(moov_first=False)
+        upload_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("moov_last.mp4", content, "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert upload_response.status_code == 201
+        video = await test_session.get(models.Video, upload_response.json()["video_id"])
+        assert video.content_hash == hashlib.sha256(content).hexdigest()
+
+        s3_client, bucket_name = s3
+        stored = s3_client.get_object(Bucket=bucket_name, Key=video.s3_key)["Body"].read()
+        assert stored == build_test_mp4(moov_first=True)
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    async def test_upload_compressed_csv_data(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession",
+        compression
+    ):
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", compression.encode(), "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = video_response.json()["video_id"]
+
+        with open(get_test_speed_data_path(), 'rb') as speed_file:
+            content = speed_file.read()
+        if compression == "gzip":
+            compressed = gzip.compress(content)
+        else:
+            zstandard = pytest.importorskip("zstandard")
+            compressed = zstandard.ZstdCompressor().compress(content)
+
+        response = await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": (f"speed_data.csv.{compression}", compressed, "application/octet-stream")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert response.status_code == 200
+        assert response.json()["rows"] == len(content.decode().strip().splitlines()) - 1
+
+    async def test_upload_csv_missing_columns(self, client: AsyncClient, test_user: "User"):
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"bad csv", "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = video_response.json()["video_id"]
+        response = await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", b"Elapsed time (sec), Speed (km/h)\n1, 2\n", "text/csv")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert response.status_code == 400
+        assert "Required columns" in response.json()["detail"]
+
+    async def test_upload_csv_invalid_rows(
+        self,
+        client: AsyncClient,
+        test_user: "User",
+        test_session: "AsyncSession"
+    ):
+        video_response = await client.post(
+            "/api/data/upload_video",
+            files={"video_file": ("test_video.mp4", b"invalid rows", "video/mp4")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        video_id = video_response.json()["video_id"]
+        content = (
+            "Elapsed time (sec), Speed (km/h), Latitude, Longitude, Altitude (km), Accuracy (km)\n"
+            "1, 10, 55.7, 37.7, 0.1, 0.01\n"
+            "2, 10, 155.7, 37.7, 0.1, 0.01\n"
+        )
+        response = await client.post(
+            f"/api/data/upload_csv/{video_id}",
+            files={"csv_file": ("speed_data.csv", content.encode(), "text/csv")},
+            headers={"Authorization": f"Bearer {test_user.get_token()}"}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"]["errors"] == [
+            {"row": 3, "column": "Latitude", "reason": "outside [-90.0, 90.0]"}
+        ]
+
+        result = await test_session.execute(
+            text("SELECT count(*) FROM speed_data WHERE video_id = :video_id"),
+            {"video_id": video_id}
+        )
+        assert result.scalar() == 0